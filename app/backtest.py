@@ -0,0 +1,263 @@
+"""Backtests en lot, sans interface
+
+Usage :
+    python -m app.backtest symboles.txt \\
+        --strategy sma_crossover:short_window=20,long_window=50 \\
+        --strategy rsi:window=14,overbought=70,oversold=30 \\
+        --period 5y --output resultats.parquet
+
+Le fichier de symboles contient un symbole par ligne (lignes vides et commentaires « # »
+ignorés, « - » pour l'entrée standard). Chaque stratégie est backtestée sur chaque
+symbole avec TradingService, et chaque résultat est écrit dès qu'il est disponible, en
+CSV ou en Parquet selon l'extension du fichier de sortie : la mémoire utilisée ne dépend
+pas du nombre de symboles.
+
+Les dépendances lourdes (yfinance, ta, plotly, pyarrow) ne sont importées qu'en cas de
+besoin : avec --offline, une exécution servie par le cache ne charge jamais yfinance.
+"""
+import argparse
+import csv
+import logging
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from .services.data_providers import DataProvider, SyntheticProvider, YahooFinanceProvider
+from .services.lazy_import import LazyModule
+from .services.market_cache import OHLCVCache
+from .services.market_data_loader import MarketDataLoader
+from .services.trading_service import TradingService
+
+logger = logging.getLogger(__name__)
+
+pa = LazyModule('pyarrow')
+pq = LazyModule('pyarrow.parquet')
+
+# Stratégies disponibles : nom en ligne de commande -> méthode de TradingService
+STRATEGIES = {
+    'sma_crossover': 'sma_crossover_strategy',
+    'rsi': 'rsi_strategy',
+}
+
+COLUMNS = (
+    ('symbol', 'string'),
+    ('strategy', 'string'),
+    ('params', 'string'),
+    ('bars', 'int64'),
+    ('start', 'string'),
+    ('end', 'string'),
+    ('initial_capital', 'float64'),
+    ('final_capital', 'float64'),
+    ('total_return', 'float64'),
+    ('sharpe_ratio', 'float64'),
+    ('max_drawdown', 'float64'),
+    ('trades', 'int64'),
+    ('seconds', 'float64'),
+    ('error', 'string'),
+)
+
+
+def _parse_value(value):
+    for cast in (int, float):
+        try:
+            return cast(value)
+        except ValueError:
+            pass
+    return value
+
+
+def parse_strategy(spec):
+    """« rsi:window=14,overbought=70 » -> ('rsi', {'window': 14, 'overbought': 70})"""
+    name, _, params = spec.partition(':')
+    if name not in STRATEGIES:
+        raise ValueError(f"Stratégie inconnue : {name} (disponibles : {', '.join(STRATEGIES)})")
+    parsed = {}
+    for item in filter(None, params.split(',')):
+        key, sep, value = item.partition('=')
+        if not sep:
+            raise ValueError(f"Paramètre invalide dans « {spec} » : {item}")
+        parsed[key.strip()] = _parse_value(value.strip())
+    return name, parsed
+
+
+def read_symbols(path):
+    """Symboles d'un fichier, un par ligne, sans doublons"""
+    stream = sys.stdin if path == '-' else open(path)
+    try:
+        symbols = (line.split('#', 1)[0].strip() for line in stream)
+        return list(dict.fromkeys(symbol for symbol in symbols if symbol))
+    finally:
+        if stream is not sys.stdin:
+            stream.close()
+
+
+class CacheOnlyProvider(DataProvider):
+    """Source qui refuse tout téléchargement : seules les barres en cache sont utilisées"""
+
+    def __init__(self, name):
+        self.name = name
+
+    def history(self, symbol, period=None, interval='1d', start=None):
+        raise LookupError(f"{symbol} absent du cache (mode hors ligne)")
+
+
+class CsvResultWriter:
+    """Écrit chaque ligne immédiatement, fichier vidé à chaque résultat"""
+
+    def __init__(self, path):
+        self._file = sys.stdout if path == '-' else open(path, 'w', newline='')
+        self._writer = csv.DictWriter(self._file, fieldnames=[name for name, _ in COLUMNS])
+        self._writer.writeheader()
+
+    def write(self, row):
+        self._writer.writerow(row)
+        self._file.flush()
+
+    def close(self):
+        if self._file is not sys.stdout:
+            self._file.close()
+
+
+class ParquetResultWriter:
+    """Écrit les résultats par groupes de lignes de taille bornée"""
+
+    def __init__(self, path, batch_size=256):
+        self.batch_size = batch_size
+        self._schema = pa.schema([(name, pa.string() if kind == 'string' else getattr(pa, kind)())
+                                  for name, kind in COLUMNS])
+        self._writer = pq.ParquetWriter(path, self._schema)
+        self._rows = []
+
+    def write(self, row):
+        self._rows.append(row)
+        if len(self._rows) >= self.batch_size:
+            self._flush()
+
+    def _flush(self):
+        if self._rows:
+            self._writer.write_table(pa.Table.from_pylist(self._rows, schema=self._schema))
+            self._rows = []
+
+    def close(self):
+        self._flush()
+        self._writer.close()
+
+
+def open_writer(path, output_format=None):
+    output_format = output_format or ('parquet' if path.endswith(('.parquet', '.pq')) else 'csv')
+    if output_format == 'parquet':
+        return ParquetResultWriter(path)
+    return CsvResultWriter(path)
+
+
+def _format_params(params):
+    return ','.join(f"{key}={value}" for key, value in params.items())
+
+
+def backtest_symbol(symbol, strategies, period, interval, loader, initial_capital, max_age=None):
+    """Backteste toutes les stratégies sur un symbole, retourne une ligne par stratégie"""
+    start = time.perf_counter()
+    try:
+        service = TradingService(symbol, period, interval, loader=loader, max_age=max_age)
+    except Exception as e:
+        service, load_error = None, str(e)
+    else:
+        load_error = None if service.data is not None else "Aucune donnée disponible"
+
+    rows = []
+    for name, params in strategies:
+        row = {column: None for column, _ in COLUMNS}
+        row.update(symbol=symbol, strategy=name, params=_format_params(params), initial_capital=initial_capital)
+        if load_error is None:
+            data = service.data
+            row.update(bars=len(data), start=str(data.index[0]), end=str(data.index[-1]))
+            try:
+                strategy = getattr(service, STRATEGIES[name])
+                result = service.backtest_strategy(lambda: strategy(**params), initial_capital=initial_capital)
+                if result is None:
+                    raise ValueError("Aucun signal")
+                row.update(
+                    final_capital=float(result['final_capital']),
+                    total_return=float(result['total_return']),
+                    sharpe_ratio=float(result['sharpe_ratio']),
+                    max_drawdown=float(result['max_drawdown']),
+                    trades=int((result['signals']['positions'].fillna(0) != 0).sum()),
+                )
+            except Exception as e:
+                row['error'] = str(e)
+        else:
+            row['error'] = load_error
+        row['seconds'] = time.perf_counter() - start
+        rows.append(row)
+    return rows
+
+
+def run_backtests(symbols, strategies, period="1y", interval=None, loader=None, initial_capital=10000.0,
+                  max_age=None, workers=4):
+    """Génère les lignes de résultats au fur et à mesure de l'achèvement des symboles"""
+    loader = loader or MarketDataLoader()
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as executor:
+        futures = [executor.submit(backtest_symbol, symbol, strategies, period, interval, loader,
+                                   initial_capital, max_age)
+                   for symbol in symbols]
+        for future in as_completed(futures):
+            yield from future.result()
+
+
+def build_loader(args):
+    if args.provider == 'synthetic':
+        provider = SyntheticProvider(seed=args.seed)
+    else:
+        provider = YahooFinanceProvider()
+    if args.offline:
+        provider = CacheOnlyProvider(provider.name)
+    cache = OHLCVCache(args.cache_dir) if args.cache_dir else None
+    return MarketDataLoader(cache, max_workers=args.workers, provider=provider)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m app.backtest", description="Backtests en lot, sans interface")
+    parser.add_argument('symbols', help="Fichier de symboles, un par ligne (« - » pour l'entrée standard)")
+    parser.add_argument('--strategy', '-s', action='append', required=True,
+                        help="Stratégie et paramètres, ex. sma_crossover:short_window=20,long_window=50")
+    parser.add_argument('--period', default="1y", help="Période Yahoo Finance (1y par défaut)")
+    parser.add_argument('--interval', help="Intervalle des barres (selon la période par défaut)")
+    parser.add_argument('--capital', type=float, default=10000.0, help="Capital initial")
+    parser.add_argument('--output', '-o', default='-', help="Fichier de sortie .csv ou .parquet (CSV sur la sortie standard par défaut)")
+    parser.add_argument('--format', choices=('csv', 'parquet'), help="Format de sortie (selon l'extension par défaut)")
+    parser.add_argument('--provider', choices=('yahoo', 'synthetic'), default='yahoo', help="Source des barres")
+    parser.add_argument('--seed', type=int, default=0, help="Graine de la source synthétique")
+    parser.add_argument('--cache-dir', help="Répertoire du cache des barres")
+    parser.add_argument('--max-age', type=float, help="Âge maximal (s) d'un historique en cache servi sans requête (60 par défaut, 0 pour toujours interroger la source)")
+    parser.add_argument('--offline', action='store_true', help="N'utilise que le cache, sans aucune requête réseau")
+    parser.add_argument('--workers', type=int, default=4, help="Symboles traités en parallèle")
+    parser.add_argument('--log-level', default="WARNING", help="Niveau de journalisation")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=args.log_level, format="%(asctime)s %(levelname)s %(name)s - %(message)s")
+    try:
+        strategies = [parse_strategy(spec) for spec in args.strategy]
+    except ValueError as e:
+        parser.error(str(e))
+    symbols = read_symbols(args.symbols)
+    max_age = float('inf') if args.offline else args.max_age
+
+    start = time.perf_counter()
+    written = failed = 0
+    writer = open_writer(args.output, args.format)
+    try:
+        for row in run_backtests(symbols, strategies, args.period, args.interval, build_loader(args),
+                                 args.capital, max_age, args.workers):
+            writer.write(row)
+            written += 1
+            if row['error']:
+                failed += 1
+                logger.warning("%s (%s) : %s", row['symbol'], row['strategy'], row['error'])
+    finally:
+        writer.close()
+
+    logger.info("%d résultats (%d en erreur) en %.2fs", written, failed, time.perf_counter() - start)
+    return 1 if written and failed == written else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
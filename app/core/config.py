@@ -5,6 +5,11 @@ class Settings(BaseSettings):
     # Configuration de l'application
     APP_NAME: str = "Bourse Traker"
     DEBUG: bool = False
+    LOG_LEVEL: str = "WARNING"
+    
+    # Export des durées mesurées au format texte de Prometheus
+    METRICS_PATH: Optional[str] = "./metrics.prom"
+    METRICS_EXPORT_INTERVAL: int = 30
     
     # Configuration de la base de données
     DATABASE_URL: str = "sqlite:///./trading.db"
@@ -1,58 +1,74 @@
+import logging
 import streamlit as st
 import pandas as pd
 from services.trading_service import TradingService
-import plotly.graph_objects as go
-from datetime import datetime, timedelta
-import time
-import pytz
+from services.market_data_loader import is_intraday
+from services.order_book import OrderBook
+from services.portfolio import Portfolio
+from services.portfolio_store import PortfolioStore
+from services.valuation import default_valuation_engine
+from services.render_scheduler import RenderScheduler
+from services.quote_hub import QuoteHub
+from services.replay import REPLAY_SPEEDS, ReplayTradingService
+from services.charts import performance_figure, price_figure, trend_figure
+from services.metrics import default_registry, span
+from core.config import settings
+from collections import deque
+from datetime import datetime
 import json
 
+# Journalisation : seuls les messages du niveau configuré (WARNING par défaut) sont formatés
+logging.basicConfig(level=settings.LOG_LEVEL, format="%(asctime)s %(levelname)s %(name)s - %(message)s")
+
 # Fonction pour formater la monnaie
 def format_currency(amount):
     return f"${amount:,.2f}"
 
-# Fonction pour vérifier si le marché américain est ouvert
-def is_market_open():
-    # Définition des fuseaux horaires
-    eastern = pytz.timezone('US/Eastern')
-    now = datetime.now(eastern)
-    
-    # Vérifier si c'est le weekend
-    if now.weekday() >= 5:  # 5 = Samedi, 6 = Dimanche
-        return False, "Le marché est fermé (weekend)"
-    
-    # Vérifier l'heure (9:30 - 16:00 EST)
-    market_open = now.replace(hour=9, minute=30, second=0)
-    market_close = now.replace(hour=16, minute=0, second=0)
-    
-    if now < market_open:
-        return False, f"Le marché ouvre dans {format_time_diff(now, market_open)}"
-    elif now > market_close:
-        next_open = market_open + timedelta(days=1)
-        if now.weekday() == 4:  # Vendredi
-            next_open = next_open + timedelta(days=2)  # Sauter le weekend
-        return False, f"Le marché ouvre dans {format_time_diff(now, next_open)}"
-    
-    return True, f"Marché ouvert - Fermeture dans {format_time_diff(now, market_close)}"
-
-# Fonction pour formater la différence de temps
-def format_time_diff(t1, t2):
-    diff = t2 - t1
-    hours, remainder = divmod(diff.seconds, 3600)
-    minutes, _ = divmod(remainder, 60)
-    if diff.days > 0:
-        return f"{diff.days}j {hours}h {minutes}m"
-    else:
-        return f"{hours}h {minutes}m"
+# Base du portefeuille, partagée par toutes les sessions du processus
+@st.cache_resource
+def get_portfolio_store():
+    return PortfolioStore(settings.DATABASE_URL)
 
-# Initialisation du portefeuille dans la session si nécessaire
-if 'portfolio' not in st.session_state:
-    st.session_state.portfolio = {
-        'cash': 10000.0,
-        'holdings': {},
-        'transactions': [],
-        'history': []
-    }
+# Cotations partagées par toutes les sessions : un seul rafraîchissement par symbole suivi
+@st.cache_resource
+def get_quote_hub():
+    return QuoteHub()
+
+# Portefeuille du compte enregistré, partagé par toutes les sessions du processus : un
+# seul objet en mémoire (opérations sous verrou) au lieu d'une copie par session qui
+# écraserait les liquidités et positions écrites par les autres. L'état enregistré est
+# rechargé, avec les transactions et l'historique de l'année écoulée.
+@st.cache_resource
+def get_live_portfolio():
+    portfolio = get_portfolio_store().load_portfolio(
+        10000.0, start=pd.Timestamp.now(tz='UTC') - pd.DateOffset(years=1)
+    )
+    portfolio.valuation = default_valuation_engine
+    return portfolio
+
+if 'live_portfolio' not in st.session_state:
+    st.session_state.live_portfolio = get_live_portfolio()
+
+# Carnet des ordres limites et stops en attente
+if 'live_order_book' not in st.session_state:
+    st.session_state.live_order_book = OrderBook()
+
+# Plages affichées par le graphique principal
+CHART_ZOOMS = {
+    "Tout": None,
+    "1 mois": pd.Timedelta(days=30),
+    "1 semaine": pd.Timedelta(days=7),
+    "1 jour": pd.Timedelta(days=1),
+    "1 heure": pd.Timedelta(hours=1),
+}
+
+# Types d'ordres proposés dans le formulaire
+ORDER_TYPES = {
+    "Marché": "market",
+    "Limite": "limit",
+    "Stop": "stop",
+    "Stop limite": "stop_limit"
+}
 
 # Configuration de la page
 st.set_page_config(
@@ -343,16 +359,39 @@ with st.sidebar:
     auto_refresh = st.checkbox("Auto", value=True)
     refresh_interval = st.slider("", min_value=5, max_value=60, value=15, label_visibility="collapsed")
     
+    # Rejeu accéléré de l'historique sur une horloge virtuelle
+    st.markdown("<p style='margin: 10px 0 5px 0; color: #94a3b8;'>Rejeu</p>", unsafe_allow_html=True)
+    replay_mode = st.checkbox("Rejouer l'historique", value=False)
+    replay_speed = st.select_slider("Vitesse", options=list(REPLAY_SPEEDS), value=60, format_func=lambda x: f"x{x}", disabled=not replay_mode)
+    
+    # En rejeu, les ordres sont passés sur un portefeuille et un carnet distincts, non enregistrés
+    if replay_mode:
+        if st.session_state.get('replay_key') != (symbol, period):
+            st.session_state.replay_key = (symbol, period)
+            st.session_state.replay_portfolio = Portfolio(10000.0)
+            st.session_state.replay_portfolio.valuation = default_valuation_engine
+            st.session_state.replay_order_book = OrderBook()
+        st.session_state.portfolio = st.session_state.replay_portfolio
+        st.session_state.order_book = st.session_state.replay_order_book
+    else:
+        st.session_state.portfolio = st.session_state.live_portfolio
+        st.session_state.order_book = st.session_state.live_order_book
+    
+    # Zoom du graphique : les chandeliers sont agrégés côté serveur sur la plage affichée
+    st.markdown("<p style='margin: 10px 0 5px 0; color: #94a3b8;'>Zoom</p>", unsafe_allow_html=True)
+    chart_zoom = st.selectbox("", options=list(CHART_ZOOMS), index=0, label_visibility="collapsed")
+    
+    # Durées mesurées des étapes du rafraîchissement
+    show_metrics = st.checkbox("Métriques de performance", value=settings.DEBUG)
+    
     # Séparateur
     st.markdown("<hr style='margin: 20px 0; border-color: #334155;'>", unsafe_allow_html=True)
     
     # Portefeuille
     st.markdown("<p style='margin: 10px 0 5px 0; font-weight: 600; color: #f8fafc;'>Portefeuille</p>", unsafe_allow_html=True)
     
-    # Calculer la valeur du portefeuille
-    portfolio_value = st.session_state.portfolio['cash']
-    for ticker, position in st.session_state.portfolio['holdings'].items():
-        portfolio_value += position['quantity'] * position['avg_price']
+    # Valoriser le portefeuille au dernier cours de chaque position
+    positions_df, portfolio_value = default_valuation_engine.value(st.session_state.portfolio)
     
     # Afficher la valeur et les liquidités
     initial_value = 10000.0
@@ -365,25 +404,27 @@ with st.sidebar:
     with col2:
         st.markdown(f"<p style='margin: 5px 0 0 0; color: #94a3b8;'>Performance</p><p style='margin: 0; font-size: 1.1rem; font-weight: 600;' class='{change_color}'>{pct_change:+.2f}%</p>", unsafe_allow_html=True)
     
-    st.markdown(f"<p style='margin: 15px 0 0 0; color: #94a3b8;'>Liquidités</p><p style='margin: 0; font-size: 1.1rem; font-weight: 600;'>{format_currency(st.session_state.portfolio['cash'])}</p>", unsafe_allow_html=True)
+    st.markdown(f"<p style='margin: 15px 0 0 0; color: #94a3b8;'>Liquidités</p><p style='margin: 0; font-size: 1.1rem; font-weight: 600;'>{format_currency(st.session_state.portfolio.cash)}</p>", unsafe_allow_html=True)
     
     # Positions
-    if st.session_state.portfolio['holdings']:
+    if not positions_df.empty:
         st.markdown("<p style='margin: 15px 0 5px 0; color: #94a3b8;'>Positions</p>", unsafe_allow_html=True)
-        for ticker, position in st.session_state.portfolio['holdings'].items():
-            position_value = position['quantity'] * position['avg_price']
+        for ticker, position in positions_df.iterrows():
+            pnl_color = "positive" if position['unrealized_pnl'] >= 0 else "negative"
             st.markdown(f"""
                 <div style='background-color: #1e293b; padding: 10px; border-radius: 8px; margin-bottom: 8px;'>
                     <div style='display: flex; justify-content: space-between;'>
                         <span style='font-weight: 600;'>{ticker}</span>
-                        <span>{format_currency(position_value)}</span>
+                        <span>{format_currency(position['market_value'])}</span>
                     </div>
                     <div style='display: flex; justify-content: space-between; font-size: 0.8rem; color: #94a3b8;'>
-                        <span>{position['quantity']} actions</span>
-                        <span>@{format_currency(position['avg_price'])}</span>
+                        <span>{int(position['quantity'])} actions @{format_currency(position['avg_price'])}</span>
+                        <span class='{pnl_color}'>{position['unrealized_pnl_pct']:+.2f}% · {position['weight'] * 100:.1f}%</span>
                     </div>
                 </div>
             """, unsafe_allow_html=True)
+            if pd.notna(position['quote_error']):
+                st.caption(f"⚠️ Cours de {ticker} indisponible ({position['quote_error']}) : dernier cours connu ou prix moyen")
 
     # Séparateur
     st.markdown("<hr style='margin: 20px 0; border-color: #334155;'>", unsafe_allow_html=True)
@@ -395,7 +436,7 @@ with st.sidebar:
     def generate_portfolio_report():
         report = {
             "portfolio_summary": {
-                "cash": st.session_state.portfolio['cash'],
+                "cash": st.session_state.portfolio.cash,
                 "total_value": portfolio_value,
                 "performance_percent": pct_change,
                 "initial_investment": initial_value,
@@ -406,22 +447,26 @@ with st.sidebar:
         }
         
         # Ajouter les positions actuelles
-        for ticker, position in st.session_state.portfolio['holdings'].items():
+        for ticker, position in positions_df.iterrows():
             report["holdings"][ticker] = {
-                "quantity": position['quantity'],
+                "quantity": int(position['quantity']),
                 "avg_price": position['avg_price'],
-                "current_value": position['quantity'] * position['avg_price']
+                "current_price": position['price'],
+                "current_value": position['market_value'],
+                "unrealized_pnl": position['unrealized_pnl'],
+                "weight": position['weight']
             }
         
         # Ajouter les transactions
-        for transaction in st.session_state.portfolio['transactions']:
+        transactions_df = st.session_state.portfolio.ledger.transactions_frame()
+        for transaction in transactions_df.itertuples(index=False):
             report["transactions"].append({
-                "date": transaction['timestamp'],
-                "symbol": transaction['symbol'],
-                "type": transaction['type'],
-                "quantity": transaction['quantity'],
-                "price": transaction['price'],
-                "total": transaction['total']
+                "date": transaction.timestamp.strftime("%Y-%m-%d %H:%M:%S"),
+                "symbol": transaction.symbol,
+                "type": transaction.type,
+                "quantity": int(transaction.quantity),
+                "price": float(transaction.price),
+                "total": float(transaction.total)
             })
         
         return report
@@ -439,23 +484,8 @@ with st.sidebar:
         )
         st.info("Copiez ce JSON et partagez-le avec ChatGPT pour obtenir des conseils d'investissement personnalisés.")
 
-# Obtenir le statut du marché
-market_open, market_status = is_market_open()
-status_color = "green" if market_open else "orange"
-
-# En-tête du dashboard
-st.markdown(f"""
-<div class="header">
-    <div class="logo">
-        <div class="logo-icon">📈</div>
-        <div class="logo-text">TradeSim Dashboard</div>
-    </div>
-    <div class="market-status">
-        <div class="status-dot" style="background-color: {status_color};"></div>
-        <span>{market_status}</span>
-    </div>
-</div>
-""", unsafe_allow_html=True)
+# En-tête du dashboard, rempli une fois le service de trading initialisé
+header_placeholder = st.empty()
 
 # Conteneur principal avec la grille Bento
 st.markdown('<div class="bento-grid">', unsafe_allow_html=True)
@@ -467,484 +497,466 @@ chart_placeholder = st.empty()
 order_form_placeholder = st.empty()
 transactions_placeholder = st.empty()
 performance_placeholder = st.empty()
+debug_placeholder = st.empty()
 
 st.markdown('</div>', unsafe_allow_html=True)
 
+# Avis d'exécution : la boucle du planificateur occupe le script, un st.success par
+# exécution s'empilerait sans fin. Seuls les derniers avis sont gardés, redessinés à
+# la même place.
+MAX_NOTICES = 5
+notices_placeholder = st.empty()
+if 'notices' not in st.session_state:
+    st.session_state.notices = deque(maxlen=MAX_NOTICES)
+
+def render_notices():
+    with notices_placeholder.container():
+        for level, message in st.session_state.notices:
+            getattr(st, level)(message)
+
+def notify(level, message):
+    """Ajoute un avis (success, warning ou error) et redessine la liste"""
+    st.session_state.notices.append((level, message))
+    render_notices()
+
+render_notices()
+
 # Fonction pour mettre à jour le portefeuille
 def update_portfolio(symbol, price, quantity, trade_type):
-    # Vérifier si le marché est ouvert
-    market_open, market_status = is_market_open()
+    # Vérifier si le marché est ouvert (à l'heure virtuelle en rejeu)
+    market_open, market_status = trading_service.market_status()
     
     if not market_open:
-        st.error(f"Transaction impossible: {market_status}")
+        notify("error", f"Transaction impossible: {market_status}")
         return False
     
     portfolio = st.session_state.portfolio
-    timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
     
-    if trade_type == "Achat":
-        cost = price * quantity
-        
-        # Vérifier si l'utilisateur a assez de liquidités
-        if cost > portfolio['cash']:
-            st.error("Liquidités insuffisantes pour cette transaction")
-            return False
-        
-        # Mettre à jour les liquidités
-        portfolio['cash'] -= cost
-        
-        # Mettre à jour les positions
-        if symbol in portfolio['holdings']:
-            # Mettre à jour une position existante
-            current_position = portfolio['holdings'][symbol]
-            total_quantity = current_position['quantity'] + quantity
-            total_cost = (current_position['quantity'] * current_position['avg_price']) + cost
-            current_position['quantity'] = total_quantity
-            current_position['avg_price'] = total_cost / total_quantity
-        else:
-            # Créer une nouvelle position
-            portfolio['holdings'][symbol] = {
-                'quantity': quantity,
-                'avg_price': price
-            }
-        
-        # Ajouter la transaction à l'historique
-        portfolio['transactions'].append({
-            'timestamp': timestamp,
-            'symbol': symbol,
-            'type': 'BUY',
-            'quantity': quantity,
-            'price': price,
-            'total': cost
-        })
-        
-        st.success(f"Achat de {quantity} {symbol} à ${price:.2f}")
-        
-    elif trade_type == "Vente":
-        # Vérifier si l'utilisateur possède assez d'actions
-        if symbol not in portfolio['holdings'] or portfolio['holdings'][symbol]['quantity'] < quantity:
-            st.error("Vous ne possédez pas assez d'actions pour cette vente")
-            return False
-        
-        # Calculer le produit de la vente
-        proceeds = price * quantity
-        
-        # Mettre à jour les liquidités
-        portfolio['cash'] += proceeds
-        
-        # Mettre à jour les positions
-        portfolio['holdings'][symbol]['quantity'] -= quantity
-        
-        # Supprimer la position si plus d'actions
-        if portfolio['holdings'][symbol]['quantity'] == 0:
-            del portfolio['holdings'][symbol]
-        
-        # Ajouter la transaction à l'historique
-        portfolio['transactions'].append({
-            'timestamp': timestamp,
-            'symbol': symbol,
-            'type': 'SELL',
-            'quantity': quantity,
-            'price': price,
-            'total': proceeds
-        })
-        
-        st.success(f"Vente de {quantity} {symbol} à ${price:.2f}")
-    
-    # Enregistrer la valeur totale du portefeuille pour l'historique
-    total_value = portfolio['cash']
-    for sym, pos in portfolio['holdings'].items():
-        # Ici, on devrait idéalement utiliser le prix actuel de chaque action
-        # Mais pour simplifier, on utilise le prix moyen d'achat
-        total_value += pos['quantity'] * pos['avg_price']
-    
-    portfolio['history'].append({
-        'timestamp': timestamp,
-        'total_value': total_value
-    })
+    try:
+        if trade_type == "Achat":
+            portfolio.buy(symbol, price, quantity, timestamp=trading_service.now())
+            notify("success", f"Achat de {quantity} {symbol} à ${price:.2f}")
+        elif trade_type == "Vente":
+            portfolio.sell(symbol, price, quantity, timestamp=trading_service.now())
+            notify("success", f"Vente de {quantity} {symbol} à ${price:.2f}")
+    except ValueError as e:
+        notify("error", str(e))
+        return False
     
     return True
 
-# Initialisation du service de trading
-trading_service = None
-last_price = None
-last_update = None
+# Initialisation du service de trading, conservé d'un rafraîchissement à l'autre
+service_key = (symbol, period, refresh_interval, replay_mode)
+if st.session_state.get('trading_service_key') != service_key:
+    if st.session_state.get('trading_service') is not None:
+        st.session_state.trading_service.close()
+    st.session_state.trading_service = None
+    st.session_state.trading_service_key = service_key
+trading_service = st.session_state.trading_service
 
-while True:
-    try:
-        # Chargement des données
-        with st.spinner("Chargement des données..."):
-            trading_service = TradingService(symbol, period)
-        
-        if trading_service.data is None:
-            st.error(f"""
-                Impossible de charger les données pour {symbol}.
-                Veuillez vérifier :
-                - Le symbole est correct
-                - La période sélectionnée
-                - Votre connexion internet
-            """)
-            break
-            
-        if len(trading_service.data) < 2:
-            st.warning(f"Pas assez de données pour {symbol}. Essayez une période plus longue.")
-            break
-            
-        # Prix et variation actuels
-        current_price = trading_service.data['Close'].iloc[-1]
-        price_change = trading_service.data['Close'].pct_change().iloc[-1] * 100
-        price_change_icon = "📈" if price_change >= 0 else "📉"
-        price_change_class = "positive" if price_change >= 0 else "negative"
-        
-        # Mise à jour des données
-        last_price = current_price
-        last_update = datetime.now()
-        
-        # 1. MÉTRIQUES PRINCIPALES
-        with metrics_placeholder.container():
-            st.markdown(f"""
-            <div class="bento-card span-4 height-1">
-                <div style="display: grid; grid-template-columns: repeat(4, 1fr); gap: 20px;">
-                    <div class="metric">
-                        <div class="metric-label">Prix actuel</div>
-                        <div class="metric-value">{format_currency(current_price)}</div>
-                        <div class="metric-change {price_change_class}">{price_change_icon} {price_change:+.2f}%</div>
-                    </div>
-                    <div class="metric">
-                        <div class="metric-label">Volume</div>
-                        <div class="metric-value">{int(trading_service.data['Volume'].iloc[-1]):,}</div>
-                        <div class="metric-label">dernières 24h</div>
-                    </div>
-                    <div class="metric">
-                        <div class="metric-label">Haut/Bas du jour</div>
-                        <div class="metric-value">{format_currency(trading_service.data['High'].iloc[-1])}</div>
-                        <div class="metric-label">{format_currency(trading_service.data['Low'].iloc[-1])}</div>
-                    </div>
-                    <div class="metric">
-                        <div class="metric-label">Mise à jour</div>
-                        <div class="metric-value">{datetime.now().strftime("%H:%M:%S")}</div>
-                        <div class="metric-label">Rafraîchissement: {'On' if auto_refresh else 'Off'}</div>
-                    </div>
-                </div>
-            </div>
-            """, unsafe_allow_html=True)
-        
-        # 2. GRAPHIQUE PRINCIPAL
-        # Préparer le graphique en chandeliers
-        fig = go.Figure()
-        fig.add_trace(go.Candlestick(
-            x=trading_service.data.index,
-            open=trading_service.data['Open'],
-            high=trading_service.data['High'],
-            low=trading_service.data['Low'],
-            close=trading_service.data['Close'],
-            name=symbol,
-            increasing_line_color='#10b981',
-            decreasing_line_color='#ef4444'
-        ))
-        
-        # Ajouter les transactions au graphique
-        for transaction in st.session_state.portfolio['transactions']:
-            transaction_time = datetime.strptime(transaction['timestamp'], "%Y-%m-%d %H:%M:%S")
-            if transaction_time >= trading_service.data.index[0] and transaction['symbol'] == symbol:
-                marker_color = '#10b981' if transaction['type'] == 'BUY' else '#ef4444'
-                marker_symbol = 'triangle-up' if transaction['type'] == 'BUY' else 'triangle-down'
-                
-                fig.add_trace(go.Scatter(
-                    x=[transaction_time],
-                    y=[transaction['price']],
-                    mode='markers',
-                    name=f"{transaction['type']} {transaction['quantity']}",
-                    marker=dict(
-                        symbol=marker_symbol,
-                        size=15,
-                        color=marker_color,
-                        line=dict(color='white', width=1)
-                    ),
-                    hovertemplate=f"<b>{transaction['type']}</b><br>" +
-                                  f"Prix: {format_currency(transaction['price'])}<br>" +
-                                  f"Quantité: {transaction['quantity']}<br>" +
-                                  f"Total: {format_currency(transaction['total'])}"
-                ))
-        
-        # Style du graphique
-        fig.update_layout(
-            title=None,
-            height=450,
-            autosize=True,
-            template="plotly_dark",
-            plot_bgcolor='#1e293b',
-            paper_bgcolor='#1e293b',
-            font=dict(color='#e2e8f0'),
-            margin=dict(l=10, r=10, t=10, b=10),
-            legend=dict(
-                orientation="h",
-                yanchor="bottom",
-                y=1.02,
-                xanchor="right",
-                x=1
-            ),
-            xaxis=dict(
-                rangeslider=dict(visible=True, bgcolor='#334155', thickness=0.05),
-                rangeselector=dict(
-                    buttons=list([
-                        dict(count=1, label="1j", step="day", stepmode="backward"),
-                        dict(count=7, label="1s", step="day", stepmode="backward"),
-                        dict(count=1, label="1m", step="month", stepmode="backward"),
-                        dict(step="all", label="Tout")
-                    ]),
-                    bgcolor='#334155',
-                    activecolor='#1e40af'
-                )
+if trading_service is None:
+    with st.spinner("Chargement des données..."):
+        if replay_mode:
+            trading_service = ReplayTradingService(symbol, period, speed=replay_speed)
+        else:
+            trading_service = TradingService(symbol, period, hub=get_quote_hub(), refresh_interval=refresh_interval)
+    st.session_state.trading_service = trading_service
+elif replay_mode and trading_service.clock is not None and trading_service.clock.speed != replay_speed:
+    trading_service.clock.set_speed(replay_speed)
+
+if trading_service.data is None:
+    st.error(f"""
+        Impossible de charger les données pour {symbol}.
+        Veuillez vérifier :
+        - Le symbole est correct
+        - La période sélectionnée
+        - Votre connexion internet
+    """)
+    st.stop()
+
+if len(trading_service.data) < 2:
+    st.warning(f"Pas assez de données pour {symbol}. Essayez une période plus longue.")
+    st.stop()
+
+# Statut du marché : calendrier de la place, ou horloge virtuelle en rejeu
+market_open, market_status = trading_service.market_status()
+
+def render_header():
+    market_open, market_status = trading_service.market_status()
+    status_color = "green" if market_open else "orange"
+    
+    header_placeholder.markdown(f"""
+    <div class="header">
+        <div class="logo">
+            <div class="logo-icon">📈</div>
+            <div class="logo-text">TradeSim Dashboard</div>
+        </div>
+        <div class="market-status">
+            <div class="status-dot" style="background-color: {status_color};"></div>
+            <span>{market_status}</span>
+        </div>
+    </div>
+    """, unsafe_allow_html=True)
+
+# Prix et variation actuels, mis à jour à chaque rafraîchissement des données
+live = {}
+
+def update_live_prices():
+    with span("refresh.indicators"):
+        live['current_price'] = trading_service.data['Close'].iloc[-1]
+        live['price_change'] = trading_service.data['Close'].pct_change().iloc[-1] * 100
+        live['price_change_icon'] = "📈" if live['price_change'] >= 0 else "📉"
+        live['price_change_class'] = "positive" if live['price_change'] >= 0 else "negative"
+
+def refresh_data():
+    # Lecture du flux partagé : aucune requête n'est émise par la session
+    with span("refresh.fetch"):
+        refreshed = trading_service.refresh()
+    if refreshed:
+        update_live_prices()
+    
+    # Exécution des ordres en attente : marché fermé, ils restent en attente
+    with span("refresh.orders"):
+        if trading_service.market_status()[0]:
+            process_orders()
+
+def execute_fill(fill):
+    """Passe l'exécution au portefeuille ; un refus rejette l'ordre au lieu de le perdre"""
+    trade_type = "Achat" if fill['type'] == 'BUY' else "Vente"
+    if update_portfolio(symbol, fill['price'], fill['quantity'], trade_type):
+        return True
+    notify("warning", f"Ordre n°{fill['order_id']} ({trade_type} de {fill['quantity']} {symbol}) rejeté")
+    return False
+
+def process_orders():
+    order_book = st.session_state.order_book
+    # Barres terminées, avec leurs plus haut et plus bas (heures de cotation seulement en
+    # intraday), puis dernier prix pour la barre en cours
+    bars = trading_service.data.iloc[:-1]
+    if is_intraday(trading_service.interval):
+        bars = bars[trading_service.calendar.session_positions(bars.index) >= 0]
+    order_book.process_bars(symbol, bars, execute=execute_fill)
+    order_book.process_price(symbol, trading_service.now(), live['current_price'], execute=execute_fill)
+
+update_live_prices()
+current_price = live['current_price']
+
+# 4. FORMULAIRE DE PASSAGE D'ORDRE
+# Rendu une seule fois par exécution : une soumission relance le script
+with order_form_placeholder.container():
+    st.markdown(f"""
+    <div class="bento-card span-1 height-1">
+        <div class="card-title">
+            <span>Passer un ordre</span>
+            <div class="card-title-icon">📋</div>
+        </div>
+    """, unsafe_allow_html=True)
+
+    # Formulaire pour passer un ordre
+    with st.form("trade_form", clear_on_submit=False):
+        cols = st.columns([1, 1])
+        with cols[0]:
+            st.markdown("<p style='margin: 0 0 5px 0; color: #94a3b8;'>Type</p>", unsafe_allow_html=True)
+            trade_type = st.radio(
+                "",
+                ["Achat", "Vente"], 
+                horizontal=True,
+                label_visibility="collapsed"
             )
+
+        with cols[1]:
+            st.markdown("<p style='margin: 0 0 5px 0; color: #94a3b8;'>Quantité</p>", unsafe_allow_html=True)
+            quantity = st.number_input("", min_value=1, value=1, step=1, label_visibility="collapsed")
+
+        # Type d'ordre et prix pour les ordres limites et stops
+        order_cols = st.columns([1, 1])
+        with order_cols[0]:
+            order_type_label = st.selectbox("Ordre", list(ORDER_TYPES), index=0)
+        with order_cols[1]:
+            time_in_force = st.selectbox("Validité", ["Jour", "Jusqu'à annulation"], index=0)
+        price_cols = st.columns([1, 1])
+        with price_cols[0]:
+            limit_price = st.number_input("Limite", min_value=0.0, value=float(current_price), step=0.01, format="%.2f")
+        with price_cols[1]:
+            stop_price = st.number_input("Stop", min_value=0.0, value=float(current_price), step=0.01, format="%.2f")
+
+        # Valeur estimée
+        est_value = format_currency(quantity * current_price) if current_price else "-- --"
+        st.markdown(f"<p style='color: #94a3b8; margin: 10px 0 5px 0;'>Valeur estimée: <span style='color: #f8fafc;'>{est_value}</span></p>", unsafe_allow_html=True)
+
+        # Bouton selon le type d'ordre
+        button_text = trade_type
+        button_color = "primary" if trade_type == "Achat" else "secondary"
+
+        # Statut du marché pour le bouton
+        button_disabled = not market_open
+
+        submit_button = st.form_submit_button(
+            button_text, 
+            type=button_color,
+            disabled=button_disabled,
+            use_container_width=True
         )
-        
-        with chart_placeholder.container():
-            st.markdown('<div class="bento-card span-3 height-3">', unsafe_allow_html=True)
-            st.markdown(f"""
-                <div class="card-title">
-                    <span>{symbol} - Graphique des prix</span>
-                    <div class="card-title-icon">{price_change_icon}</div>
-                </div>
-                <div style="width:100%; height:450px;">
-            """, unsafe_allow_html=True)
-            st.plotly_chart(fig, use_container_width=True, config={'displayModeBar': False, 'responsive': True})
-            st.markdown('</div></div>', unsafe_allow_html=True)
-        
-        # 3. INFORMATIONS SUR L'ACTION
-        # Obtenir un nom d'entreprise pour le symbole
-        company_name = "Apple Inc." if symbol == "AAPL" else symbol
-        
-        # Préparer une mini-tendance
-        mini_fig = go.Figure()
-        mini_fig.add_trace(go.Scatter(
-            x=trading_service.data.index[-20:],
-            y=trading_service.data['Close'][-20:],
-            line=dict(color='#4f46e5', width=2),
-            fill='tozeroy',
-            fillcolor='rgba(79, 70, 229, 0.1)'
-        ))
-        
-        mini_fig.update_layout(
-            height=120,
-            showlegend=False,
-            margin=dict(l=0, r=0, t=0, b=0),
-            plot_bgcolor='#1e293b',
-            paper_bgcolor='#1e293b',
-            font=dict(color='#e2e8f0'),
-            xaxis=dict(showticklabels=False, showgrid=False, zeroline=False),
-            yaxis=dict(showticklabels=False, showgrid=False, zeroline=False)
-        )
-        
-        with stock_info_placeholder.container():
-            st.markdown(f"""
-            <div class="bento-card span-1 height-2">
-                <div class="card-title">
-                    <span>{symbol}</span>
-                    <div class="card-title-icon">ℹ️</div>
+
+        if not market_open:
+            st.markdown("<p style='color: #f87171; font-size: 0.8rem; margin: 5px 0 0 0;'>Marché fermé</p>", unsafe_allow_html=True)
+
+    st.markdown("</div>", unsafe_allow_html=True)
+
+# Traitement du formulaire
+if submit_button:
+    order_type = ORDER_TYPES[order_type_label]
+    if order_type == "market":
+        update_portfolio(symbol, live['current_price'], quantity, trade_type)
+    else:
+        try:
+            order = st.session_state.order_book.submit(
+                symbol,
+                "BUY" if trade_type == "Achat" else "SELL",
+                quantity,
+                order_type,
+                limit_price=limit_price if order_type in ("limit", "stop_limit") else None,
+                stop_price=stop_price if order_type in ("stop", "stop_limit") else None,
+                time_in_force="DAY" if time_in_force == "Jour" else "GTC",
+                timestamp=trading_service.now()
+            )
+            st.success(f"Ordre {order_type_label.lower()} n°{order.order_id} enregistré ({st.session_state.order_book.active_count} en attente)")
+        except ValueError as e:
+            st.error(f"Ordre refusé : {str(e)}")
+
+# 1. MÉTRIQUES PRINCIPALES
+def render_metrics():
+    with metrics_placeholder.container():
+        st.markdown(f"""
+        <div class="bento-card span-4 height-1">
+            <div style="display: grid; grid-template-columns: repeat(4, 1fr); gap: 20px;">
+                <div class="metric">
+                    <div class="metric-label">Prix actuel</div>
+                    <div class="metric-value">{format_currency(live['current_price'])}</div>
+                    <div class="metric-change {live['price_change_class']}">{live['price_change_icon']} {live['price_change']:+.2f}%</div>
                 </div>
-                <p style="font-size: 1.1rem; margin: 0 0 15px 0;">{company_name}</p>
-            """, unsafe_allow_html=True)
-            
-            st.plotly_chart(mini_fig, use_container_width=True, config={'displayModeBar': False})
-            
-            # Calculer quelques métriques supplémentaires
-            avg_price = trading_service.data['Close'].mean()
-            max_price = trading_service.data['High'].max()
-            trend = "Haussière" if price_change >= 0 else "Baissière"
-            trend_color = "#10b981" if price_change >= 0 else "#ef4444"
-            
-            st.markdown(f"""
-                <div style="margin-top: 15px;">
-                    <table style="width: 100%; font-size: 0.9rem;">
-                        <tr>
-                            <td style="color: #94a3b8;">Ouverture</td>
-                            <td style="text-align: right;">{format_currency(trading_service.data['Open'].iloc[-1])}</td>
-                        </tr>
-                        <tr>
-                            <td style="color: #94a3b8;">Haut</td>
-                            <td style="text-align: right;">{format_currency(trading_service.data['High'].iloc[-1])}</td>
-                        </tr>
-                        <tr>
-                            <td style="color: #94a3b8;">Bas</td>
-                            <td style="text-align: right;">{format_currency(trading_service.data['Low'].iloc[-1])}</td>
-                        </tr>
-                        <tr>
-                            <td style="color: #94a3b8;">Prix moyen</td>
-                            <td style="text-align: right;">{format_currency(avg_price)}</td>
-                        </tr>
-                        <tr>
-                            <td style="color: #94a3b8;">Maximum</td>
-                            <td style="text-align: right;">{format_currency(max_price)}</td>
-                        </tr>
-                        <tr>
-                            <td style="color: #94a3b8;">Tendance</td>
-                            <td style="text-align: right; color: {trend_color};">{trend}</td>
-                        </tr>
-                    </table>
+                <div class="metric">
+                    <div class="metric-label">Volume</div>
+                    <div class="metric-value">{int(trading_service.data['Volume'].iloc[-1]):,}</div>
+                    <div class="metric-label">dernières 24h</div>
                 </div>
-            </div>
-            """, unsafe_allow_html=True)
-        
-        # 4. FORMULAIRE DE PASSAGE D'ORDRE
-        with order_form_placeholder.container():
-            st.markdown(f"""
-            <div class="bento-card span-1 height-1">
-                <div class="card-title">
-                    <span>Passer un ordre</span>
-                    <div class="card-title-icon">📋</div>
+                <div class="metric">
+                    <div class="metric-label">Haut/Bas du jour</div>
+                    <div class="metric-value">{format_currency(trading_service.data['High'].iloc[-1])}</div>
+                    <div class="metric-label">{format_currency(trading_service.data['Low'].iloc[-1])}</div>
                 </div>
-            """, unsafe_allow_html=True)
-            
-            # Formulaire pour passer un ordre
-            with st.form("trade_form", clear_on_submit=False):
-                cols = st.columns([1, 1])
-                with cols[0]:
-                    st.markdown("<p style='margin: 0 0 5px 0; color: #94a3b8;'>Type</p>", unsafe_allow_html=True)
-                    trade_type = st.radio(
-                        "",
-                        ["Achat", "Vente"], 
-                        horizontal=True,
-                        label_visibility="collapsed"
-                    )
-                
-                with cols[1]:
-                    st.markdown("<p style='margin: 0 0 5px 0; color: #94a3b8;'>Quantité</p>", unsafe_allow_html=True)
-                    quantity = st.number_input("", min_value=1, value=1, step=1, label_visibility="collapsed")
-                
-                # Valeur estimée
-                est_value = format_currency(quantity * current_price) if current_price else "-- --"
-                st.markdown(f"<p style='color: #94a3b8; margin: 10px 0 5px 0;'>Valeur estimée: <span style='color: #f8fafc;'>{est_value}</span></p>", unsafe_allow_html=True)
-                
-                # Bouton selon le type d'ordre
-                button_text = trade_type
-                button_color = "primary" if trade_type == "Achat" else "secondary"
-                
-                # Statut du marché pour le bouton
-                button_disabled = not market_open
-                
-                submit_button = st.form_submit_button(
-                    button_text, 
-                    type=button_color,
-                    disabled=button_disabled,
-                    use_container_width=True
-                )
-                
-                if not market_open:
-                    st.markdown("<p style='color: #f87171; font-size: 0.8rem; margin: 5px 0 0 0;'>Marché fermé</p>", unsafe_allow_html=True)
-            
-            st.markdown("</div>", unsafe_allow_html=True)
-        
-        # 5. HISTORIQUE DES TRANSACTIONS
-        with transactions_placeholder.container():
-            st.markdown(f"""
-            <div class="bento-card span-1 height-2">
-                <div class="card-title">
-                    <span>Transactions récentes</span>
-                    <div class="card-title-icon">🔄</div>
+                <div class="metric">
+                    <div class="metric-label">Mise à jour</div>
+                    <div class="metric-value">{trading_service.now().strftime("%H:%M:%S")}</div>
+                    <div class="metric-label">Rafraîchissement: {'On' if auto_refresh else 'Off'}</div>
                 </div>
-                <div class="table-container">
-            """, unsafe_allow_html=True)
-            
-            if st.session_state.portfolio['transactions']:
-                transactions_df = pd.DataFrame(st.session_state.portfolio['transactions'][-10:])
-                transactions_df['timestamp'] = pd.to_datetime(transactions_df['timestamp'])
-                transactions_df = transactions_df.sort_values('timestamp', ascending=False)
-                
-                # Créer un tableau HTML stylisé
-                html_table = "<table style='width: 100%;'>"
-                
-                # En-tête du tableau
-                html_table += """
+            </div>
+        </div>
+        """, unsafe_allow_html=True)
+
+# 2. GRAPHIQUE PRINCIPAL
+def render_chart():
+    # Préparer le graphique en chandeliers, agrégés en un nombre borné de barres
+    chart_data = trading_service.chart_data(window=CHART_ZOOMS[chart_zoom])
+    transactions = st.session_state.portfolio.ledger.symbol_transactions(symbol, start=chart_data.index[0])
+    with span("figure.price"):
+        fig = price_figure(chart_data, transactions, symbol)
+    
+    with chart_placeholder.container():
+        st.markdown('<div class="bento-card span-3 height-3">', unsafe_allow_html=True)
+        st.markdown(f"""
+            <div class="card-title">
+                <span>{symbol} - Graphique des prix</span>
+                <div class="card-title-icon">{live['price_change_icon']}</div>
+            </div>
+            <div style="width:100%; height:450px;">
+        """, unsafe_allow_html=True)
+        st.plotly_chart(fig, use_container_width=True, config={'displayModeBar': False, 'responsive': True})
+        st.markdown('</div></div>', unsafe_allow_html=True)
+
+# 3. INFORMATIONS SUR L'ACTION
+def render_stock_info():
+    # Obtenir un nom d'entreprise pour le symbole, sans bloquer sur le chargement des métadonnées
+    company_name = trading_service.get_metadata(wait=False).get('name') or symbol
+    
+    # Préparer une mini-tendance
+    with span("figure.trend"):
+        mini_fig = trend_figure(trading_service.data)
+    
+    with stock_info_placeholder.container():
+        st.markdown(f"""
+        <div class="bento-card span-1 height-2">
+            <div class="card-title">
+                <span>{symbol}</span>
+                <div class="card-title-icon">ℹ️</div>
+            </div>
+            <p style="font-size: 1.1rem; margin: 0 0 15px 0;">{company_name}</p>
+        """, unsafe_allow_html=True)
+
+        st.plotly_chart(mini_fig, use_container_width=True, config={'displayModeBar': False})
+
+        # Calculer quelques métriques supplémentaires
+        avg_price = trading_service.data['Close'].mean()
+        max_price = trading_service.data['High'].max()
+        trend = "Haussière" if live['price_change'] >= 0 else "Baissière"
+        trend_color = "#10b981" if live['price_change'] >= 0 else "#ef4444"
+
+        st.markdown(f"""
+            <div style="margin-top: 15px;">
+                <table style="width: 100%; font-size: 0.9rem;">
+                    <tr>
+                        <td style="color: #94a3b8;">Ouverture</td>
+                        <td style="text-align: right;">{format_currency(trading_service.data['Open'].iloc[-1])}</td>
+                    </tr>
+                    <tr>
+                        <td style="color: #94a3b8;">Haut</td>
+                        <td style="text-align: right;">{format_currency(trading_service.data['High'].iloc[-1])}</td>
+                    </tr>
+                    <tr>
+                        <td style="color: #94a3b8;">Bas</td>
+                        <td style="text-align: right;">{format_currency(trading_service.data['Low'].iloc[-1])}</td>
+                    </tr>
+                    <tr>
+                        <td style="color: #94a3b8;">Prix moyen</td>
+                        <td style="text-align: right;">{format_currency(avg_price)}</td>
+                    </tr>
+                    <tr>
+                        <td style="color: #94a3b8;">Maximum</td>
+                        <td style="text-align: right;">{format_currency(max_price)}</td>
+                    </tr>
+                    <tr>
+                        <td style="color: #94a3b8;">Tendance</td>
+                        <td style="text-align: right; color: {trend_color};">{trend}</td>
+                    </tr>
+                </table>
+            </div>
+        </div>
+        """, unsafe_allow_html=True)
+
+# 5. HISTORIQUE DES TRANSACTIONS
+def render_transactions():
+    with transactions_placeholder.container():
+        st.markdown(f"""
+        <div class="bento-card span-1 height-2">
+            <div class="card-title">
+                <span>Transactions récentes</span>
+                <div class="card-title-icon">🔄</div>
+            </div>
+            <div class="table-container">
+        """, unsafe_allow_html=True)
+
+        if len(st.session_state.portfolio.ledger.transactions) > 0:
+            transactions_df = st.session_state.portfolio.ledger.transactions_frame(last=10)
+            transactions_df = transactions_df.sort_values('timestamp', ascending=False)
+
+            # Créer un tableau HTML stylisé
+            html_table = "<table style='width: 100%;'>"
+
+            # En-tête du tableau
+            html_table += """
+            <tr>
+                <th>Date</th>
+                <th>Type</th>
+                <th>Qté</th>
+                <th>Prix</th>
+            </tr>
+            """
+
+            # Lignes du tableau
+            for i, row in transactions_df.iterrows():
+                badge_class = "badge-buy" if row['type'] == "BUY" else "badge-sell"
+                badge_text = "ACHAT" if row['type'] == "BUY" else "VENTE"
+
+                html_table += f"""
                 <tr>
-                    <th>Date</th>
-                    <th>Type</th>
-                    <th>Qté</th>
-                    <th>Prix</th>
+                    <td>{row['timestamp'].strftime('%d/%m %H:%M')}</td>
+                    <td><span class="badge {badge_class}">{badge_text}</span></td>
+                    <td>{row['quantity']}</td>
+                    <td>{format_currency(row['price'])}</td>
                 </tr>
                 """
-                
-                # Lignes du tableau
-                for i, row in transactions_df.iterrows():
-                    badge_class = "badge-buy" if row['type'] == "BUY" else "badge-sell"
-                    badge_text = "ACHAT" if row['type'] == "BUY" else "VENTE"
-                    
-                    html_table += f"""
-                    <tr>
-                        <td>{row['timestamp'].strftime('%d/%m %H:%M')}</td>
-                        <td><span class="badge {badge_class}">{badge_text}</span></td>
-                        <td>{row['quantity']}</td>
-                        <td>{format_currency(row['price'])}</td>
-                    </tr>
-                    """
-                
-                html_table += "</table>"
-                st.markdown(html_table, unsafe_allow_html=True)
-            else:
-                st.markdown("<p style='color: #94a3b8; text-align: center; margin-top: 30px;'>Aucune transaction</p>", unsafe_allow_html=True)
-            
-            st.markdown("</div></div>", unsafe_allow_html=True)
-        
-        # 6. PERFORMANCE DU PORTEFEUILLE
-        with performance_placeholder.container():
-            st.markdown(f"""
-            <div class="bento-card span-4 height-1">
-                <div class="card-title">
-                    <span>Performance du portefeuille</span>
-                    <div class="card-title-icon">📊</div>
-                </div>
-            """, unsafe_allow_html=True)
-            
-            if len(st.session_state.portfolio['history']) > 0:
-                # Préparer les données pour le graphique de performance
-                history_df = pd.DataFrame(st.session_state.portfolio['history'])
-                history_df['timestamp'] = pd.to_datetime(history_df['timestamp'])
-                
-                # Créer le graphique
-                perf_fig = go.Figure()
-                perf_fig.add_trace(go.Scatter(
-                    x=history_df['timestamp'],
-                    y=history_df['total_value'],
-                    name='Valeur du portefeuille',
-                    line=dict(color='#4f46e5', width=2)
-                ))
-                
-                # Ajouter une ligne de référence pour le capital initial
-                perf_fig.add_hline(
-                    y=10000, 
-                    line=dict(color='gray', dash='dash'),
-                    annotation_text="Capital initial"
-                )
-                
-                # Styling
-                perf_fig.update_layout(
-                    height=180,
-                    autosize=True,
-                    template="plotly_dark",
-                    plot_bgcolor='#1e293b',
-                    paper_bgcolor='#1e293b',
-                    font=dict(color='#e2e8f0'),
-                    margin=dict(l=10, r=10, t=10, b=10),
-                    xaxis=dict(showgrid=False),
-                    yaxis=dict(showgrid=False, tickformat='$,.0f')
-                )
-                
-                st.plotly_chart(perf_fig, use_container_width=True, config={'displayModeBar': False, 'responsive': True})
-            else:
-                st.markdown("<p style='color: #94a3b8; text-align: center; margin: 50px 0;'>Effectuez des transactions pour voir l'évolution de votre portefeuille</p>", unsafe_allow_html=True)
-            
-            st.markdown("</div>", unsafe_allow_html=True)
-        
-        # Traitement du formulaire
-        if submit_button:
-            update_portfolio(symbol, current_price, quantity, trade_type)
-        
-        # Attendre avant de mettre à jour
-        if not auto_refresh:
-            break
-            
-        time.sleep(refresh_interval)
-        
-    except Exception as e:
-        st.error(f"Erreur lors de la mise à jour : {str(e)}")
-        break 
\ No newline at end of file
+
+            html_table += "</table>"
+            st.markdown(html_table, unsafe_allow_html=True)
+        else:
+            st.markdown("<p style='color: #94a3b8; text-align: center; margin-top: 30px;'>Aucune transaction</p>", unsafe_allow_html=True)
+
+        st.markdown("</div></div>", unsafe_allow_html=True)
+
+# 6. PERFORMANCE DU PORTEFEUILLE
+def render_performance():
+    with performance_placeholder.container():
+        st.markdown(f"""
+        <div class="bento-card span-4 height-1">
+            <div class="card-title">
+                <span>Performance du portefeuille</span>
+                <div class="card-title-icon">📊</div>
+            </div>
+        """, unsafe_allow_html=True)
+
+        if len(st.session_state.portfolio.ledger.history) > 0:
+            # Préparer les données pour le graphique de performance
+            history_df = st.session_state.portfolio.ledger.history_frame()
+
+            # Créer le graphique
+            with span("figure.performance"):
+                perf_fig = performance_figure(history_df, st.session_state.portfolio.initial_cash)
+
+            st.plotly_chart(perf_fig, use_container_width=True, config={'displayModeBar': False, 'responsive': True})
+        else:
+            st.markdown("<p style='color: #94a3b8; text-align: center; margin: 50px 0;'>Effectuez des transactions pour voir l'évolution de votre portefeuille</p>", unsafe_allow_html=True)
+
+        st.markdown("</div>", unsafe_allow_html=True)
+
+# 7. MÉTRIQUES DE PERFORMANCE (optionnel)
+def render_debug():
+    summary = default_registry.summary()
+    with debug_placeholder.container():
+        st.markdown("""
+        <div class="bento-card span-4 height-1">
+            <div class="card-title">
+                <span>Métriques de performance</span>
+                <div class="card-title-icon">⏱️</div>
+            </div>
+        """, unsafe_allow_html=True)
+        if summary:
+            metrics_df = pd.DataFrame.from_dict(summary, orient='index')
+            metrics_df[['mean', 'p50', 'p95', 'p99', 'max']] *= 1000
+            st.dataframe(
+                metrics_df.rename(columns={'count': 'Appels', 'mean': 'Moyenne (ms)', 'p50': 'p50 (ms)',
+                                           'p95': 'p95 (ms)', 'p99': 'p99 (ms)', 'max': 'Max (ms)'}),
+                use_container_width=True
+            )
+        st.markdown("</div>", unsafe_allow_html=True)
+
+def export_metrics():
+    try:
+        default_registry.write_prometheus(settings.METRICS_PATH)
+    except OSError as e:
+        logging.getLogger(__name__).warning("Export des métriques impossible : %s", e)
+
+# Chaque panneau est redessiné à sa cadence, seulement si ses données d'entrée ont changé :
+# la mini-tendance à l'arrivée d'une nouvelle barre, les transactions après une opération.
+# La boucle du planificateur occupe le script jusqu'au prochain rerun (pas de st.fragment
+# en Streamlit 1.25, voir services/render_scheduler.py)
+portfolio = st.session_state.portfolio
+scheduler = RenderScheduler(metrics=default_registry)
+scheduler.add("données", refresh_data, cadence=refresh_interval)
+scheduler.add("en-tête", render_header, lambda: trading_service.market_status(), cadence=refresh_interval)
+scheduler.add("métriques", render_metrics, lambda: trading_service.data_version, cadence=refresh_interval)
+scheduler.add("graphique", render_chart,
+              lambda: (trading_service.data_version, portfolio.version), cadence=refresh_interval)
+scheduler.add("informations", render_stock_info,
+              lambda: (trading_service.data.index[-1], trading_service.get_metadata(wait=False).get('name')),
+              cadence=refresh_interval)
+scheduler.add("transactions", render_transactions, lambda: portfolio.version, cadence=1)
+scheduler.add("performance", render_performance, lambda: portfolio.version, cadence=5)
+if show_metrics:
+    scheduler.add("débogage", render_debug, cadence=5)
+if settings.METRICS_PATH:
+    scheduler.add("export des métriques", export_metrics, cadence=settings.METRICS_EXPORT_INTERVAL)
+
+try:
+    scheduler.run(forever=auto_refresh)
+except Exception as e:
+    st.error(f"Erreur lors de la mise à jour : {str(e)}")
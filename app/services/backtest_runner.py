@@ -0,0 +1,158 @@
+import logging
+import os
+import time
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from multiprocessing import shared_memory
+import numpy as np
+import pandas as pd
+from .parameter_sweep import evaluate_signals, rsi_combos, sma_crossover_combos
+
+logger = logging.getLogger(__name__)
+
+
+def sma_crossover_signals(close, params_list):
+    """Signaux (temps × combinaisons) de la stratégie de croisement de moyennes mobiles"""
+    combos = [(p['short_window'], p['long_window']) for p in params_list]
+    return sma_crossover_combos(close, combos)(slice(None))
+
+
+def rsi_signals(close, params_list):
+    """Signaux (temps × combinaisons) de la stratégie RSI"""
+    combos = [(p.get('window', 14), p.get('overbought', 70), p.get('oversold', 30)) for p in params_list]
+    return rsi_combos(close, combos)(slice(None))
+
+
+# Stratégies disponibles, sous les noms utilisés dans les jobs
+STRATEGIES = {
+    'sma_crossover': sma_crossover_signals,
+    'rsi': rsi_signals,
+}
+
+# État des processus de calcul : vue sur les prix en mémoire partagée
+_worker_shm = None
+_worker_prices = None
+_worker_offsets = None
+
+
+def _attach_shared_memory(name):
+    try:
+        return shared_memory.SharedMemory(name=name, track=False)
+    except TypeError:
+        # Avant Python 3.13 : le segment est enregistré auprès du resource_tracker du
+        # processus parent, qui le libère lui-même avec unlink()
+        return shared_memory.SharedMemory(name=name)
+
+
+def _init_worker(shm_name, size, offsets):
+    global _worker_shm, _worker_prices, _worker_offsets
+    _worker_shm = _attach_shared_memory(shm_name)
+    _worker_prices = np.ndarray((size,), dtype=np.float64, buffer=_worker_shm.buf)
+    _worker_offsets = offsets
+
+
+def _run_batch(symbol, strategy, params_list, initial_capital):
+    """Évalue un lot de paramètres d'une stratégie sur un symbole (exécuté dans un processus de calcul)"""
+    start, length = _worker_offsets[symbol]
+    close = _worker_prices[start:start + length]
+    signals = STRATEGIES[strategy](close, params_list)
+    metrics = evaluate_signals(close, signals, initial_capital)
+    return [
+        {
+            'symbol': symbol,
+            'strategy': strategy,
+            'params': params,
+            'final_capital': float(metrics['final_capital'][i]),
+            'total_return': float(metrics['total_return'][i]),
+            'sharpe_ratio': float(metrics['sharpe_ratio'][i]),
+            'max_drawdown': float(metrics['max_drawdown'][i]),
+        }
+        for i, params in enumerate(params_list)
+    ]
+
+
+class BacktestRunner:
+    """Exécute des backtests (symbole, stratégie, paramètres) sur un pool de processus
+
+    Les prix de clôture de tous les symboles sont copiés une seule fois dans un segment de
+    mémoire partagée : les processus de calcul les lisent sans sérialisation de DataFrame.
+    Les jobs d'un même symbole et d'une même stratégie sont regroupés par lots évalués de
+    façon vectorisée.
+    """
+
+    def __init__(self, max_workers=None, initial_capital=10000.0, batch_size=64):
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.initial_capital = initial_capital
+        self.batch_size = batch_size
+        self.stats = {}
+
+    @staticmethod
+    def _close_array(prices):
+        if isinstance(prices, pd.DataFrame):
+            prices = prices['Close']
+        return np.asarray(prices, dtype=np.float64)
+
+    def _batches(self, jobs):
+        groups = defaultdict(list)
+        for symbol, strategy, params in jobs:
+            if strategy not in STRATEGIES:
+                raise ValueError(f"Stratégie inconnue : {strategy}")
+            groups[(symbol, strategy)].append(params)
+        for (symbol, strategy), params_list in groups.items():
+            for start in range(0, len(params_list), self.batch_size):
+                yield symbol, strategy, params_list[start:start + self.batch_size]
+
+    def run(self, prices, jobs):
+        """Lance les jobs et retourne les résultats au fur et à mesure qu'ils se terminent
+
+        prices : {symbole: clôtures (Series, tableau ou DataFrame avec une colonne Close)}
+        jobs : itérable de (symbole, stratégie, dictionnaire de paramètres)
+        """
+        arrays = {symbol: self._close_array(p) for symbol, p in prices.items()}
+        batches = list(self._batches(jobs))
+        missing = {symbol for symbol, _, _ in batches} - set(arrays)
+        if missing:
+            raise ValueError(f"Prix manquants pour : {', '.join(sorted(missing))}")
+
+        offsets = {}
+        position = 0
+        for symbol, close in arrays.items():
+            offsets[symbol] = (position, len(close))
+            position += len(close)
+
+        shm = shared_memory.SharedMemory(create=True, size=max(position, 1) * 8)
+        completed = 0
+        start = time.perf_counter()
+        try:
+            shared_prices = np.ndarray((position,), dtype=np.float64, buffer=shm.buf)
+            for symbol, close in arrays.items():
+                offset, length = offsets[symbol]
+                shared_prices[offset:offset + length] = close
+            del shared_prices
+
+            with ProcessPoolExecutor(max_workers=self.max_workers, initializer=_init_worker,
+                                     initargs=(shm.name, position, offsets)) as executor:
+                futures = [executor.submit(_run_batch, symbol, strategy, params_list, self.initial_capital)
+                           for symbol, strategy, params_list in batches]
+                try:
+                    for future in as_completed(futures):
+                        for result in future.result():
+                            completed += 1
+                            yield result
+                except GeneratorExit:
+                    # Lecture interrompue par l'appelant : les lots non démarrés sont abandonnés
+                    for future in futures:
+                        future.cancel()
+                    raise
+        finally:
+            elapsed = time.perf_counter() - start
+            self.stats = {
+                'jobs': completed,
+                'elapsed': elapsed,
+                'jobs_per_second': completed / elapsed if elapsed > 0 else 0.0,
+                'workers': self.max_workers,
+            }
+            logger.info("%d backtests en %.2fs (%.0f jobs/s, %d processus)",
+                        completed, elapsed, self.stats['jobs_per_second'], self.max_workers)
+            shm.close()
+            shm.unlink()
@@ -0,0 +1,141 @@
+import numpy as np
+import pandas as pd
+import plotly.graph_objects as go
+
+# Construction des figures Plotly du tableau de bord, indépendante de Streamlit
+
+TRADE_MARKERS = (
+    ('BUY', '#10b981', 'triangle-up'),
+    ('SELL', '#ef4444', 'triangle-down'),
+)
+
+
+def price_figure(chart_data, transactions, symbol):
+    """Chandeliers des barres agrégées, avec une trace de marqueurs par sens d'opération"""
+    fig = go.Figure()
+    fig.add_trace(go.Candlestick(
+        x=chart_data.index,
+        open=chart_data['Open'],
+        high=chart_data['High'],
+        low=chart_data['Low'],
+        close=chart_data['Close'],
+        name=symbol,
+        increasing_line_color='#10b981',
+        decreasing_line_color='#ef4444'
+    ))
+
+    # Ajouter les transactions au graphique : une seule trace par sens d'opération
+    for type_code, (trade_type, marker_color, marker_symbol) in enumerate(TRADE_MARKERS):
+        trades = transactions[transactions['type'] == type_code]
+        if len(trades) == 0:
+            continue
+        # Opérations horodatées en UTC : affichées dans le fuseau des chandeliers
+        times = pd.DatetimeIndex(trades['timestamp'])
+        if chart_data.index.tz is not None:
+            times = times.tz_localize('UTC').tz_convert(chart_data.index.tz)
+        fig.add_trace(go.Scattergl(
+            x=times,
+            y=trades['price'],
+            customdata=np.column_stack((trades['quantity'], trades['total'])),
+            mode='markers',
+            name=trade_type,
+            marker=dict(
+                symbol=marker_symbol,
+                size=15,
+                color=marker_color,
+                line=dict(color='white', width=1)
+            ),
+            hovertemplate=f"<b>{trade_type}</b><br>" +
+                          "Prix: $%{y:,.2f}<br>" +
+                          "Quantité: %{customdata[0]:d}<br>" +
+                          "Total: $%{customdata[1]:,.2f}<extra></extra>"
+        ))
+
+    # Style du graphique
+    fig.update_layout(
+        title=None,
+        height=450,
+        autosize=True,
+        template="plotly_dark",
+        plot_bgcolor='#1e293b',
+        paper_bgcolor='#1e293b',
+        font=dict(color='#e2e8f0'),
+        margin=dict(l=10, r=10, t=10, b=10),
+        legend=dict(
+            orientation="h",
+            yanchor="bottom",
+            y=1.02,
+            xanchor="right",
+            x=1
+        ),
+        xaxis=dict(
+            rangeslider=dict(visible=True, bgcolor='#334155', thickness=0.05),
+            rangeselector=dict(
+                buttons=list([
+                    dict(count=1, label="1j", step="day", stepmode="backward"),
+                    dict(count=7, label="1s", step="day", stepmode="backward"),
+                    dict(count=1, label="1m", step="month", stepmode="backward"),
+                    dict(step="all", label="Tout")
+                ]),
+                bgcolor='#334155',
+                activecolor='#1e40af'
+            )
+        )
+    )
+    return fig
+
+
+def trend_figure(data, bars=20):
+    """Mini-tendance des `bars` dernières clôtures"""
+    fig = go.Figure()
+    fig.add_trace(go.Scatter(
+        x=data.index[-bars:],
+        y=data['Close'][-bars:],
+        line=dict(color='#4f46e5', width=2),
+        fill='tozeroy',
+        fillcolor='rgba(79, 70, 229, 0.1)'
+    ))
+
+    fig.update_layout(
+        height=120,
+        showlegend=False,
+        margin=dict(l=0, r=0, t=0, b=0),
+        plot_bgcolor='#1e293b',
+        paper_bgcolor='#1e293b',
+        font=dict(color='#e2e8f0'),
+        xaxis=dict(showticklabels=False, showgrid=False, zeroline=False),
+        yaxis=dict(showticklabels=False, showgrid=False, zeroline=False)
+    )
+    return fig
+
+
+def performance_figure(history, initial_cash):
+    """Évolution de la valeur du portefeuille, avec le capital initial en référence"""
+    fig = go.Figure()
+    fig.add_trace(go.Scatter(
+        x=history['timestamp'],
+        y=history['total_value'],
+        name='Valeur du portefeuille',
+        line=dict(color='#4f46e5', width=2)
+    ))
+
+    # Ajouter une ligne de référence pour le capital initial
+    fig.add_hline(
+        y=initial_cash,
+        line=dict(color='gray', dash='dash'),
+        annotation_text="Capital initial"
+    )
+
+    # Styling
+    fig.update_layout(
+        height=180,
+        autosize=True,
+        template="plotly_dark",
+        plot_bgcolor='#1e293b',
+        paper_bgcolor='#1e293b',
+        font=dict(color='#e2e8f0'),
+        margin=dict(l=10, r=10, t=10, b=10),
+        xaxis=dict(showgrid=False),
+        yaxis=dict(showgrid=False, tickformat='$,.0f')
+    )
+    return fig
@@ -0,0 +1,161 @@
+import re
+import zlib
+import numpy as np
+import pandas as pd
+from .lazy_import import LazyModule
+from .market_cache import trim_to_period
+from .trading_calendar import calendar_for_symbol
+
+# Importé au premier téléchargement : une exécution servie par le cache ne le charge jamais
+yf = LazyModule('yfinance')
+
+TRADING_DAYS = 252
+MINUTES_PER_SESSION = 390
+
+
+class DataProvider:
+    """Source de barres OHLCV utilisée par MarketDataLoader
+
+    history() retourne les barres d'une période (period) ou postérieures à une date (start),
+    indexées par des horodatages tz-aware, avec les colonnes Open, High, Low, Close, Volume.
+    `name` distingue les caches disque des différentes sources.
+    """
+
+    name = None
+
+    def history(self, symbol, period=None, interval='1d', start=None):
+        raise NotImplementedError
+
+
+class YahooFinanceProvider(DataProvider):
+    """Barres ajustées de Yahoo Finance, pré et post-marché compris"""
+
+    name = 'yahoo'
+
+    def history(self, symbol, period=None, interval='1d', start=None):
+        ticker = yf.Ticker(symbol)
+        if start is not None:
+            return ticker.history(start=start, interval=interval, auto_adjust=True, prepost=True)
+        return ticker.history(period=period, interval=interval, auto_adjust=True, prepost=True)
+
+
+def _interval_minutes(interval):
+    match = re.fullmatch(r'(\d+)(m|h|d)', interval)
+    if match is None:
+        raise ValueError(f"Intervalle non supporté : {interval}")
+    count, unit = int(match.group(1)), match.group(2)
+    return count * {'m': 1, 'h': 60, 'd': MINUTES_PER_SESSION}[unit]
+
+
+class SyntheticProvider(DataProvider):
+    """Barres OHLCV synthétiques, déterministes et générées sans réseau
+
+    Les clôtures suivent un mouvement brownien géométrique avec sauts (processus de
+    Poisson) et deux régimes de volatilité (chaîne de Markov à deux états). Chaque symbole
+    a sa propre graine dérivée de `seed`. Les barres journalières partent de la première
+    séance du calendrier de la place du symbole : une même séance a toujours la même valeur,
+    quelle que soit la période demandée, ce qui rend les mises à jour incrémentales cohérentes.
+    Les barres intraday couvrent les `intraday_days` dernières séances, heures de cotation.
+    """
+
+    name = 'synthetic'
+
+    def __init__(self, seed=0, end=None, drift=0.08, volatility=(0.15, 0.45), regime_switch=0.02,
+                 jump_intensity=3.0, jump_mean=-0.01, jump_std=0.04, intraday_days=30):
+        self.seed = seed
+        self.end = pd.Timestamp(end) if end is not None else None
+        self.drift = drift
+        self.volatility = volatility
+        self.regime_switch = regime_switch      # Probabilité de changer de régime à chaque barre journalière
+        self.jump_intensity = jump_intensity    # Nombre moyen de sauts par an
+        self.jump_mean = jump_mean
+        self.jump_std = jump_std
+        self.intraday_days = intraday_days      # Profondeur des historiques intraday, en séances
+
+    def _rng(self, symbol, interval):
+        return np.random.default_rng([self.seed, zlib.crc32(f"{symbol}|{interval}".encode())])
+
+    def simulate(self, symbols, n_bars, interval='1d'):
+        """Génère des matrices (barres × symboles) Open, High, Low, Close et Volume"""
+        n_symbols = len(symbols)
+        dt = _interval_minutes(interval) / (MINUTES_PER_SESSION * TRADING_DAYS)
+        # Un tirage par symbole (graine propre), puis des calculs vectorisés sur toute la matrice.
+        # Les 8 uniformes d'une barre sont consécutifs : un historique plus long prolonge le
+        # plus court sans en modifier les barres.
+        draws = np.empty((8, n_bars, n_symbols))
+        start_prices = np.empty(n_symbols)
+        for column, symbol in enumerate(symbols):
+            rng = self._rng(symbol, interval)
+            start_prices[column] = rng.uniform(20, 500)
+            draws[:, :, column] = rng.random((n_bars, 8)).T
+
+        (uniform_switch, uniform_jump, shock_radius, shock_angle, size_radius, size_angle,
+         uniform_range, uniform_volume) = draws
+        normal_shock = _box_muller(shock_radius, shock_angle)
+        normal_size = _box_muller(size_radius, size_angle)
+
+        # Régimes : la parité du nombre de changements donne l'état courant
+        switch_probability = 1 - (1 - self.regime_switch) ** (dt * TRADING_DAYS)
+        regime = np.cumsum(uniform_switch < switch_probability, axis=0) % 2
+        sigma = np.where(regime == 1, self.volatility[1], self.volatility[0])
+
+        jumps = (uniform_jump < self.jump_intensity * dt) * (self.jump_mean + self.jump_std * normal_size)
+        log_returns = (self.drift - 0.5 * sigma ** 2) * dt + sigma * np.sqrt(dt) * normal_shock + jumps
+        close = start_prices * np.exp(np.cumsum(log_returns, axis=0))
+
+        open_ = np.empty_like(close)
+        open_[0] = start_prices
+        open_[1:] = close[:-1]
+        # Gap d'ouverture de faible amplitude, puis extrêmes autour du corps de la barre
+        open_ *= np.exp(0.1 * sigma * np.sqrt(dt) * (uniform_range - 0.5))
+        wick = sigma * np.sqrt(dt) * uniform_range
+        high = np.maximum(open_, close) * np.exp(wick)
+        low = np.minimum(open_, close) * np.exp(-wick)
+        volume = np.floor(1e6 * dt * TRADING_DAYS * (sigma / self.volatility[0]) * (0.5 + uniform_volume))
+
+        return {'Open': open_, 'High': high, 'Low': low, 'Close': close, 'Volume': volume.astype(np.int64)}
+
+    def _index(self, symbol, interval):
+        calendar = calendar_for_symbol(symbol)
+        end = self.end if self.end is not None else pd.Timestamp.now(tz=calendar.timezone)
+        if end.tzinfo is None:
+            end = end.tz_localize(calendar.timezone)
+        minutes = _interval_minutes(interval)
+
+        if minutes >= MINUTES_PER_SESSION:
+            # Barres journalières : toutes les séances du calendrier jusqu'à `end`
+            sessions = calendar.sessions_between(calendar.sessions[0], end.tz_localize(None))
+            sessions = sessions[sessions['open'] <= end]
+            return sessions.index.tz_localize(calendar.timezone).rename('Date')
+
+        sessions = calendar.sessions_between(end.tz_localize(None) - pd.Timedelta(days=2 * self.intraday_days), end.tz_localize(None))
+        sessions = sessions[sessions['open'] <= end].iloc[-self.intraday_days:]
+        step = minutes * 60 * 10 ** 9
+        stamps = np.concatenate([
+            np.arange(o, c, step) for o, c in zip(sessions['open'].array.asi8, sessions['close'].array.asi8)
+        ])
+        stamps = stamps[stamps <= end.value]
+        return pd.DatetimeIndex(stamps, tz='UTC').tz_convert(calendar.timezone).rename('Datetime')
+
+    def history(self, symbol, period=None, interval='1d', start=None):
+        index = self._index(symbol, interval)
+        bars = self.simulate([symbol], len(index), interval)
+        data = pd.DataFrame({column: values[:, 0] for column, values in bars.items()}, index=index)
+        if start is not None:
+            start = pd.Timestamp(start)
+            if start.tzinfo is None:
+                start = start.tz_localize(index.tz)
+            return data[data.index >= start]
+        return trim_to_period(data, period or 'max')
+
+    def panel(self, symbols, n_bars, interval='1d', field='Close'):
+        """Matrice (barres × symboles) d'un champ, pour des milliers de symboles à la fois"""
+        return self.simulate(list(symbols), n_bars, interval)[field]
+
+
+def _box_muller(u1, u2):
+    """Loi normale centrée réduite à partir de deux matrices d'uniformes sur [0, 1["""
+    return np.sqrt(-2.0 * np.log1p(-u1)) * np.cos(2 * np.pi * u2)
+
+
+default_provider = YahooFinanceProvider()
@@ -0,0 +1,42 @@
+import numpy as np
+import pandas as pd
+
+DEFAULT_MAX_BUCKETS = 600  # Au-delà, le navigateur ne distingue plus les chandeliers
+
+
+def visible_range(data, start=None, end=None):
+    """Barres de `data` comprises entre start et end (bornes incluses), par recherche dichotomique"""
+    index = data.index
+    lo = 0 if start is None else index.searchsorted(pd.Timestamp(start), side='left')
+    hi = len(index) if end is None else index.searchsorted(pd.Timestamp(end), side='right')
+    return data.iloc[lo:hi]
+
+
+def downsample_ohlcv(data, max_buckets=DEFAULT_MAX_BUCKETS, start=None, end=None):
+    """Agrège les barres OHLCV de la plage visible en au plus `max_buckets` chandeliers
+
+    Chaque chandelier regroupe un nombre égal de barres consécutives et prend l'ouverture
+    de la première, le plus haut et le plus bas du groupe, la clôture de la dernière et la
+    somme des volumes ; il est horodaté par sa première barre. Les regroupements se font
+    en nombre de barres plutôt qu'en durée, ce qui évite les chandeliers vides sur les
+    nuits et les week-ends. Si la plage contient moins de `max_buckets` barres, elle est
+    retournée telle quelle : un zoom produit ainsi des chandeliers de plus en plus fins.
+    """
+    data = visible_range(data, start, end)
+    n_bars = len(data)
+    if n_bars <= max_buckets:
+        return data
+
+    size = -(-n_bars // max_buckets)
+    starts = np.arange(0, n_bars, size)
+    ends = np.minimum(starts + size, n_bars) - 1
+
+    columns = {
+        'Open': data['Open'].to_numpy()[starts],
+        'High': np.maximum.reduceat(data['High'].to_numpy(), starts),
+        'Low': np.minimum.reduceat(data['Low'].to_numpy(), starts),
+        'Close': data['Close'].to_numpy()[ends],
+    }
+    if 'Volume' in data:
+        columns['Volume'] = np.add.reduceat(data['Volume'].to_numpy(), starts)
+    return pd.DataFrame(columns, index=data.index[starts])
@@ -0,0 +1,100 @@
+import threading
+from collections import OrderedDict
+import pandas as pd
+
+DEFAULT_MAX_BYTES = 64 * 1024 * 1024
+
+
+def _estimate_nbytes(value):
+    """Taille approximative d'un résultat d'indicateur (l'index est partagé avec les données)"""
+    if isinstance(value, pd.Series):
+        return value.values.nbytes
+    if isinstance(value, pd.DataFrame):
+        return int(value.memory_usage(index=False).sum())
+    if isinstance(value, dict):
+        return sum(_estimate_nbytes(v) for v in value.values())
+    return 0
+
+
+class IndicatorCache:
+    """Cache LRU des indicateurs, indexé par (source, indicateur, paramètres, version des données)
+
+    La source identifie la série de données (symbole, intervalle, propriétaire) : un même
+    cache peut être partagé par plusieurs services sans qu'un indicateur calculé sur les
+    barres de l'un soit servi à l'autre. Chaque source a sa propre version ; un changement
+    de version n'invalide que les entrées de la source concernée.
+    """
+
+    def __init__(self, max_bytes=DEFAULT_MAX_BYTES):
+        self.max_bytes = max_bytes
+        self.nbytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries = OrderedDict()
+        self._versions = {}
+        self._lock = threading.Lock()
+
+    def get_or_compute(self, name, params, version, compute, source=None):
+        """Retourne le résultat en cache, ou le calcule et le met en cache
+
+        Le résultat est partagé entre les appelants et ne doit pas être modifié.
+        """
+        key = (source, name, params)
+        with self._lock:
+            if version != self._versions.get(source):
+                # Les données de la source ont changé : aucune de ses entrées ne peut plus servir
+                self._drop(source)
+                self._versions[source] = version
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[0]
+            self.misses += 1
+
+        value = compute()
+        if value is None:
+            return None
+
+        size = _estimate_nbytes(value)
+        with self._lock:
+            if version != self._versions.get(source) or size > self.max_bytes:
+                return value
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self.nbytes -= previous[1]
+            self._entries[key] = (value, size)
+            self.nbytes += size
+            while self.nbytes > self.max_bytes:
+                _, (_, evicted_size) = self._entries.popitem(last=False)
+                self.nbytes -= evicted_size
+                self.evictions += 1
+        return value
+
+    def _drop(self, source):
+        for key in [key for key in self._entries if key[0] == source]:
+            self.nbytes -= self._entries.pop(key)[1]
+
+    def discard(self, source):
+        """Oublie les entrées d'une source (service fermé)"""
+        with self._lock:
+            self._drop(source)
+            self._versions.pop(source, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._versions.clear()
+            self.nbytes = 0
+
+    def stats(self):
+        """Compteurs du cache : succès, échecs, évictions, nombre d'entrées et mémoire occupée"""
+        with self._lock:
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'entries': len(self._entries),
+                'nbytes': self.nbytes,
+            }
@@ -0,0 +1,33 @@
+import importlib
+import threading
+
+
+class LazyModule:
+    """Module importé au premier accès à l'un de ses attributs
+
+    Remplace `import module` pour les dépendances lourdes (yfinance, pyarrow...) dont une
+    partie des usages n'a pas besoin : le coût de l'import n'est payé qu'au premier
+    usage réel. Un attribut affecté sur le proxy (monkeypatch dans les tests) masque celui
+    du module.
+    """
+
+    def __init__(self, name):
+        self.__dict__['_name'] = name
+        self.__dict__['_module'] = None
+        self.__dict__['_lock'] = threading.Lock()
+
+    def _load(self):
+        module = self.__dict__['_module']
+        if module is None:
+            with self.__dict__['_lock']:
+                module = self.__dict__['_module']
+                if module is None:
+                    module = self.__dict__['_module'] = importlib.import_module(self._name)
+        return module
+
+    def __getattr__(self, attr):
+        return getattr(self._load(), attr)
+
+    def __repr__(self):
+        state = "chargé" if self.__dict__['_module'] is not None else "non chargé"
+        return f"<LazyModule {self._name!r} ({state})>"
@@ -0,0 +1,172 @@
+import logging
+import os
+import re
+import tempfile
+import time
+import pandas as pd
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Ordre des périodes Yahoo Finance, de la plus courte à la plus longue
+PERIOD_ORDER = ['1d', '5d', '1mo', '3mo', '6mo', '1y', '2y', '5y', '10y', 'max']
+
+DEFAULT_CACHE_DIR = os.path.join(".cache", "ohlcv")
+
+
+def period_covers(cached_period, requested_period):
+    """Indique si un historique téléchargé pour cached_period couvre requested_period"""
+    if cached_period == requested_period:
+        return True
+    # 'ytd' dépend de la date du jour : on le considère couvert par une année complète
+    if requested_period == 'ytd':
+        return cached_period in PERIOD_ORDER and PERIOD_ORDER.index(cached_period) >= PERIOD_ORDER.index('1y')
+    if cached_period == 'ytd':
+        return requested_period in ('1d', '5d')
+    if cached_period not in PERIOD_ORDER or requested_period not in PERIOD_ORDER:
+        return False
+    return PERIOD_ORDER.index(cached_period) >= PERIOD_ORDER.index(requested_period)
+
+
+def trim_to_period(data, period):
+    """Restreint un historique à la fenêtre correspondant à la période demandée"""
+    if data is None or data.empty or period == 'max':
+        return data
+
+    last = data.index[-1]
+    if period == 'ytd':
+        return data[data.index >= last.replace(month=1, day=1, hour=0, minute=0, second=0, microsecond=0)]
+
+    match = re.fullmatch(r'(\d+)(d|mo|y)', period)
+    if match is None:
+        return data
+
+    count, unit = int(match.group(1)), match.group(2)
+    if unit == 'd':
+        # Les périodes en jours correspondent à des séances, pas à des jours calendaires
+        days = data.index.normalize()
+        session_days = days.unique()
+        if len(session_days) <= count:
+            return data
+        return data[days >= session_days[-count]]
+
+    offset = pd.DateOffset(months=count) if unit == 'mo' else pd.DateOffset(years=count)
+    return data[data.index > last - offset]
+
+
+class OHLCVCache:
+    """Cache disque des barres OHLCV, un fichier NumPy .npz par symbole et intervalle"""
+
+    def __init__(self, cache_dir=DEFAULT_CACHE_DIR):
+        self.cache_dir = cache_dir
+        # Copie mémoire des fichiers déjà lus, invalidée par la date de modification
+        self._memory = {}
+
+    def _path(self, symbol, interval):
+        safe_symbol = re.sub(r'[^A-Za-z0-9._-]', '_', symbol)
+        return os.path.join(self.cache_dir, f"{safe_symbol}_{interval}.npz")
+
+    def load(self, symbol, interval):
+        """Retourne (données, période couverte) depuis le cache, ou (None, None)"""
+        path = self._path(symbol, interval)
+        try:
+            mtime = os.stat(path).st_mtime_ns
+        except OSError:
+            return None, None
+
+        key = (symbol, interval)
+        cached = self._memory.get(key)
+        if cached is not None and cached[0] == mtime:
+            return cached[1], cached[2]
+
+        try:
+            with np.load(path, allow_pickle=False) as archive:
+                index = pd.DatetimeIndex(archive['index'].view('datetime64[ns]'))
+                tz = str(archive['tz'])
+                if tz:
+                    index = index.tz_localize('UTC').tz_convert(tz)
+                index.name = str(archive['index_name']) or None
+                columns = [str(c) for c in archive['columns']]
+                data = pd.DataFrame({c: archive[f"col_{i}"] for i, c in enumerate(columns)}, index=index)
+                period = str(archive['period'])
+        except Exception as e:
+            logger.warning("Cache illisible pour %s (%s), il sera reconstruit : %s", symbol, interval, e)
+            return None, None
+
+        self._memory[key] = (mtime, data, period)
+        return data, period
+
+    def save(self, symbol, interval, data, period):
+        """Écrit l'historique complet de façon atomique"""
+        os.makedirs(self.cache_dir, exist_ok=True)
+        index = data.index
+        tz = str(index.tz) if index.tz is not None else ""
+        if index.tz is not None:
+            index = index.tz_convert('UTC').tz_localize(None)
+
+        arrays = {
+            'index': index.values.astype('datetime64[ns]').view('int64'),
+            'tz': np.array(tz),
+            'index_name': np.array(data.index.name or ""),
+            'columns': np.array([str(c) for c in data.columns]),
+            'period': np.array(period),
+        }
+        for i, column in enumerate(data.columns):
+            arrays[f"col_{i}"] = data[column].to_numpy()
+
+        path = self._path(symbol, interval)
+        fd, tmp_path = tempfile.mkstemp(dir=self.cache_dir, suffix='.npz.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                np.savez(f, **arrays)
+            os.replace(tmp_path, path)
+        except Exception:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+        self._memory[(symbol, interval)] = (os.stat(path).st_mtime_ns, data, period)
+
+    def append(self, symbol, interval, cached, new_bars, period):
+        """Ajoute les nouvelles barres à l'historique en cache et le réécrit
+
+        Si les barres reçues sont identiques à la fin de l'historique, le fichier n'est pas
+        réécrit : seule sa date de modification est mise à jour (fraîcheur du cache).
+        """
+        if new_bars is None or new_bars.empty:
+            return cached
+        if cached[cached.index >= new_bars.index[0]].equals(new_bars):
+            self.touch(symbol, interval, cached, period)
+            return cached
+        merged = pd.concat([cached[cached.index < new_bars.index[0]], new_bars])
+        merged = merged[~merged.index.duplicated(keep='last')]
+        self.save(symbol, interval, merged, period)
+        return merged
+
+    def touch(self, symbol, interval, data, period):
+        """Marque l'historique comme vérifié à l'instant, sans le réécrire"""
+        path = self._path(symbol, interval)
+        try:
+            os.utime(path)
+        except OSError:
+            self.save(symbol, interval, data, period)
+            return
+        self._memory[(symbol, interval)] = (os.stat(path).st_mtime_ns, data, period)
+
+    def age(self, symbol, interval):
+        """Secondes écoulées depuis la dernière écriture du cache (infini s'il est absent)"""
+        try:
+            return time.time() - os.stat(self._path(symbol, interval)).st_mtime
+        except OSError:
+            return float('inf')
+
+    def clear(self, symbol, interval):
+        """Supprime l'entrée du cache d'un symbole"""
+        self._memory.pop((symbol, interval), None)
+        path = self._path(symbol, interval)
+        if os.path.exists(path):
+            os.remove(path)
+
+
+# Cache partagé par défaut entre les instances de TradingService
+default_cache = OHLCVCache()
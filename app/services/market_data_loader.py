@@ -0,0 +1,199 @@
+import logging
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import timedelta
+import pandas as pd
+import numpy as np
+from .data_providers import default_provider
+from .market_cache import DEFAULT_CACHE_DIR, OHLCVCache, default_cache, period_covers, trim_to_period
+
+logger = logging.getLogger(__name__)
+
+# Âge maximal (secondes) d'un historique en cache servi sans requête par load() et
+# load_many() : max_age=0 force l'interrogation de la source
+DEFAULT_MAX_AGE = 60
+
+
+def default_interval(period):
+    """Intervalle des barres utilisé par défaut pour une période"""
+    return '1m' if period == '1d' else '1d'
+
+
+def is_intraday(interval):
+    return interval.endswith('m') or interval.endswith('h')
+
+
+def bars_changed(previous, data, full_reload):
+    """Indique si une mise à jour a modifié les barres
+
+    Seules les dernières barres peuvent avoir changé, sauf en cas de rechargement complet.
+    """
+    return not (
+        len(data) == len(previous)
+        and data.index[0] == previous.index[0]
+        and data.iloc[-2:].equals(previous.iloc[-2:])
+        and (not full_reload or data.equals(previous))
+    )
+
+
+class MarketDataLoader:
+    """Chargement des historiques OHLCV d'un ou plusieurs symboles à travers le cache partagé
+
+    Les barres proviennent de `provider` (Yahoo Finance par défaut). Sans cache explicite,
+    une autre source utilise son propre sous-répertoire du cache disque afin de ne jamais
+    mélanger ses barres avec celles de Yahoo Finance.
+    """
+
+    def __init__(self, cache=None, max_workers=8, provider=None):
+        self.provider = provider if provider is not None else default_provider
+        if cache is None:
+            if self.provider.name == default_provider.name:
+                cache = default_cache
+            else:
+                cache = OHLCVCache(os.path.join(DEFAULT_CACHE_DIR, self.provider.name))
+        self.cache = cache
+        self.max_workers = max_workers
+        # Un verrou par (symbole, intervalle) : un même fichier n'est jamais téléchargé deux fois en parallèle
+        self._locks = {}
+        self._locks_guard = threading.Lock()
+
+    def _lock_for(self, symbol, interval):
+        with self._locks_guard:
+            return self._locks.setdefault((symbol, interval), threading.Lock())
+
+    def _download(self, symbol, period, interval):
+        data = self.provider.history(symbol, period=period, interval=interval)
+        logger.debug("Données téléchargées pour %s : %d lignes, colonnes %s", symbol, len(data), data.columns.tolist())
+        if not data.empty:
+            self.cache.save(symbol, interval, data, period)
+        return data
+
+    def _append_new_bars(self, symbol, interval, cached, cached_period):
+        """Complète l'historique en cache avec les barres postérieures à la dernière barre connue"""
+        # Au-delà de quelques jours, Yahoo ne fournit plus les barres intrajournalières
+        if is_intraday(interval) and cached.index[-1] < pd.Timestamp.now(tz=cached.index.tz) - timedelta(days=7):
+            return None
+
+        # On repart de l'avant-dernière barre : la dernière peut encore être en cours
+        start = cached.index[-2]
+        new_bars = self.provider.history(symbol, interval=interval, start=start)
+        logger.debug("Barres récupérées depuis le cache + %d nouvelles barres pour %s", len(new_bars), symbol)
+
+        # Un dividende ou un split réajuste les prix passés : le cache doit être reconstruit
+        if start in new_bars.index and not np.isclose(new_bars.at[start, 'Close'], cached.at[start, 'Close'], rtol=1e-6):
+            logger.info("Ajustement de prix détecté pour %s, rechargement complet", symbol)
+            return None
+
+        return self.cache.append(symbol, interval, cached, new_bars, cached_period)
+
+    def _fetch(self, symbol, period, interval, base=None, max_age=None):
+        """Retourne (données de la période, rechargement complet) en ne téléchargeant que le nécessaire"""
+        with self._lock_for(symbol, interval):
+            cached, cached_period = self.cache.load(symbol, interval)
+            if (cached is None or len(cached) < 2) and base is not None:
+                cached, cached_period = base, period
+
+            if cached is not None and len(cached) >= 2 and period_covers(cached_period, period):
+                # Cache assez récent : aucune requête réseau
+                if max_age is not None and self.cache.age(symbol, interval) <= max_age:
+                    return trim_to_period(cached, period), False
+                merged = self._append_new_bars(symbol, interval, cached, cached_period)
+                if merged is not None:
+                    return trim_to_period(merged, period), False
+
+            return trim_to_period(self._download(symbol, period, interval), period), True
+
+    def load(self, symbol, period="1y", interval=None, max_age=None):
+        """Charge l'historique d'un symbole, ou None si les données sont indisponibles
+
+        Un cache écrit ou vérifié depuis moins de max_age secondes (DEFAULT_MAX_AGE par
+        défaut) est lu localement, sans requête réseau.
+        """
+        interval = interval or default_interval(period)
+        max_age = DEFAULT_MAX_AGE if max_age is None else max_age
+        try:
+            data, _ = self._fetch(symbol, period, interval, max_age=max_age)
+
+            if data.empty:
+                logger.warning("Aucune donnée disponible pour %s", symbol)
+                return None
+
+            # Vérification que nous avons des données valides
+            if len(data) < 2:
+                logger.warning("Pas assez de données pour %s", symbol)
+                return None
+
+            logger.debug("Données chargées pour %s, du %s au %s", symbol, data.index[0], data.index[-1])
+            return data
+        except Exception as e:
+            logger.error("Erreur lors du chargement des données pour %s: %s", symbol, e)
+            return None
+
+    def update(self, symbol, period, interval, current):
+        """Complète des données déjà chargées, retourne (données, rechargement complet)"""
+        return self._fetch(symbol, period, interval, base=current)
+
+    def load_many(self, symbols, period="1y", interval=None, max_age=None, panel=False, field='Close'):
+        """Charge plusieurs symboles en parallèle
+
+        Les symboles en double ne sont chargés qu'une fois et ceux dont le cache date de
+        moins de max_age secondes (DEFAULT_MAX_AGE par défaut) sont servis sans requête
+        réseau. Un échec n'interrompt pas le lot. Retourne (données, erreurs) : données est
+        un dictionnaire {symbole: DataFrame}, ou avec panel=True un DataFrame aligné d'une
+        colonne `field` par symbole, et erreurs un dictionnaire {symbole: message} propre à
+        cet appel (le chargeur est partagé entre sessions et threads).
+        """
+        interval = interval or default_interval(period)
+        max_age = DEFAULT_MAX_AGE if max_age is None else max_age
+        unique_symbols = list(dict.fromkeys(symbols))
+        frames = {}
+        errors = {}
+
+        def load_one(symbol):
+            data, _ = self._fetch(symbol, period, interval, max_age=max_age)
+            if data is None or len(data) < 2:
+                raise ValueError("Aucune donnée disponible")
+            return data
+
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=max(1, min(self.max_workers, len(unique_symbols)))) as executor:
+            futures = {executor.submit(load_one, symbol): symbol for symbol in unique_symbols}
+            for future in as_completed(futures):
+                symbol = futures[future]
+                try:
+                    frames[symbol] = future.result()
+                except Exception as e:
+                    errors[symbol] = str(e)
+
+        logger.info("%d/%d symboles chargés en %.2fs", len(frames), len(unique_symbols), time.perf_counter() - start)
+        if errors:
+            logger.warning("Échecs de chargement : %s", ', '.join(sorted(errors)))
+
+        # On conserve l'ordre des symboles demandés
+        frames = {symbol: frames[symbol] for symbol in unique_symbols if symbol in frames}
+        if panel:
+            return self.to_panel(frames, interval, field), errors
+        return frames, errors
+
+    @staticmethod
+    def to_panel(frames, interval, field='Close'):
+        """Aligne une colonne de plusieurs historiques dans un seul DataFrame (une colonne par symbole)"""
+        columns = {}
+        for symbol, data in frames.items():
+            series = data[field]
+            if series.index.tz is not None:
+                # Barres journalières : alignement sur la date locale de chaque place de cotation
+                if is_intraday(interval):
+                    series = series.tz_convert('UTC')
+                else:
+                    series = series.tz_localize(None)
+            columns[symbol] = series
+        if not columns:
+            return pd.DataFrame()
+        return pd.concat(columns, axis=1).sort_index()
+
+
+# Chargeur partagé par défaut entre les instances de TradingService
+default_loader = MarketDataLoader()
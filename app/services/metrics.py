@@ -0,0 +1,197 @@
+import bisect
+import functools
+import os
+import threading
+import time
+
+# Mesure des durées des chemins critiques.
+#
+# Chaque span alimente un histogramme à seaux géométriques fixes (20 par décade, de 1 µs
+# à 100 s) : l'enregistrement est une recherche dichotomique et un incrément, sans
+# allocation, et les quantiles p50/p95/p99 sont estimés à partir des seaux avec une
+# erreur relative inférieure à 12 % (largeur d'un seau). Les histogrammes sont
+# consultables dans le tableau de bord et exportables au format texte de Prometheus.
+
+BUCKETS_PER_DECADE = 20
+MIN_SECONDS = 1e-6
+MAX_SECONDS = 100.0
+BUCKET_BOUNDS = [MIN_SECONDS * 10 ** (i / BUCKETS_PER_DECADE)
+                 for i in range(BUCKETS_PER_DECADE * 8 + 1)]
+QUANTILES = (0.5, 0.95, 0.99)
+
+
+class Histogram:
+    """Histogramme de durées (en secondes) à seaux géométriques fixes"""
+
+    __slots__ = ('counts', 'count', 'sum', 'max')
+
+    def __init__(self):
+        # Un seau de plus pour les durées supérieures à MAX_SECONDS
+        self.counts = [0] * (len(BUCKET_BOUNDS) + 1)
+        self.count = 0
+        self.sum = 0.0
+        self.max = 0.0
+
+    def observe(self, seconds):
+        self.counts[bisect.bisect_left(BUCKET_BOUNDS, seconds)] += 1
+        self.count += 1
+        self.sum += seconds
+        if seconds > self.max:
+            self.max = seconds
+
+    def quantile(self, q):
+        """Estimation du quantile q par interpolation géométrique dans son seau"""
+        if self.count == 0:
+            return None
+        rank = q * self.count
+        seen = 0
+        for i, n in enumerate(self.counts):
+            if n and seen + n >= rank:
+                if i >= len(BUCKET_BOUNDS):
+                    return self.max
+                upper = BUCKET_BOUNDS[i]
+                lower = BUCKET_BOUNDS[i - 1] if i > 0 else 0.0
+                if lower == 0.0:
+                    return min(upper, self.max)
+                fraction = (rank - seen) / n
+                return min(lower * (upper / lower) ** fraction, self.max)
+            seen += n
+        return self.max
+
+
+class _Span:
+    __slots__ = ('registry', 'name', 'start')
+
+    def __init__(self, registry, name):
+        self.registry = registry
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.registry.observe(self.name, time.perf_counter() - self.start)
+        return False
+
+
+class _NullSpan:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NULL_SPAN = _NullSpan()
+
+
+def _escape_label(value):
+    return value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+class MetricsRegistry:
+    """Histogrammes de durées nommés, partagés par les threads du processus"""
+
+    def __init__(self, enabled=True):
+        self.enabled = enabled
+        self._histograms = {}
+        self._lock = threading.Lock()
+
+    def span(self, name):
+        """Contexte qui mesure la durée du bloc : `with registry.span("fetch"): ...`"""
+        if not self.enabled:
+            return _NULL_SPAN
+        return _Span(self, name)
+
+    def observe(self, name, seconds):
+        with self._lock:
+            histogram = self._histograms.get(name)
+            if histogram is None:
+                histogram = self._histograms[name] = Histogram()
+            histogram.observe(seconds)
+
+    def timed(self, name):
+        """Décorateur qui mesure chaque appel de la fonction sous le nom `name`"""
+        return lambda func: _timed_method(func, name, self)
+
+    def summary(self):
+        """{nom: {count, mean, p50, p95, p99, max}} en secondes, trié par nom"""
+        with self._lock:
+            items = sorted(self._histograms.items())
+            result = {}
+            for name, histogram in items:
+                result[name] = {
+                    'count': histogram.count,
+                    'mean': histogram.sum / histogram.count,
+                    'p50': histogram.quantile(0.5),
+                    'p95': histogram.quantile(0.95),
+                    'p99': histogram.quantile(0.99),
+                    'max': histogram.max,
+                }
+            return result
+
+    def to_prometheus(self, metric='tradesim_span_seconds'):
+        """Export au format texte de Prometheus (un résumé par span)"""
+        lines = [
+            f"# HELP {metric} Durée des spans instrumentés, en secondes",
+            f"# TYPE {metric} summary",
+        ]
+        with self._lock:
+            for name, histogram in sorted(self._histograms.items()):
+                label = f'span="{_escape_label(name)}"'
+                for q in QUANTILES:
+                    lines.append(f'{metric}{{{label},quantile="{q:g}"}} {histogram.quantile(q):.9g}')
+                lines.append(f"{metric}_sum{{{label}}} {histogram.sum:.9g}")
+                lines.append(f"{metric}_count{{{label}}} {histogram.count}")
+        return "\n".join(lines) + "\n"
+
+    def write_prometheus(self, path):
+        """Écrit l'export Prometheus de façon atomique (lisible par le collecteur textfile)"""
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, 'w') as f:
+            f.write(self.to_prometheus())
+        os.replace(tmp_path, path)
+
+    def reset(self):
+        with self._lock:
+            self._histograms.clear()
+
+
+def instrument(prefix, registry=None):
+    """Décorateur de classe : mesure chaque méthode publique sous `prefix.méthode`
+
+    Le registre est résolu à l'appel, ce qui permet de le remplacer ou de le désactiver.
+    """
+    def decorator(cls):
+        for attr, value in list(vars(cls).items()):
+            if attr.startswith('_') or not callable(value) or isinstance(value, (staticmethod, classmethod)):
+                continue
+            setattr(cls, attr, _timed_method(value, f"{prefix}.{attr}", registry))
+        return cls
+    return decorator
+
+
+def _timed_method(func, name, registry):
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        metrics = registry or default_registry
+        if not metrics.enabled:
+            return func(*args, **kwargs)
+        start = time.perf_counter()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            metrics.observe(name, time.perf_counter() - start)
+    return wrapper
+
+
+# Registre partagé par défaut
+default_registry = MetricsRegistry()
+
+
+def span(name):
+    """Span du registre par défaut"""
+    return default_registry.span(name)
@@ -0,0 +1,308 @@
+import heapq
+import itertools
+import pandas as pd
+
+ORDER_TYPES = ('market', 'limit', 'stop', 'stop_limit')
+SIDES = ('BUY', 'SELL')
+# GTC : valable jusqu'à annulation ; DAY : jusqu'à la fin de la journée ; GTD : jusqu'à expires_at
+TIME_IN_FORCE = ('GTC', 'DAY', 'GTD')
+
+
+class Order:
+    """Ordre simulé en attente d'exécution"""
+
+    __slots__ = ('order_id', 'symbol', 'side', 'order_type', 'quantity', 'limit_price', 'stop_price',
+                 'time_in_force', 'created_at', 'expires_at', 'status', 'triggered')
+
+    def __init__(self, order_id, symbol, side, order_type, quantity, limit_price, stop_price,
+                 time_in_force, created_at, expires_at):
+        self.order_id = order_id
+        self.symbol = symbol
+        self.side = side
+        self.order_type = order_type
+        self.quantity = quantity
+        self.limit_price = limit_price
+        self.stop_price = stop_price
+        self.time_in_force = time_in_force
+        self.created_at = created_at
+        self.expires_at = expires_at
+        self.status = 'open'      # open, filled, cancelled, expired, rejected
+        self.triggered = False    # stop-limit dont le stop a été atteint
+
+    def to_dict(self):
+        return {name: getattr(self, name) for name in self.__slots__}
+
+
+class OrderBook:
+    """Carnet d'ordres simulé : ordres au marché, limites, stops et stop-limites
+
+    Les ordres en attente sont rangés dans des tas triés par prix, par symbole, sens et
+    type de déclenchement. À chaque barre, seuls les ordres dont le prix a été franchi sont
+    dépilés : le coût est en O(k log n) pour k ordres exécutés parmi n en attente. Seuls les
+    ordres actifs sont conservés dans l'index : un ordre exécuté, annulé, expiré ou rejeté en
+    est retiré, et son entrée dans les tas est ignorée lorsqu'elle remonte au sommet. Un tas
+    dont les entrées mortes deviennent majoritaires est compacté, pour que les annulations
+    loin du marché ne s'accumulent pas.
+    """
+
+    # Taille en dessous de laquelle un tas n'est jamais compacté
+    COMPACT_MIN_SIZE = 64
+
+    def __init__(self):
+        # Ordres actifs uniquement, par identifiant, et par symbole
+        self._orders = {}
+        self._by_symbol = {}
+        # symbole -> tas de (horodatage de passage, séquence, identifiant) : plus ancien ordre actif
+        self._created = {}
+        self._ids = itertools.count(1)
+        self._sequence = itertools.count()
+        # (symbole, sens, 'limit' | 'stop') -> tas de (clé de prix, séquence, identifiant)
+        self._heaps = {}
+        # Tas de chaque ordre encore présent dans un tas de prix, et entrées mortes par tas
+        self._in_heap = {}
+        self._dead = {}
+        self._market = {}
+        self._expiries = []
+        # Dernière barre terminée traitée par process_bars, par symbole
+        self._last_bar = {}
+        self.active_count = 0
+
+    def _push(self, order, kind):
+        price = order.limit_price if kind == 'limit' else order.stop_price
+        # Le sommet du tas est toujours l'ordre le plus facile à déclencher :
+        # limite d'achat la plus haute, limite de vente la plus basse,
+        # stop d'achat le plus bas, stop de vente le plus haut
+        descending = (order.side == 'BUY') == (kind == 'limit')
+        key = -price if descending else price
+        heap_key = (order.symbol, order.side, kind)
+        heapq.heappush(self._heaps.setdefault(heap_key, []), (key, next(self._sequence), order.order_id))
+        self._in_heap[order.order_id] = heap_key
+
+    def submit(self, symbol, side, quantity, order_type='market', limit_price=None, stop_price=None,
+               time_in_force='GTC', timestamp=None, expires_at=None):
+        """Enregistre un ordre et retourne l'objet Order créé
+
+        `timestamp` est obligatoire et doit être exprimé sur l'horloge des barres (même
+        fuseau) : les expirations lui sont comparées.
+        """
+        if side not in SIDES:
+            raise ValueError(f"Sens d'ordre inconnu : {side}")
+        if order_type not in ORDER_TYPES:
+            raise ValueError(f"Type d'ordre inconnu : {order_type}")
+        if time_in_force not in TIME_IN_FORCE:
+            raise ValueError(f"Durée de validité inconnue : {time_in_force}")
+        if quantity <= 0:
+            raise ValueError("La quantité doit être positive")
+        if order_type in ('limit', 'stop_limit') and limit_price is None:
+            raise ValueError("Un prix limite est requis pour ce type d'ordre")
+        if order_type in ('stop', 'stop_limit') and stop_price is None:
+            raise ValueError("Un prix de déclenchement est requis pour ce type d'ordre")
+        if timestamp is None:
+            raise ValueError("L'horodatage de l'ordre est requis (horloge des barres)")
+
+        created_at = pd.Timestamp(timestamp)
+        if time_in_force == 'DAY':
+            expires_at = created_at.normalize() + pd.Timedelta(days=1)
+        elif time_in_force == 'GTD':
+            if expires_at is None:
+                raise ValueError("Une date d'expiration est requise pour un ordre GTD")
+            expires_at = pd.Timestamp(expires_at)
+            if expires_at.tzinfo is None and created_at.tzinfo is not None:
+                expires_at = expires_at.tz_localize(created_at.tzinfo)
+        else:
+            expires_at = None
+
+        order = Order(next(self._ids), symbol, side, order_type, quantity, limit_price, stop_price,
+                      time_in_force, created_at, expires_at)
+        self._orders[order.order_id] = order
+        self._by_symbol.setdefault(symbol, {})[order.order_id] = order
+        heapq.heappush(self._created.setdefault(symbol, []), (created_at, next(self._sequence), order.order_id))
+        self.active_count += 1
+
+        if order_type == 'market':
+            self._market.setdefault(symbol, []).append(order.order_id)
+        elif order_type == 'limit':
+            self._push(order, 'limit')
+        else:
+            self._push(order, 'stop')
+        if expires_at is not None:
+            heapq.heappush(self._expiries, (expires_at, next(self._sequence), order.order_id))
+        return order
+
+    def _close(self, order, status):
+        order.status = status
+        del self._orders[order.order_id]
+        del self._by_symbol[order.symbol][order.order_id]
+        self.active_count -= 1
+        # Ordre fermé sans être dépilé (annulation, expiration) : son entrée devient morte
+        heap_key = self._in_heap.pop(order.order_id, None)
+        if heap_key is not None:
+            self._dead[heap_key] = self._dead.get(heap_key, 0) + 1
+            heap = self._heaps[heap_key]
+            if len(heap) >= self.COMPACT_MIN_SIZE and 2 * self._dead[heap_key] > len(heap):
+                heap[:] = [entry for entry in heap if entry[2] in self._orders]
+                heapq.heapify(heap)
+                self._dead[heap_key] = 0
+
+    def cancel(self, order_id):
+        """Annule un ordre en attente, retourne False s'il n'est plus actif"""
+        order = self._orders.get(order_id)
+        if order is None:
+            return False
+        self._close(order, 'cancelled')
+        return True
+
+    def _expire(self, timestamp):
+        while self._expiries and self._expiries[0][0] <= timestamp:
+            _, _, order_id = heapq.heappop(self._expiries)
+            order = self._orders.get(order_id)
+            if order is not None:
+                self._close(order, 'expired')
+
+    def _pop_crossed(self, symbol, side, kind, crossed, timestamp):
+        """Dépile les ordres actifs dont le prix est franchi, dans l'ordre de priorité
+
+        Les ordres passés après le début de la barre ne peuvent pas être exécutés par elle :
+        ils sont remis en attente une fois le parcours terminé.
+        """
+        heap = self._heaps.get((symbol, side, kind))
+        later = []
+        while heap:
+            key, _, order_id = heap[0]
+            order = self._orders.get(order_id)
+            if order is None:
+                heapq.heappop(heap)
+                self._dead[(symbol, side, kind)] -= 1
+                continue
+            price = order.limit_price if kind == 'limit' else order.stop_price
+            if not crossed(price):
+                break
+            entry = heapq.heappop(heap)
+            if order.created_at > timestamp:
+                later.append(entry)
+                continue
+            del self._in_heap[order_id]
+            yield order
+        for entry in later:
+            heapq.heappush(heap, entry)
+
+    def _fill(self, order, price, timestamp, fills, execute):
+        fill = {
+            'order_id': order.order_id,
+            'symbol': order.symbol,
+            'type': order.side,
+            'quantity': order.quantity,
+            'price': float(price),
+            'timestamp': timestamp,
+            'order_type': order.order_type,
+        }
+        # Exécution refusée par le portefeuille (liquidités ou titres insuffisants) : l'ordre
+        # est rejeté explicitement au lieu de disparaître comme exécuté
+        if execute is not None and not execute(fill):
+            self._close(order, 'rejected')
+            return
+        self._close(order, 'filled')
+        fills.append(fill)
+
+    def process_bar(self, symbol, timestamp, open_, high, low, close, execute=None):
+        """Exécute les ordres du symbole déclenchés par la barre, retourne la liste des exécutions
+
+        execute(exécution), s'il est fourni, est appelé avant que chaque exécution soit
+        comptabilisée ; s'il retourne False, l'ordre passe au statut 'rejected'.
+        """
+        timestamp = pd.Timestamp(timestamp)
+        fills = []
+        self._expire(timestamp)
+
+        # Ordres au marché : exécutés à l'ouverture de la première barre qui suit leur passage
+        later = []
+        for order_id in self._market.pop(symbol, []):
+            order = self._orders.get(order_id)
+            if order is None:
+                continue
+            if order.created_at > timestamp:
+                later.append(order_id)
+            else:
+                self._fill(order, open_, timestamp, fills, execute)
+        if later:
+            self._market[symbol] = later
+
+        # Stops : un gap d'ouverture au-delà du stop est exécuté à l'ouverture
+        triggered_limits = []
+        for order in self._pop_crossed(symbol, 'BUY', 'stop', lambda stop: stop <= high, timestamp):
+            if order.order_type == 'stop':
+                self._fill(order, max(order.stop_price, open_), timestamp, fills, execute)
+            else:
+                order.triggered = True
+                triggered_limits.append(order)
+        for order in self._pop_crossed(symbol, 'SELL', 'stop', lambda stop: stop >= low, timestamp):
+            if order.order_type == 'stop':
+                self._fill(order, min(order.stop_price, open_), timestamp, fills, execute)
+            else:
+                order.triggered = True
+                triggered_limits.append(order)
+
+        # Stop-limites déclenchés pendant la barre : la limite ne peut être atteinte
+        # qu'après le stop, on ne bénéficie donc pas d'une ouverture plus favorable
+        for order in triggered_limits:
+            if order.side == 'BUY' and low <= order.limit_price:
+                self._fill(order, min(order.limit_price, max(order.stop_price, open_)), timestamp, fills, execute)
+            elif order.side == 'SELL' and high >= order.limit_price:
+                self._fill(order, max(order.limit_price, min(order.stop_price, open_)), timestamp, fills, execute)
+            else:
+                self._push(order, 'limit')
+
+        # Limites : exécutées au prix limite, ou à l'ouverture si elle est plus favorable
+        for order in self._pop_crossed(symbol, 'BUY', 'limit', lambda limit: limit >= low, timestamp):
+            self._fill(order, min(order.limit_price, open_), timestamp, fills, execute)
+        for order in self._pop_crossed(symbol, 'SELL', 'limit', lambda limit: limit <= high, timestamp):
+            self._fill(order, max(order.limit_price, open_), timestamp, fills, execute)
+
+        return fills
+
+    def process_price(self, symbol, timestamp, price, execute=None):
+        """Exécute les ordres déclenchés par un prix instantané (rafraîchissement en direct)"""
+        return self.process_bar(symbol, timestamp, price, price, price, price, execute)
+
+    def process_bars(self, symbol, bars, execute=None):
+        """Soumet au carnet les barres terminées (DataFrame OHLC) pas encore traitées
+
+        Chaque barre est traitée avec ses plus haut et plus bas : un franchissement à
+        l'intérieur d'une barre n'est pas manqué. Les barres antérieures au plus ancien
+        ordre en attente sont ignorées.
+        """
+        last = self._last_bar.get(symbol)
+        if last is not None:
+            bars = bars[bars.index > last]
+        if bars.empty:
+            return []
+        self._last_bar[symbol] = bars.index[-1]
+        earliest = self._earliest(symbol)
+        if earliest is None:
+            return []
+        # Une barre qui commence avant l'ordre ne peut pas l'exécuter
+        bars = bars[bars.index >= earliest]
+        fills = []
+        for timestamp, open_, high, low, close in zip(bars.index, bars['Open'].to_numpy(), bars['High'].to_numpy(),
+                                                      bars['Low'].to_numpy(), bars['Close'].to_numpy()):
+            fills.extend(self.process_bar(symbol, timestamp, open_, high, low, close, execute))
+        return fills
+
+    def _earliest(self, symbol):
+        """Horodatage du plus ancien ordre actif du symbole, None s'il n'y en a pas"""
+        heap = self._created.get(symbol)
+        live = self._by_symbol.get(symbol)
+        if not heap:
+            return None
+        if len(heap) >= self.COMPACT_MIN_SIZE and len(heap) > 2 * len(live):
+            heap[:] = [entry for entry in heap if entry[2] in live]
+            heapq.heapify(heap)
+        while heap and heap[0][2] not in live:
+            heapq.heappop(heap)
+        return heap[0][0] if heap else None
+
+    def open_orders(self, symbol=None):
+        """Ordres encore actifs, éventuellement filtrés par symbole"""
+        if symbol is None:
+            return list(self._orders.values())
+        return list(self._by_symbol.get(symbol, {}).values())
@@ -0,0 +1,173 @@
+import itertools
+import numpy as np
+import pandas as pd
+
+# Balayage vectorisé des paramètres de stratégie.
+#
+# Chaque combinaison de paramètres est une colonne d'une matrice de signaux (temps × paramètres)
+# et toutes les colonnes sont évaluées ensemble, avec la même comptabilité que
+# TradingService.backtest_strategy : une action détenue quand le signal vaut 1,
+# liquidités diminuées de la variation du signal multipliée par le prix.
+
+TRADING_DAYS = 252
+
+# Nombre de cellules (barres × combinaisons) traitées à la fois : des blocs qui tiennent
+# dans le cache du processeur sont nettement plus rapides que des blocs plus grands
+CHUNK_CELLS = 160_000
+
+
+def rolling_means(close, windows):
+    """Moyennes mobiles simples pour plusieurs fenêtres à partir d'une seule somme cumulée
+
+    Retourne une matrice (temps × fenêtres), NaN tant que la fenêtre n'est pas remplie.
+    """
+    close = np.asarray(close, dtype=float)
+    cumsum = np.concatenate(([0.0], np.cumsum(close)))
+    means = np.full((len(windows), len(close)), np.nan)
+    for row, window in enumerate(windows):
+        if window <= len(close):
+            means[row, window - 1:] = (cumsum[window:] - cumsum[:-window]) / window
+    return np.ascontiguousarray(means.T)
+
+
+def wilder_rsi(close, window):
+    """RSI avec lissage de Wilder, identique à ta.momentum.RSIIndicator"""
+    diff = pd.Series(np.asarray(close, dtype=float)).diff()
+    up = diff.where(diff > 0, 0.0)
+    down = -diff.where(diff < 0, 0.0)
+    avg_up = up.ewm(alpha=1 / window, min_periods=window, adjust=False).mean().to_numpy()
+    avg_down = down.ewm(alpha=1 / window, min_periods=window, adjust=False).mean().to_numpy()
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return np.where(avg_down == 0, 100.0, 100.0 - 100.0 / (1.0 + avg_up / avg_down))
+
+
+def evaluate_signals(close, signals, initial_capital=10000.0, risk_free_rate=0.02):
+    """Évalue une matrice de signaux comme backtest_strategy
+
+    La matrice est rangée par temps (barres × combinaisons) : les sommes cumulées le long
+    du temps portent ainsi sur des lignes contiguës. Retourne un dictionnaire de vecteurs :
+    capital final, rendement total, ratio de Sharpe et drawdown maximum de chaque combinaison.
+    """
+    close = np.asarray(close, dtype=float)
+    signals = np.asarray(signals)
+    if signals.ndim == 1:
+        signals = signals[:, np.newaxis]
+    n_bars = len(close)
+
+    # Valeur du portefeuille : total[t] - total[t-1] = signal[t-1] * (close[t] - close[t-1]).
+    # Comme dans backtest_strategy, la première barre n'a pas de variation de signal
+    # (diff() vaut NaN) : le total n'est défini qu'à partir de la deuxième barre.
+    total = np.multiply(signals[:-1], np.diff(close)[:, np.newaxis], dtype=float)
+    np.cumsum(total, axis=0, out=total)
+    total += initial_capital + signals[0] * close[0]
+
+    # Rendements : pct_change().fillna(0) donne 0 sur les deux premières barres,
+    # qui comptent dans la moyenne et l'écart-type
+    with np.errstate(divide='ignore', invalid='ignore'):
+        returns = np.divide(total[1:], total[:-1])
+    returns -= 1
+    returns[np.isnan(returns)] = 0.0
+    mean = returns.sum(axis=0) / n_bars
+    variance = (np.einsum('ij,ij->j', returns, returns) - n_bars * mean ** 2) / (n_bars - 1)
+    std = np.sqrt(np.maximum(variance, 0.0))
+    with np.errstate(divide='ignore', invalid='ignore'):
+        sharpe = np.where(std != 0, np.sqrt(TRADING_DAYS) * (mean - risk_free_rate / TRADING_DAYS) / std, 0.0)
+
+    # Les rendements cumulés valent total[t] / total[1] : drawdown calculé directement sur le total
+    drawdown = np.maximum.accumulate(total, axis=0)
+    np.divide(total, drawdown, out=drawdown)
+    max_drawdown = drawdown.min(axis=0) - 1
+
+    final_capital = total[-1]
+    return {
+        'final_capital': final_capital,
+        'total_return': (final_capital - initial_capital) / initial_capital,
+        'sharpe_ratio': sharpe,
+        'max_drawdown': max_drawdown,
+    }
+
+
+def _evaluate_grid(close, combos, make_signals, initial_capital, risk_free_rate):
+    """Évalue les combinaisons par blocs dont la taille est bornée par CHUNK_CELLS"""
+    chunk = max(1, CHUNK_CELLS // max(len(close), 1))
+    results = {key: np.empty(len(combos)) for key in ('final_capital', 'total_return', 'sharpe_ratio', 'max_drawdown')}
+    for start in range(0, len(combos), chunk):
+        stop = min(start + chunk, len(combos))
+        metrics = evaluate_signals(close, make_signals(start, stop), initial_capital, risk_free_rate)
+        for key, values in metrics.items():
+            results[key][start:stop] = values
+    return results
+
+
+def sma_crossover_combos(close, combos):
+    """Générateur de signaux de croisement pour une liste de combinaisons (court, long)
+
+    Les moyennes mobiles de toutes les fenêtres sont calculées une seule fois ;
+    make_signals(colonnes) retourne les signaux (temps × combinaisons) des colonnes
+    demandées (tranche ou tableau d'indices).
+    """
+    windows = sorted({s for s, _ in combos} | {l for _, l in combos})
+    means = rolling_means(close, windows)
+    column_of = {window: column for column, window in enumerate(windows)}
+    short_columns = np.array([column_of[s] for s, _ in combos], dtype=np.intp)
+    long_columns = np.array([column_of[l] for _, l in combos], dtype=np.intp)
+
+    def make_signals(columns):
+        # Les comparaisons avec NaN sont fausses : signal nul tant qu'une moyenne manque
+        return means[:, short_columns[columns]] > means[:, long_columns[columns]]
+
+    return make_signals
+
+
+def rsi_combos(close, combos):
+    """Générateur de signaux RSI pour une liste de combinaisons (fenêtre, surachat, survente)
+
+    Un RSI par fenêtre distincte, calculé une seule fois sur tout l'historique.
+    """
+    windows = list(dict.fromkeys(w for w, _, _ in combos))
+    rsi = np.column_stack([wilder_rsi(close, window) for window in windows]) if windows else np.empty((len(close), 0))
+    column_of = {window: column for column, window in enumerate(windows)}
+    rsi_columns = np.array([column_of[w] for w, _, _ in combos], dtype=np.intp)
+    overbought = np.array([ob for _, ob, _ in combos], dtype=float)
+    oversold = np.array([os_ for _, _, os_ in combos], dtype=float)
+
+    def make_signals(columns):
+        values = rsi[:, rsi_columns[columns]]
+        # Achat sous le seuil de survente, vente au-dessus du seuil de surachat (prioritaire)
+        return np.where(values > overbought[columns], -1.0, np.where(values < oversold[columns], 1.0, 0.0))
+
+    return make_signals
+
+
+def sma_crossover_grid(close, short_windows, long_windows):
+    """Grille de la stratégie de croisement : table des combinaisons et générateur de signaux"""
+    combos = list(itertools.product(short_windows, long_windows))
+    return pd.DataFrame(combos, columns=['short_window', 'long_window']), sma_crossover_combos(close, combos)
+
+
+def rsi_grid(close, windows, overbought_levels, oversold_levels):
+    """Grille de la stratégie RSI : table des combinaisons et générateur de signaux"""
+    combos = list(itertools.product(windows, overbought_levels, oversold_levels))
+    return pd.DataFrame(combos, columns=['window', 'overbought', 'oversold']), rsi_combos(close, combos)
+
+
+def _sweep(close, table, make_signals, initial_capital, risk_free_rate):
+    results = _evaluate_grid(close, table, lambda start, stop: make_signals(slice(start, stop)),
+                             initial_capital, risk_free_rate)
+    for key, values in results.items():
+        table[key] = values
+    return table
+
+
+def sweep_sma_crossover(close, short_windows, long_windows, initial_capital=10000.0, risk_free_rate=0.02):
+    """Évalue la stratégie de croisement de moyennes mobiles pour toute une grille de fenêtres"""
+    close = np.asarray(close, dtype=float)
+    table, make_signals = sma_crossover_grid(close, short_windows, long_windows)
+    return _sweep(close, table, make_signals, initial_capital, risk_free_rate)
+
+
+def sweep_rsi(close, windows, overbought_levels, oversold_levels, initial_capital=10000.0, risk_free_rate=0.02):
+    """Évalue la stratégie RSI pour toute une grille de fenêtres et de seuils"""
+    close = np.asarray(close, dtype=float)
+    table, make_signals = rsi_grid(close, windows, overbought_levels, oversold_levels)
+    return _sweep(close, table, make_signals, initial_capital, risk_free_rate)
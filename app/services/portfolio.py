@@ -0,0 +1,246 @@
+import threading
+import numpy as np
+import pandas as pd
+
+# Types de transaction, stockés sous forme de code dans le journal
+TRANSACTION_TYPES = ('BUY', 'SELL')
+
+TRANSACTION_DTYPE = np.dtype([
+    ('timestamp', 'datetime64[ns]'),
+    ('symbol', 'i4'),       # indice dans la table des symboles du journal
+    ('type', 'i1'),         # indice dans TRANSACTION_TYPES
+    ('quantity', 'i8'),
+    ('price', 'f8'),
+    ('total', 'f8'),
+])
+
+HISTORY_DTYPE = np.dtype([
+    ('timestamp', 'datetime64[ns]'),
+    ('total_value', 'f8'),
+])
+
+
+def utc_naive(timestamp):
+    """Horodatage UTC sans fuseau, commun aux opérations de toutes les places de cotation
+
+    Un horodatage avec fuseau est converti en UTC ; un horodatage naïf est considéré
+    comme déjà exprimé en UTC.
+    """
+    timestamp = pd.Timestamp(timestamp)
+    if timestamp.tzinfo is not None:
+        timestamp = timestamp.tz_convert('UTC').tz_localize(None)
+    return timestamp
+
+
+class GrowableArray:
+    """Tableau structuré NumPy préalloué, dont la capacité double lorsqu'il est plein"""
+
+    def __init__(self, dtype, capacity=1024):
+        self._data = np.empty(capacity, dtype=dtype)
+        self._size = 0
+
+    def __len__(self):
+        return self._size
+
+    def append(self, row):
+        """Ajoute une ligne en O(1) amorti"""
+        if self._size == len(self._data):
+            grown = np.empty(max(2 * len(self._data), 1), dtype=self._data.dtype)
+            grown[:self._size] = self._data
+            self._data = grown
+        self._data[self._size] = row
+        self._size += 1
+
+    def extend(self, rows):
+        """Ajoute un tableau de lignes en une seule copie"""
+        needed = self._size + len(rows)
+        if needed > len(self._data):
+            grown = np.empty(max(2 * len(self._data), needed), dtype=self._data.dtype)
+            grown[:self._size] = self._data[:self._size]
+            self._data = grown
+        self._data[self._size:needed] = rows
+        self._size = needed
+
+    def view(self):
+        """Vue (sans copie) sur les lignes remplies"""
+        return self._data[:self._size]
+
+    @property
+    def nbytes(self):
+        return self._data.nbytes
+
+
+class Position:
+    """Position détenue sur un symbole"""
+
+    __slots__ = ('quantity', 'avg_price')
+
+    def __init__(self, quantity, avg_price):
+        self.quantity = quantity
+        self.avg_price = avg_price
+
+
+class Ledger:
+    """Journal des transactions et de l'historique de valeur du portefeuille
+
+    Les horodatages sont stockés en UTC (sans fuseau), quelle que soit la place de cotation.
+    """
+
+    def __init__(self, capacity=1024):
+        self.transactions = GrowableArray(TRANSACTION_DTYPE, capacity)
+        self.history = GrowableArray(HISTORY_DTYPE, capacity)
+        self.symbols = []
+        self._symbol_codes = {}
+        # Index par symbole : code du symbole -> positions de ses transactions dans le journal
+        self._rows_by_symbol = {}
+
+    def symbol_code(self, symbol):
+        code = self._symbol_codes.get(symbol)
+        if code is None:
+            code = self._symbol_codes[symbol] = len(self.symbols)
+            self.symbols.append(symbol)
+        return code
+
+    def _symbol_rows(self, code):
+        rows = self._rows_by_symbol.get(code)
+        if rows is None:
+            rows = self._rows_by_symbol[code] = GrowableArray(np.int64, 64)
+        return rows
+
+    def record_transaction(self, timestamp, symbol, trade_type, quantity, price, total):
+        code = self.symbol_code(symbol)
+        self._symbol_rows(code).append(len(self.transactions))
+        self.transactions.append((
+            np.datetime64(utc_naive(timestamp), 'ns'),
+            code,
+            TRANSACTION_TYPES.index(trade_type),
+            quantity,
+            price,
+            total
+        ))
+
+    def extend_transactions(self, rows):
+        """Ajoute un tableau de transactions (TRANSACTION_DTYPE) et met à jour l'index par symbole"""
+        first = len(self.transactions)
+        self.transactions.extend(rows)
+        positions = np.arange(first, first + len(rows))
+        for code in np.unique(rows['symbol']):
+            self._symbol_rows(int(code)).extend(positions[rows['symbol'] == code])
+
+    def symbol_transactions(self, symbol, start=None):
+        """Transactions d'un symbole (tableau structuré), postérieures à `start` si fourni"""
+        code = self._symbol_codes.get(symbol)
+        if code is None:
+            return self.transactions.view()[:0]
+        rows = self.transactions.view()[self._symbol_rows(code).view()]
+        if start is not None:
+            rows = rows[rows['timestamp'] >= np.datetime64(utc_naive(start), 'ns')]
+        return rows
+
+    def record_history(self, timestamp, total_value):
+        self.history.append((np.datetime64(utc_naive(timestamp), 'ns'), total_value))
+
+    def transactions_frame(self, last=None):
+        """DataFrame des transactions, les colonnes numériques étant des vues sur le journal"""
+        rows = self.transactions.view()
+        if last is not None:
+            rows = rows[-last:] if last > 0 else rows[:0]
+        return pd.DataFrame({
+            'timestamp': rows['timestamp'],
+            'symbol': pd.Categorical.from_codes(rows['symbol'], categories=list(self.symbols)),
+            'type': pd.Categorical.from_codes(rows['type'], categories=list(TRANSACTION_TYPES)),
+            'quantity': rows['quantity'],
+            'price': rows['price'],
+            'total': rows['total'],
+        }, copy=False)
+
+    def history_frame(self):
+        """DataFrame de l'historique de valeur, sans copie des données"""
+        rows = self.history.view()
+        return pd.DataFrame({'timestamp': rows['timestamp'], 'total_value': rows['total_value']}, copy=False)
+
+
+class Portfolio:
+    """Portefeuille simulé : liquidités, positions et journal des opérations
+
+    Un même portefeuille peut être partagé par plusieurs sessions : chaque opération
+    (contrôle, mise à jour et enregistrement) s'exécute sous `lock`, que les lecteurs
+    prennent aussi pour lire un état cohérent.
+    """
+
+    def __init__(self, cash=10000.0):
+        self.initial_cash = cash
+        self.cash = cash
+        self.holdings = {}
+        self.ledger = Ledger()
+        # Incrémenté à chaque opération, pour ne rafraîchir que les vues concernées
+        self.version = 0
+        # PortfolioStore optionnel auquel chaque opération est transmise
+        self.store = None
+        # ValuationEngine optionnel qui valorise l'historique au dernier cours connu
+        self.valuation = None
+        self.lock = threading.RLock()
+
+    def buy(self, symbol, price, quantity, timestamp=None):
+        """Achète `quantity` titres au prix `price`, lève ValueError si les liquidités manquent"""
+        with self.lock:
+            cost = price * quantity
+            if cost > self.cash:
+                raise ValueError("Liquidités insuffisantes pour cette transaction")
+
+            self.cash -= cost
+            position = self.holdings.get(symbol)
+            if position is None:
+                self.holdings[symbol] = Position(quantity, price)
+            else:
+                total_quantity = position.quantity + quantity
+                position.avg_price = (position.quantity * position.avg_price + cost) / total_quantity
+                position.quantity = total_quantity
+
+            self._record(timestamp, symbol, 'BUY', quantity, price, cost)
+
+    def sell(self, symbol, price, quantity, timestamp=None):
+        """Vend `quantity` titres au prix `price`, lève ValueError si la position est insuffisante"""
+        with self.lock:
+            position = self.holdings.get(symbol)
+            if position is None or position.quantity < quantity:
+                raise ValueError("Vous ne possédez pas assez d'actions pour cette vente")
+
+            proceeds = price * quantity
+            self.cash += proceeds
+            position.quantity -= quantity
+            if position.quantity == 0:
+                del self.holdings[symbol]
+
+            self._record(timestamp, symbol, 'SELL', quantity, price, proceeds)
+
+    def _record(self, timestamp, symbol, trade_type, quantity, price, total):
+        timestamp = timestamp if timestamp is not None else pd.Timestamp.now(tz='UTC')
+        self.ledger.record_transaction(timestamp, symbol, trade_type, quantity, price, total)
+        total_value = self._market_value(symbol, price)
+        self.ledger.record_history(timestamp, total_value)
+        self.version += 1
+        if self.store is not None:
+            self.store.record(timestamp, symbol, trade_type, quantity, price, total,
+                              self.cash, self.holdings.get(symbol), total_value)
+
+    def _market_value(self, symbol, price):
+        """Valeur après une opération : cours d'exécution pour le symbole négocié, dernier
+        cours connu du moteur de valorisation pour les autres positions
+
+        Appelé sous `lock` : seules les cotations déjà en mémoire sont utilisées (prix moyen
+        d'achat à défaut), une requête réseau bloquerait toutes les sessions.
+        """
+        if self.valuation is not None:
+            _, total_value = self.valuation.value(self, overrides={symbol: price}, fetch=False)
+            return total_value
+        return self.total_value({symbol: price})
+
+    def total_value(self, prices=None):
+        """Valeur totale : liquidités plus positions, au prix fourni ou à défaut au prix moyen d'achat"""
+        prices = prices or {}
+        with self.lock:
+            value = self.cash
+            for symbol, position in self.holdings.items():
+                value += position.quantity * prices.get(symbol, position.avg_price)
+        return value
@@ -0,0 +1,189 @@
+import numpy as np
+import pandas as pd
+from . import risk
+
+# Backtest d'un portefeuille multi-actifs sur une matrice de clôtures (temps × actifs).
+#
+# Entre deux rééquilibrages le nombre de titres détenus est constant : la valeur du
+# portefeuille est celle du dernier rééquilibrage multipliée par Σ w_i · p_i(t) / p_i(r)
+# + liquidités, et les poids dérivent avec les prix. Toutes les barres d'un segment se
+# calculent donc d'un coup, et les segments s'enchaînent par un produit cumulé de leurs
+# facteurs de croissance (frais compris). Le calendrier des rééquilibrages périodiques est
+# connu d'avance : aucun parcours des barres en Python. Un rééquilibrage sur seuil dépend
+# de la dérive depuis le précédent : on boucle sur les rééquilibrages (pas sur les barres),
+# chacun cherchant le prochain franchissement de façon vectorisée.
+
+TRADING_DAYS = 252
+THRESHOLD_BLOCK = 64
+
+
+def signals_to_weights(signals, long_only=True):
+    """Poids cibles à partir d'une matrice de signaux : équipondération des positions actives
+
+    Un signal positif est une position acheteuse, négatif une position vendeuse (ignorée
+    avec long_only). Les poids d'une barre sont les signaux divisés par la somme de leurs
+    valeurs absolues ; une barre sans signal est entièrement en liquidités.
+    """
+    matrix, wrap = risk.as_matrix(signals)
+    matrix = np.nan_to_num(matrix)
+    if long_only:
+        matrix = np.maximum(matrix, 0.0)
+    gross = np.abs(matrix).sum(axis=1, keepdims=True)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        weights = np.where(gross > 0, matrix / gross, 0.0)
+    return wrap(weights)
+
+
+def periodic_schedule(index, rebalance):
+    """Barres de rééquilibrage : toutes les `rebalance` barres (entier) ou à la première
+    barre de chaque période d'une fréquence pandas ('W', 'M', 'Q', 'Y'...)"""
+    n_bars = len(index)
+    flags = np.zeros(n_bars, dtype=bool)
+    if n_bars == 0:
+        return flags
+    if isinstance(rebalance, (int, np.integer)):
+        if rebalance < 1:
+            raise ValueError("La période de rééquilibrage doit être d'au moins une barre")
+        flags[::rebalance] = True
+        return flags
+    if not isinstance(index, pd.DatetimeIndex):
+        raise ValueError("Un rééquilibrage calendaire nécessite un index de dates")
+    if index.tz is not None:
+        index = index.tz_localize(None)
+    periods = index.to_period(rebalance).asi8
+    flags[0] = True
+    flags[1:] = periods[1:] != periods[:-1]
+    return flags
+
+
+def _threshold_schedule(prices, targets, threshold, periodic=None):
+    """Rééquilibre dès qu'un poids s'écarte de sa cible de plus de `threshold`
+
+    Une itération par rééquilibrage : la dérive depuis le dernier rééquilibrage est évaluée
+    sur des blocs de barres de taille croissante jusqu'au premier franchissement (ou au
+    prochain rééquilibrage périodique).
+    """
+    n_bars = len(prices)
+    flags = np.zeros(n_bars, dtype=bool)
+    if n_bars == 0:
+        return flags
+    flags[0] = True
+    scheduled = np.flatnonzero(periodic) if periodic is not None else np.empty(0, dtype=np.intp)
+    last = 0
+    while last < n_bars - 1:
+        weights = targets[last]
+        cash = 1.0 - weights.sum()
+        position = np.searchsorted(scheduled, last, side='right')
+        limit = scheduled[position] if position < len(scheduled) else n_bars
+        next_rebalance = limit if limit < n_bars else None
+        lo, size = last + 1, THRESHOLD_BLOCK
+        while lo < limit:
+            hi = min(limit, lo + size)
+            drift = weights * (prices[lo:hi] / prices[last])
+            drift /= (drift.sum(axis=1) + cash)[:, np.newaxis]
+            breaches = np.flatnonzero(np.abs(drift - targets[lo:hi]).max(axis=1) > threshold)
+            if len(breaches):
+                next_rebalance = lo + breaches[0]
+                break
+            lo, size = hi, size * 2
+        if next_rebalance is None:
+            break
+        flags[next_rebalance] = True
+        last = next_rebalance
+    return flags
+
+
+def backtest_portfolio(prices, weights=None, signals=None, rebalance='M', threshold=None, fee_rate=0.001,
+                       initial_capital=10000.0, risk_free_rate=0.02, long_only=True):
+    """Backteste un portefeuille multi-actifs rééquilibré vers des poids cibles
+
+    prices : clôtures alignées (temps × actifs), par exemple
+        MarketDataLoader.load_many(symbols, panel=True)[0]. Les valeurs manquantes avant la
+        cotation d'un actif (ou après sa disparition) rendent sa cible nulle.
+    weights : poids cibles (temps × actifs), le reste en liquidités (non rémunérées)
+    signals : à défaut de poids, signaux convertis par signals_to_weights
+    rebalance : période (entier, en barres), fréquence pandas ('W', 'M', 'Q'...) ou None
+        pour rééquilibrer à chaque changement de cible
+    threshold : écart maximum d'un poids à sa cible, qui déclenche un rééquilibrage
+        (en plus du calendrier périodique éventuel)
+    fee_rate : frais proportionnels au montant échangé
+
+    Comme backtest_strategy, la cible d'une barre est exécutée à sa clôture : les signaux
+    doivent être décalés par l'appelant pour ne négocier qu'à la barre suivante.
+    """
+    if (weights is None) == (signals is None):
+        raise ValueError("Il faut des poids cibles ou des signaux (l'un des deux)")
+    if isinstance(prices, pd.DataFrame):
+        index, columns = prices.index, prices.columns
+    else:
+        prices = np.asarray(prices, dtype=float)
+        index, columns = pd.RangeIndex(len(prices)), pd.RangeIndex(prices.shape[1])
+        prices = pd.DataFrame(prices, index=index, columns=columns)
+    listed = prices.notna().to_numpy()
+    close = prices.ffill().bfill().to_numpy(dtype=float)
+
+    targets = weights if weights is not None else signals
+    if isinstance(targets, pd.DataFrame):
+        targets = targets.reindex(index=index, columns=columns)
+    targets = np.nan_to_num(np.asarray(targets, dtype=float))
+    if targets.shape != close.shape:
+        raise ValueError("Les cibles doivent avoir la forme des prix (temps × actifs)")
+    targets = np.where(listed, targets, 0.0)
+    if weights is None:
+        targets = signals_to_weights(targets, long_only)
+
+    n_bars = len(close)
+    if n_bars == 0:
+        raise ValueError("Aucune barre de prix")
+    if rebalance is None:
+        flags = np.ones(n_bars, dtype=bool)
+        flags[1:] = (targets[1:] != targets[:-1]).any(axis=1)
+    else:
+        flags = periodic_schedule(index, rebalance)
+    if threshold is not None:
+        flags = _threshold_schedule(close, targets, threshold, flags if rebalance is not None else None)
+
+    # Segments entre rééquilibrages : poids et liquidités fixés à l'ouverture du segment
+    starts = np.flatnonzero(flags)
+    segment = np.cumsum(flags) - 1
+    start_weights = targets[starts]
+    start_cash = 1.0 - start_weights.sum(axis=1)
+
+    # Valeur relative à celle du début du segment, et poids dérivés à chaque barre
+    held = start_weights[segment] * (close / close[starts][segment])
+    relative = held.sum(axis=1) + start_cash[segment]
+    drifted = held / relative[:, np.newaxis]
+
+    # Poids juste avant chaque rééquilibrage (tout en liquidités avant le premier)
+    before = np.zeros_like(start_weights)
+    growth = np.ones(len(starts))
+    if len(starts) > 1:
+        previous = start_weights[:-1] * (close[starts[1:]] / close[starts[:-1]])
+        growth[1:] = previous.sum(axis=1) + start_cash[:-1]
+        before[1:] = previous / growth[1:, np.newaxis]
+    turnover = np.abs(start_weights - before).sum(axis=1)
+
+    # Frais prélevés sur la valeur avant échange, proportionnellement à la rotation
+    value_after = initial_capital * np.cumprod(growth * (1.0 - fee_rate * turnover))
+    value_before = growth * np.concatenate(([initial_capital], value_after[:-1]))
+    equity = value_after[segment] * relative
+    fees = np.zeros(n_bars)
+    fees[starts] = value_before * fee_rate * turnover
+    bar_turnover = np.zeros(n_bars)
+    bar_turnover[starts] = turnover
+
+    equity = pd.Series(equity, index=index, name='equity')
+    returns = equity.pct_change().fillna(0.0)
+    final_capital = float(equity.iloc[-1])
+    return {
+        'equity': equity,
+        'returns': returns,
+        'weights': pd.DataFrame(drifted, index=index, columns=columns),
+        'turnover': pd.Series(bar_turnover, index=index, name='turnover'),
+        'fees': pd.Series(fees, index=index, name='fees'),
+        'rebalances': index[starts],
+        'final_capital': final_capital,
+        'total_return': (final_capital - initial_capital) / initial_capital,
+        'sharpe_ratio': risk.sharpe_ratio(returns, risk_free_rate, TRADING_DAYS),
+        'max_drawdown': risk.max_drawdown(equity),
+    }
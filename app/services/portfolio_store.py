@@ -0,0 +1,248 @@
+import atexit
+import logging
+import os
+import queue
+import sqlite3
+import threading
+import numpy as np
+import pandas as pd
+from .portfolio import Portfolio, Position, TRANSACTION_TYPES, utc_naive
+
+logger = logging.getLogger(__name__)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS account (
+    key TEXT PRIMARY KEY,
+    value REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS holdings (
+    symbol TEXT PRIMARY KEY,
+    quantity INTEGER NOT NULL,
+    avg_price REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS transactions (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    timestamp INTEGER NOT NULL,
+    symbol TEXT NOT NULL,
+    type TEXT NOT NULL,
+    quantity INTEGER NOT NULL,
+    price REAL NOT NULL,
+    total REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_transactions_symbol_timestamp ON transactions (symbol, timestamp);
+CREATE INDEX IF NOT EXISTS idx_transactions_timestamp ON transactions (timestamp);
+CREATE TABLE IF NOT EXISTS history (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    timestamp INTEGER NOT NULL,
+    total_value REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_history_timestamp ON history (timestamp);
+"""
+
+# Requêtes constantes : sqlite3 garde les instructions préparées en cache par connexion
+INSERT_TRANSACTION = "INSERT INTO transactions (timestamp, symbol, type, quantity, price, total) VALUES (?, ?, ?, ?, ?, ?)"
+INSERT_HISTORY = "INSERT INTO history (timestamp, total_value) VALUES (?, ?)"
+UPSERT_HOLDING = ("INSERT INTO holdings (symbol, quantity, avg_price) VALUES (?, ?, ?) "
+                  "ON CONFLICT(symbol) DO UPDATE SET quantity = excluded.quantity, avg_price = excluded.avg_price")
+DELETE_HOLDING = "DELETE FROM holdings WHERE symbol = ?"
+UPSERT_ACCOUNT = "INSERT INTO account (key, value) VALUES (?, ?) ON CONFLICT(key) DO UPDATE SET value = excluded.value"
+
+
+def sqlite_path(database_url):
+    """Chemin du fichier SQLite d'une URL de la forme sqlite:///./trading.db"""
+    prefix = "sqlite:///"
+    if not database_url.startswith(prefix):
+        raise ValueError(f"URL de base de données non supportée : {database_url}")
+    return database_url[len(prefix):] or ":memory:"
+
+
+def _to_ns(timestamp):
+    """Nanosecondes UTC depuis l'époque"""
+    return utc_naive(timestamp).value
+
+
+class PortfolioStore:
+    """Persistance SQLite du portefeuille : liquidités, positions, transactions et historique
+
+    La base est ouverte en mode WAL. Les écritures sont mises en file et appliquées par
+    un thread dédié, par lots regroupés dans une seule transaction : l'enregistrement
+    d'une opération ne fait qu'ajouter un élément à la file. Les lectures portent sur
+    des plages de dates couvertes par les index (symbol, timestamp) et (timestamp).
+    """
+
+    def __init__(self, database_url="sqlite:///./trading.db", batch_size=256, flush_interval=0.5):
+        path = sqlite_path(database_url)
+        if path != ":memory:" and os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        # Connexion partagée entre le thread d'écriture et les lectures, protégée par un verrou
+        self._conn = sqlite3.connect(path, check_same_thread=False, cached_statements=64)
+        self._lock = threading.Lock()
+        with self._lock:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.executescript(SCHEMA)
+            self._conn.commit()
+
+        self._queue = queue.Queue()
+        self._closed = False
+        self._writer = threading.Thread(target=self._write_loop, daemon=True)
+        self._writer.start()
+        atexit.register(self.close)
+
+    # Écritures
+
+    def record(self, timestamp, symbol, trade_type, quantity, price, total, cash, position, total_value):
+        """Met en file une opération et l'état du portefeuille qui en résulte"""
+        ts = _to_ns(timestamp)
+        self._queue.put((
+            (ts, symbol, trade_type, int(quantity), float(price), float(total)),
+            (ts, float(total_value)),
+            symbol,
+            None if position is None else (int(position.quantity), float(position.avg_price)),
+            float(cash),
+        ))
+
+    def save_account(self, cash, initial_cash):
+        """Enregistre immédiatement les liquidités du compte"""
+        with self._lock:
+            self._conn.executemany(UPSERT_ACCOUNT, [('cash', cash), ('initial_cash', initial_cash)])
+            self._conn.commit()
+
+    def _write_loop(self):
+        while True:
+            try:
+                item = self._queue.get(timeout=self.flush_interval)
+            except queue.Empty:
+                continue
+            if item is None:
+                self._queue.task_done()
+                return
+            batch = [item]
+            while len(batch) < self.batch_size:
+                try:
+                    item = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if item is None:
+                    # Le signal d'arrêt est remis en file après l'écriture du lot
+                    self._queue.task_done()
+                    self._queue.put(None)
+                    break
+                batch.append(item)
+            try:
+                self._write_batch(batch)
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+
+    def _write_batch(self, batch):
+        # Seul l'état final de chaque position et des liquidités doit être écrit
+        holdings = {}
+        for _, _, symbol, position, _ in batch:
+            holdings[symbol] = position
+        with self._lock:
+            try:
+                self._conn.executemany(INSERT_TRANSACTION, [item[0] for item in batch])
+                self._conn.executemany(INSERT_HISTORY, [item[1] for item in batch])
+                self._conn.executemany(UPSERT_HOLDING, [(s, *pos) for s, pos in holdings.items() if pos is not None])
+                self._conn.executemany(DELETE_HOLDING, [(s,) for s, pos in holdings.items() if pos is None])
+                self._conn.execute(UPSERT_ACCOUNT, ('cash', batch[-1][4]))
+                self._conn.commit()
+            except sqlite3.Error as e:
+                self._conn.rollback()
+                logger.error("Erreur lors de l'écriture du portefeuille : %s", e)
+
+    def flush(self):
+        """Attend que toutes les écritures en file soient appliquées"""
+        self._queue.join()
+
+    def close(self):
+        if self._closed:
+            return
+        self._closed = True
+        self._queue.put(None)
+        self._writer.join()
+        with self._lock:
+            self._conn.close()
+
+    # Lectures
+
+    def transactions(self, symbol=None, start=None, end=None):
+        """Transactions d'une plage de dates, éventuellement filtrées par symbole"""
+        clauses, params = [], []
+        if symbol is not None:
+            clauses.append("symbol = ?")
+            params.append(symbol)
+        if start is not None:
+            clauses.append("timestamp >= ?")
+            params.append(_to_ns(start))
+        if end is not None:
+            clauses.append("timestamp <= ?")
+            params.append(_to_ns(end))
+        where = f" WHERE {' AND '.join(clauses)}" if clauses else ""
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT timestamp, symbol, type, quantity, price, total FROM transactions{where} ORDER BY timestamp, id",
+                params
+            ).fetchall()
+        frame = pd.DataFrame(rows, columns=['timestamp', 'symbol', 'type', 'quantity', 'price', 'total'])
+        frame['timestamp'] = pd.to_datetime(frame['timestamp'].astype('int64'), unit='ns')
+        return frame
+
+    def history(self, start=None, end=None):
+        """Historique de valeur du portefeuille sur une plage de dates"""
+        clauses, params = [], []
+        if start is not None:
+            clauses.append("timestamp >= ?")
+            params.append(_to_ns(start))
+        if end is not None:
+            clauses.append("timestamp <= ?")
+            params.append(_to_ns(end))
+        where = f" WHERE {' AND '.join(clauses)}" if clauses else ""
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT timestamp, total_value FROM history{where} ORDER BY timestamp, id", params
+            ).fetchall()
+        frame = pd.DataFrame(rows, columns=['timestamp', 'total_value'])
+        frame['timestamp'] = pd.to_datetime(frame['timestamp'].astype('int64'), unit='ns')
+        return frame
+
+    def load_portfolio(self, cash=10000.0, start=None):
+        """Reconstruit un Portfolio relié à la base, à partir de `start` pour le journal
+
+        Si la base est vide, le compte est créé avec `cash` en liquidités.
+        """
+        with self._lock:
+            account = dict(self._conn.execute("SELECT key, value FROM account").fetchall())
+            holdings = self._conn.execute("SELECT symbol, quantity, avg_price FROM holdings").fetchall()
+
+        if 'cash' not in account:
+            self.save_account(cash, cash)
+            portfolio = Portfolio(cash)
+        else:
+            portfolio = Portfolio(account.get('initial_cash', cash))
+            portfolio.cash = account['cash']
+            portfolio.holdings = {symbol: Position(quantity, avg_price) for symbol, quantity, avg_price in holdings}
+
+        ledger = portfolio.ledger
+        transactions = self.transactions(start=start)
+        if len(transactions):
+            rows = np.empty(len(transactions), dtype=ledger.transactions.view().dtype)
+            rows['timestamp'] = transactions['timestamp'].to_numpy()
+            rows['symbol'] = [ledger.symbol_code(symbol) for symbol in transactions['symbol']]
+            rows['type'] = transactions['type'].map(TRANSACTION_TYPES.index).to_numpy()
+            rows['quantity'] = transactions['quantity'].to_numpy()
+            rows['price'] = transactions['price'].to_numpy()
+            rows['total'] = transactions['total'].to_numpy()
+            ledger.extend_transactions(rows)
+        history = self.history(start=start)
+        if len(history):
+            rows = np.empty(len(history), dtype=ledger.history.view().dtype)
+            rows['timestamp'] = history['timestamp'].to_numpy()
+            rows['total_value'] = history['total_value'].to_numpy()
+            ledger.history.extend(rows)
+
+        portfolio.store = self
+        return portfolio
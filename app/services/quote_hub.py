@@ -0,0 +1,185 @@
+import itertools
+import logging
+import threading
+import time
+from .market_data_loader import bars_changed, default_interval, default_loader
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_REFRESH_INTERVAL = 15   # Secondes entre deux requêtes pour un même flux
+DEFAULT_IDLE_TIMEOUT = 300      # Un abonnement non lu depuis ce délai est abandonné
+
+
+class _Feed:
+    """Flux partagé d'un (symbole, période, intervalle), tenu à jour par un seul thread"""
+
+    def __init__(self, key):
+        self.key = key
+        self.data = None
+        self.version = 0
+        # Incrémenté à chaque rechargement complet : les abonnés repartent alors de zéro
+        self.reloads = 0
+        self.error = None
+        self.subscriptions = {}
+        self.lock = threading.Lock()
+        self.loaded = threading.Event()
+        self.stop = threading.Event()
+        self.thread = None
+
+
+class Subscription:
+    """Abonnement d'une session à un flux : lecture des données sans requête réseau"""
+
+    def __init__(self, hub, feed, subscription_id, refresh_interval):
+        self._hub = hub
+        self._feed = feed
+        self.id = subscription_id
+        self.refresh_interval = refresh_interval
+        self.last_read = time.monotonic()
+        self.closed = False
+
+    @property
+    def key(self):
+        return self._feed.key
+
+    def snapshot(self):
+        """Retourne (données, version, nombre de rechargements complets) du flux"""
+        self.last_read = time.monotonic()
+        feed = self._feed
+        with feed.lock:
+            return feed.data, feed.version, feed.reloads
+
+    def close(self):
+        if not self.closed:
+            self.closed = True
+            self._hub._unsubscribe(self._feed, self.id)
+
+
+class QuoteHub:
+    """Cache de cotations partagé par toutes les sessions du processus
+
+    Chaque (symbole, période, intervalle) suivi par au moins une session est rafraîchi par
+    un unique thread, à l'intervalle le plus court demandé par ses abonnés. Les sessions
+    lisent un instantané des données sans jamais interroger la source : le nombre de
+    requêtes dépend du nombre de symboles distincts et non du nombre de sessions. Un flux
+    s'arrête lorsque son dernier abonnement est fermé ou n'a plus été lu depuis idle_timeout.
+    """
+
+    def __init__(self, loader=None, refresh_interval=DEFAULT_REFRESH_INTERVAL, idle_timeout=DEFAULT_IDLE_TIMEOUT):
+        self.loader = loader or default_loader
+        self.refresh_interval = refresh_interval
+        self.idle_timeout = idle_timeout
+        self._feeds = {}
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+        self.requests = 0
+
+    def subscribe(self, symbol, period="1y", interval=None, refresh_interval=None):
+        """Abonne une session au flux ; le premier abonné attend le chargement initial"""
+        key = (symbol, period, interval or default_interval(period))
+        with self._lock:
+            feed = self._feeds.get(key)
+            created = feed is None
+            if created:
+                feed = self._feeds[key] = _Feed(key)
+            subscription = Subscription(self, feed, next(self._ids), refresh_interval or self.refresh_interval)
+            with feed.lock:
+                feed.subscriptions[subscription.id] = subscription
+
+        if created:
+            self._load(feed)
+            feed.thread = threading.Thread(target=self._run, args=(feed,), daemon=True)
+            feed.thread.start()
+        else:
+            feed.loaded.wait()
+        return subscription
+
+    def _unsubscribe(self, feed, subscription_id):
+        with self._lock:
+            with feed.lock:
+                feed.subscriptions.pop(subscription_id, None)
+                empty = not feed.subscriptions
+            if empty and self._feeds.get(feed.key) is feed:
+                del self._feeds[feed.key]
+                feed.stop.set()
+
+    def _load(self, feed):
+        symbol, period, interval = feed.key
+        try:
+            self.requests += 1
+            data = self.loader.load(symbol, period, interval)
+            with feed.lock:
+                feed.data = data
+                feed.error = None
+                if data is not None:
+                    feed.version += 1
+        except Exception as e:
+            with feed.lock:
+                feed.error = str(e)
+        finally:
+            feed.loaded.set()
+
+    def _refresh(self, feed):
+        symbol, period, interval = feed.key
+        with feed.lock:
+            current = feed.data
+        if current is None:
+            self._load(feed)
+            return
+        try:
+            self.requests += 1
+            data, full_reload = self.loader.update(symbol, period, interval, current)
+        except Exception as e:
+            with feed.lock:
+                feed.error = str(e)
+            logger.warning("Erreur lors du rafraîchissement du flux %s: %s", symbol, e)
+            return
+        if data is None or len(data) < 2:
+            return
+        if not bars_changed(current, data, full_reload):
+            return
+        with feed.lock:
+            feed.data = data
+            feed.version += 1
+            feed.error = None
+            if full_reload:
+                feed.reloads += 1
+
+    def _next_interval(self, feed):
+        """Intervalle le plus court demandé, après abandon des abonnements inactifs"""
+        now = time.monotonic()
+        with feed.lock:
+            for subscription_id, subscription in list(feed.subscriptions.items()):
+                if now - subscription.last_read > self.idle_timeout:
+                    subscription.closed = True
+                    del feed.subscriptions[subscription_id]
+            intervals = [s.refresh_interval for s in feed.subscriptions.values()]
+        if not intervals:
+            self._unsubscribe(feed, None)
+            return None
+        return min(intervals)
+
+    def _run(self, feed):
+        while True:
+            interval = self._next_interval(feed)
+            if interval is None:
+                # Un abonné a pu rejoindre le flux entre-temps : il n'est arrêté que s'il a été retiré
+                if feed.stop.is_set():
+                    return
+                continue
+            if feed.stop.wait(interval):
+                return
+            self._refresh(feed)
+
+    def feeds(self):
+        """État des flux actifs : {(symbole, période, intervalle): (version, abonnés)}"""
+        with self._lock:
+            feeds = list(self._feeds.values())
+        return {feed.key: (feed.version, len(feed.subscriptions)) for feed in feeds}
+
+    def close(self):
+        with self._lock:
+            feeds = list(self._feeds.values())
+            self._feeds.clear()
+        for feed in feeds:
+            feed.stop.set()
@@ -0,0 +1,94 @@
+import time
+
+# Ordonnancement des mises à jour du tableau de bord.
+#
+# Chaque panneau est déclaré avec une cadence (en secondes) et une fonction qui retourne
+# la version de ses données d'entrée. À son échéance, le panneau n'est redessiné que si
+# cette version a changé depuis son dernier rendu ; entre deux échéances, la boucle dort
+# jusqu'à la prochaine échéance de l'ensemble des panneaux au lieu d'un délai fixe.
+#
+# La boucle reste bloquante à dessein. Streamlit 1.25 (version figée dans requirements.txt)
+# n'a ni st.fragment ni rerun périodique : un rerun réexécute tout le script, relit la
+# session et reconstruit chaque widget, alors que la boucle ne touche que les conteneurs
+# st.empty des panneaux dont les données ont changé. Elle ne bloque pas l'interface : une
+# interaction de l'utilisateur interrompt le script en cours (StopException levée au
+# prochain appel Streamlit) et relance un passage complet. Avec st.fragment(run_every=...)
+# (Streamlit ≥ 1.37), chaque panneau deviendrait un fragment et run() disparaîtrait.
+
+_NEVER = object()
+
+
+class _Panel:
+    __slots__ = ('name', 'render', 'inputs', 'cadence', 'next_due', 'last_inputs', 'renders')
+
+    def __init__(self, name, render, inputs, cadence):
+        self.name = name
+        self.render = render
+        self.inputs = inputs
+        self.cadence = cadence
+        self.next_due = 0.0
+        self.last_inputs = _NEVER
+        self.renders = 0
+
+
+class RenderScheduler:
+    """Redessine chaque panneau à sa cadence, uniquement quand ses données ont changé"""
+
+    def __init__(self, clock=time.monotonic, sleep=time.sleep, metrics=None):
+        self.clock = clock
+        self.sleep = sleep
+        # Registre de métriques optionnel : chaque rendu y est mesuré sous « render.<panneau> »
+        self.metrics = metrics
+        self._panels = []
+
+    def add(self, name, render, inputs=None, cadence=1.0):
+        """Déclare un panneau
+
+        render : fonction de rendu sans argument
+        inputs : fonction retournant la version des données du panneau ; sans elle, le
+                 panneau est exécuté à chaque échéance (tâche périodique)
+        cadence : intervalle minimal entre deux vérifications, en secondes
+        """
+        self._panels.append(_Panel(name, render, inputs, cadence))
+
+    def run_due(self):
+        """Exécute les panneaux arrivés à échéance, retourne les noms de ceux redessinés"""
+        rendered = []
+        now = self.clock()
+        for panel in self._panels:
+            if panel.next_due > now:
+                continue
+            panel.next_due = now + panel.cadence
+            current = panel.inputs() if panel.inputs is not None else _NEVER
+            if current is _NEVER or current != panel.last_inputs:
+                if self.metrics is not None:
+                    with self.metrics.span(f"render.{panel.name}"):
+                        panel.render()
+                else:
+                    panel.render()
+                panel.last_inputs = current
+                panel.renders += 1
+                rendered.append(panel.name)
+        return rendered
+
+    def time_to_next(self):
+        """Délai avant la prochaine échéance, en secondes"""
+        if not self._panels:
+            return None
+        return max(0.0, min(panel.next_due for panel in self._panels) - self.clock())
+
+    def run(self, forever=True):
+        """Boucle de rafraîchissement ; avec forever=False, un seul passage
+
+        Bloquante tant que la session est active (voir l'en-tête du module) : c'est le
+        rerun déclenché par une interaction qui l'interrompt.
+        """
+        while True:
+            self.run_due()
+            if not forever:
+                return
+            self.sleep(self.time_to_next())
+
+    def stats(self):
+        """Nombre de rendus par panneau"""
+        return {panel.name: panel.renders for panel in self._panels}
@@ -0,0 +1,107 @@
+import threading
+import time
+import pandas as pd
+from .metrics import instrument
+from .trading_service import TradingService
+
+REPLAY_SPEEDS = (1, 10, 60, 100, 300, 1000)
+
+
+class VirtualClock:
+    """Horloge virtuelle qui avance `speed` fois plus vite que l'horloge réelle"""
+
+    def __init__(self, start, speed=1.0, clock=time.monotonic):
+        if speed <= 0:
+            raise ValueError("La vitesse de l'horloge doit être positive")
+        self._clock = clock
+        self._start = pd.Timestamp(start)
+        self._anchor = clock()
+        self.speed = float(speed)
+        self._lock = threading.Lock()
+
+    def now(self):
+        with self._lock:
+            elapsed = (self._clock() - self._anchor) * self.speed
+            return self._start + pd.Timedelta(seconds=elapsed)
+
+    def set_speed(self, speed):
+        """Change la vitesse sans faire sauter l'heure virtuelle"""
+        if speed <= 0:
+            raise ValueError("La vitesse de l'horloge doit être positive")
+        current = self.now()
+        with self._lock:
+            self._start = current
+            self._anchor = self._clock()
+            self.speed = float(speed)
+
+    def advance(self, delta):
+        """Avance l'heure virtuelle de `delta` (Timedelta ou secondes)"""
+        if not isinstance(delta, pd.Timedelta):
+            delta = pd.Timedelta(seconds=delta)
+        with self._lock:
+            self._start += delta
+
+
+@instrument('trading_service')
+class ReplayTradingService(TradingService):
+    """Rejoue un historique de barres sur une horloge virtuelle
+
+    Même interface que TradingService : data ne contient que les barres antérieures à
+    l'heure virtuelle et refresh() y ajoute celles que l'horloge a atteintes. L'heure
+    courante, l'état du marché et l'horodatage des ordres suivent l'horloge virtuelle,
+    ce qui permet de rejouer une séance en quelques minutes, sans réseau une fois
+    l'historique en cache.
+    """
+
+    def __init__(self, symbol="MC.PA", period="1y", interval=None, speed=60, start=None, warmup=50,
+                 history=None, clock=None, **kwargs):
+        self._history = history
+        self._speed = speed
+        self._start = start
+        self._warmup = warmup
+        self._clock = clock
+        self.clock = None
+        super().__init__(symbol, period, interval, **kwargs)
+
+    def _load_data(self):
+        """Charge tout l'historique et ne publie que les barres déjà « passées »"""
+        if self._history is None:
+            self._history = self.loader.load(self.symbol, self.period, self.interval, max_age=self.max_age)
+        if self._history is None or len(self._history) < 2:
+            return None
+        if self.clock is None:
+            index = self._history.index
+            start = pd.Timestamp(self._start) if self._start is not None else index[min(self._warmup, len(index)) - 1]
+            if start.tzinfo is None and index.tz is not None:
+                start = start.tz_localize(index.tz)
+            self.clock = VirtualClock(start, self._speed, self._clock or time.monotonic)
+        return self._visible()
+
+    def _visible(self):
+        end = self._history.index.searchsorted(self.clock.now(), side='right')
+        return self._history.iloc[:max(end, 2)]
+
+    def refresh(self):
+        """Publie les barres atteintes par l'horloge virtuelle, retourne True s'il y en a"""
+        if self._history is None:
+            return super().refresh()
+        data = self._visible()
+        if self.data is not None and len(data) == len(self.data):
+            return False
+        self.data = data
+        self.data_version += 1
+        return True
+
+    @property
+    def finished(self):
+        return self._history is not None and self.data is not None and len(self.data) == len(self._history)
+
+    def now(self):
+        return self.clock.now() if self.clock is not None else super().now()
+
+    def market_status(self):
+        """État de la place à l'heure virtuelle (fermé hors séance, comme en direct)"""
+        if self.finished:
+            return False, "Rejeu terminé"
+        market_open, message = self.calendar.status(self.now())
+        return market_open, f"Rejeu x{self.clock.speed:g} - {self.now():%d/%m/%Y %H:%M} - {message}"
@@ -0,0 +1,234 @@
+import numpy as np
+import pandas as pd
+
+# Indicateurs de risque vectorisés.
+#
+# Les entrées sont des rendements (ou des courbes de capital) sous forme de vecteur, de
+# Series, ou de matrice (temps × séries) pour évaluer d'un coup les courbes de milliers de
+# backtests. Les statistiques glissantes sont tirées de sommes cumulées calculées une seule
+# fois : toutes les fenêtres en découlent par différence, sans repasser sur les données.
+# Les valeurs manquantes (NaN) sont ignorées.
+#
+# as_matrix, prefix_sums et window_sums sont publics : les autres calculs vectorisés
+# (backtest de portefeuille, walk-forward) s'en servent pour accepter les mêmes entrées
+# et tirer leurs scores par fenêtre des mêmes sommes cumulées.
+
+TRADING_DAYS = 252
+DEFAULT_WINDOWS = (20, 60, 252)
+
+
+def as_matrix(values):
+    """Matrice (temps × séries) de flottants, et fonction qui redonne la forme d'entrée au résultat"""
+    if isinstance(values, pd.DataFrame):
+        index, columns = values.index, values.columns
+        matrix = values.to_numpy(dtype=float)
+        return matrix, lambda result: (pd.DataFrame(result, index=index, columns=columns) if result.ndim == 2
+                                       else pd.Series(result, index=columns))
+    if isinstance(values, pd.Series):
+        index, name = values.index, values.name
+        matrix = values.to_numpy(dtype=float)[:, np.newaxis]
+        return matrix, lambda result: (pd.Series(result[:, 0], index=index, name=name) if result.ndim == 2
+                                       else float(result[0]))
+    array = np.asarray(values, dtype=float)
+    if array.ndim == 1:
+        return array[:, np.newaxis], lambda result: result[:, 0] if result.ndim == 2 else float(result[0])
+    return array, lambda result: result
+
+
+def prefix_sums(values):
+    """Sommes cumulées le long du temps, précédées d'une ligne de zéros"""
+    result = np.zeros((len(values) + 1, values.shape[1]))
+    np.cumsum(values, axis=0, out=result[1:])
+    return result
+
+
+def window_sums(prefix, window):
+    """Sommes glissantes sur `window` barres, NaN tant que la fenêtre n'est pas remplie"""
+    result = np.full((len(prefix) - 1, prefix.shape[1]), np.nan)
+    if window < len(prefix):
+        result[window - 1:] = prefix[window:] - prefix[:-window]
+    return result
+
+
+def rolling_ratios(returns, windows=DEFAULT_WINDOWS, risk_free_rate=0.02, periods=TRADING_DAYS):
+    """Ratios de Sharpe et de Sortino glissants annualisés, pour plusieurs fenêtres
+
+    Retourne {'sharpe': {fenêtre: résultat}, 'sortino': {fenêtre: résultat}}, chaque
+    résultat ayant la forme des rendements. Écart-type non biaisé (ddof=1) comme pandas ;
+    l'écart de baisse est la racine de la moyenne des carrés des rendements excédentaires
+    négatifs.
+    """
+    matrix, wrap = as_matrix(returns)
+    excess = matrix - risk_free_rate / periods
+    valid = ~np.isnan(excess)
+    excess = np.where(valid, excess, 0.0)
+    count = prefix_sums(valid.astype(float))
+    sums = prefix_sums(excess)
+    squares = prefix_sums(excess * excess)
+    downside_squares = prefix_sums(np.minimum(excess, 0.0) ** 2)
+
+    ratios = {'sharpe': {}, 'sortino': {}}
+    for window in windows:
+        n = window_sums(count, window)
+        total = window_sums(sums, window)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            mean = total / n
+            # Variance par différence de sommes : un résidu d'arrondi devant la somme des carrés
+            # (rendements constants) compte pour une variance nulle
+            square_sums = window_sums(squares, window)
+            deviation = square_sums - total * mean
+            variance = np.where(deviation > 1e-10 * square_sums, deviation, 0.0) / (n - 1)
+            downside = np.sqrt(window_sums(downside_squares, window) / n)
+            std = np.sqrt(variance)
+            sharpe = np.where((n > 1) & (std > 0), np.sqrt(periods) * mean / std, np.nan)
+            sortino = np.where((n > 1) & (downside > 0), np.sqrt(periods) * mean / downside, np.nan)
+        ratios['sharpe'][window] = wrap(sharpe)
+        ratios['sortino'][window] = wrap(sortino)
+    return ratios
+
+
+def rolling_sharpe(returns, windows=DEFAULT_WINDOWS, risk_free_rate=0.02, periods=TRADING_DAYS):
+    return rolling_ratios(returns, windows, risk_free_rate, periods)['sharpe']
+
+
+def rolling_sortino(returns, windows=DEFAULT_WINDOWS, risk_free_rate=0.02, periods=TRADING_DAYS):
+    return rolling_ratios(returns, windows, risk_free_rate, periods)['sortino']
+
+
+def sharpe_ratio(returns, risk_free_rate=0.02, periods=TRADING_DAYS):
+    """Ratio de Sharpe annualisé sur toute la série (NaN si l'écart-type est nul)"""
+    matrix, wrap = as_matrix(returns)
+    excess = matrix - risk_free_rate / periods
+    with np.errstate(divide='ignore', invalid='ignore'):
+        mean = np.nanmean(excess, axis=0)
+        std = np.nanstd(excess, axis=0, ddof=1)
+        return wrap(np.where(std > 0, np.sqrt(periods) * mean / std, np.nan))
+
+
+def drawdown(equity):
+    """Drawdown courant (≤ 0) et durée depuis le dernier plus haut, en barres
+
+    Une seule passe d'accumulation pour le plus haut courant et une pour la position du
+    dernier plus haut.
+    """
+    matrix, wrap = as_matrix(equity)
+    running_max = np.fmax.accumulate(matrix, axis=0)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        drawdowns = (matrix - running_max) / running_max
+    positions = np.arange(len(matrix))[:, np.newaxis]
+    last_peak = np.maximum.accumulate(np.where(matrix >= running_max, positions, -1), axis=0)
+    durations = np.where(last_peak >= 0, positions - last_peak, 0)
+    return wrap(drawdowns), wrap(durations)
+
+
+def max_drawdown(equity):
+    """Drawdown maximum (valeur la plus négative) de chaque série"""
+    matrix, wrap = as_matrix(equity)
+    drawdowns, _ = drawdown(matrix)
+    with np.errstate(invalid='ignore'):
+        return wrap(np.nanmin(drawdowns, axis=0) if len(matrix) else np.full(matrix.shape[1], np.nan))
+
+
+def drawdown_periods(equity):
+    """Épisodes de drawdown d'une série : plus haut de départ, creux, fin, profondeur, durée
+
+    La fin est la barre de retour au plus haut, manquante pour un épisode non terminé. La durée
+    est comptée en barres depuis le plus haut, jusqu'à la fin ou jusqu'à la dernière barre.
+    """
+    series = equity if isinstance(equity, pd.Series) else pd.Series(np.asarray(equity, dtype=float))
+    drawdowns, _ = drawdown(series.to_numpy(dtype=float))
+    underwater = np.nan_to_num(drawdowns) < 0
+    edges = np.diff(np.concatenate(([False], underwater, [False])).astype(np.int8))
+    starts = np.flatnonzero(edges == 1)
+    ends = np.flatnonzero(edges == -1)
+    if len(starts) == 0:
+        return pd.DataFrame(columns=['start', 'trough', 'end', 'depth', 'duration'])
+    troughs = np.array([start + np.argmin(drawdowns[start:end]) for start, end in zip(starts, ends)])
+    # Un drawdown ne peut pas commencer à la première barre : starts - 1 est toujours le plus haut
+    index = series.index
+    return pd.DataFrame({
+        'start': index[starts - 1],
+        'trough': index[troughs],
+        'end': [index[end] if end < len(index) else None for end in ends],
+        'depth': drawdowns[troughs],
+        'duration': np.minimum(ends, len(index) - 1) - (starts - 1),
+    })
+
+
+def value_at_risk(returns, level=0.95):
+    """VaR et CVaR historiques au niveau `level`, exprimées en pertes positives
+
+    Un seul tri par série : la VaR est le quantile des rendements à 1 - level et la CVaR la
+    moyenne des rendements qui lui sont inférieurs ou égaux.
+    """
+    matrix, wrap = as_matrix(returns)
+    ordered = np.sort(matrix, axis=0)          # Les NaN sont rangés en fin de colonne
+    counts = (~np.isnan(matrix)).sum(axis=0)
+    # Arrondi avant ceil : (1 - 0.95) * 100 vaut 5.000000000000001 en flottants
+    tail = np.maximum(np.ceil(np.round((1 - level) * counts, 9)).astype(np.int64), 1)
+    rows = np.arange(len(ordered))[:, np.newaxis]
+    columns = np.arange(matrix.shape[1])
+    var = np.full(matrix.shape[1], np.nan)
+    cvar = np.full(matrix.shape[1], np.nan)
+    has_data = counts > 0
+    var[has_data] = -ordered[tail[has_data] - 1, columns[has_data]]
+    tail_sum = np.where(rows < tail, ordered, 0.0).sum(axis=0)
+    cvar[has_data] = -(tail_sum / tail)[has_data]
+    return wrap(var), wrap(cvar)
+
+
+def rolling_beta(returns, benchmark_returns, window=60):
+    """Bêta glissant de chaque série par rapport à un indice de référence
+
+    cov(r, b) / var(b) sur la fenêtre, à partir des sommes cumulées de r, b, r·b et b² :
+    les barres où l'une des deux valeurs manque sont ignorées.
+    """
+    matrix, wrap = as_matrix(returns)
+    benchmark = np.asarray(benchmark_returns, dtype=float).reshape(-1, 1)
+    if len(benchmark) != len(matrix):
+        raise ValueError("Les rendements et l'indice de référence doivent être alignés")
+    valid = ~np.isnan(matrix) & ~np.isnan(benchmark)
+    r = np.where(valid, matrix, 0.0)
+    b = np.where(valid, benchmark, 0.0)
+
+    n = window_sums(prefix_sums(valid.astype(float)), window)
+    sum_r = window_sums(prefix_sums(r), window)
+    sum_b = window_sums(prefix_sums(b), window)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        covariance = window_sums(prefix_sums(r * b), window) - sum_r * sum_b / n
+        square_sums = window_sums(prefix_sums(b * b), window)
+        variance = square_sums - sum_b * sum_b / n
+        beta = np.where((n > 1) & (variance > 1e-10 * square_sums), covariance / variance, np.nan)
+    return wrap(beta)
+
+
+def risk_summary(returns, benchmark_returns=None, level=0.95, risk_free_rate=0.02, periods=TRADING_DAYS):
+    """Synthèse par série : Sharpe, Sortino, drawdown et durée maximum, VaR, CVaR et bêta"""
+    matrix, _ = as_matrix(returns)
+    columns = returns.columns if isinstance(returns, pd.DataFrame) else None
+    equity = np.cumprod(1 + np.nan_to_num(matrix), axis=0)
+    drawdowns, durations = drawdown(equity)
+    var, cvar = value_at_risk(matrix, level)
+    excess = matrix - risk_free_rate / periods
+    with np.errstate(divide='ignore', invalid='ignore'):
+        downside = np.sqrt(np.nanmean(np.minimum(excess, 0.0) ** 2, axis=0))
+        sortino = np.where(downside > 0, np.sqrt(periods) * np.nanmean(excess, axis=0) / downside, np.nan)
+    summary = pd.DataFrame({
+        'sharpe': sharpe_ratio(matrix, risk_free_rate, periods),
+        'sortino': sortino,
+        'max_drawdown': np.nanmin(drawdowns, axis=0),
+        'max_drawdown_duration': durations.max(axis=0),
+        'var': var,
+        'cvar': cvar,
+    }, index=columns)
+    if benchmark_returns is not None:
+        benchmark = np.asarray(benchmark_returns, dtype=float)
+        valid = ~np.isnan(matrix) & ~np.isnan(benchmark)[:, np.newaxis]
+        r = np.where(valid, matrix, 0.0)
+        b = np.where(valid, benchmark[:, np.newaxis], 0.0)
+        n = valid.sum(axis=0)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            covariance = (r * b).sum(axis=0) - r.sum(axis=0) * b.sum(axis=0) / n
+            variance = (b * b).sum(axis=0) - b.sum(axis=0) ** 2 / n
+            summary['beta'] = np.where(variance > 0, covariance / variance, np.nan)
+    return summary
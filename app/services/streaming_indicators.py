@@ -0,0 +1,248 @@
+import math
+import numpy as np
+
+# Indicateurs incrémentaux : chaque nouvelle barre est intégrée en temps constant.
+# Les définitions reprennent celles de la bibliothèque ta utilisée par TradingService
+# (NaN tant que `window` observations n'ont pas été vues, écart-type de population pour
+# les bandes de Bollinger, lissage de Wilder pour le RSI).
+#
+# update(price) intègre une nouvelle barre ; update(price, new_bar=False) remplace la
+# dernière barre intégrée, ce qui permet de suivre une barre encore en cours de formation.
+
+
+class _StreamingIndicator:
+    def __init__(self, window):
+        if window < 1:
+            raise ValueError("La fenêtre doit contenir au moins une barre")
+        self.window = window
+        self.count = 0
+        self._checkpoint = None
+
+    def _state(self):
+        raise NotImplementedError
+
+    def _restore(self, state):
+        raise NotImplementedError
+
+    def _push(self, price):
+        raise NotImplementedError
+
+    @property
+    def value(self):
+        raise NotImplementedError
+
+    def update(self, price, new_bar=True):
+        """Intègre une barre et retourne la valeur courante de l'indicateur"""
+        if new_bar or self._checkpoint is None:
+            self._checkpoint = self._state()
+        else:
+            self._restore(self._checkpoint)
+        self._push(float(price))
+        return self.value
+
+
+class _RollingWindow(_StreamingIndicator):
+    """Fenêtre glissante en tampon circulaire, base des indicateurs à fenêtre fixe"""
+
+    def __init__(self, window):
+        super().__init__(window)
+        self._buffer = np.zeros(window)
+        self._pos = 0
+
+    def _slot(self):
+        pos = self._pos
+        self._pos = (pos + 1) % self.window
+        return pos
+
+
+class StreamingSMA(_RollingWindow):
+    """Moyenne mobile simple par somme glissante"""
+
+    def __init__(self, window=20):
+        super().__init__(window)
+        self._sum = 0.0
+
+    def _state(self):
+        return (self.count, self._pos, self._sum, self._buffer[self._pos])
+
+    def _restore(self, state):
+        self.count, self._pos, self._sum, evicted = state
+        self._buffer[self._pos] = evicted
+
+    def _push(self, price):
+        pos = self._slot()
+        if self.count >= self.window:
+            self._sum -= self._buffer[pos]
+        self._buffer[pos] = price
+        self._sum += price
+        self.count += 1
+        # Recalcul exact à chaque tour de tampon : coût amorti O(1), sans dérive numérique
+        if self._pos == 0:
+            self._sum = float(self._buffer[:min(self.count, self.window)].sum())
+
+    @property
+    def value(self):
+        if self.count < self.window:
+            return math.nan
+        return self._sum / self.window
+
+
+class StreamingEMA(_StreamingIndicator):
+    """Moyenne mobile exponentielle (alpha = 2 / (window + 1), sans ajustement)"""
+
+    def __init__(self, window=20):
+        super().__init__(window)
+        self.alpha = 2.0 / (window + 1)
+        self._ema = math.nan
+
+    def _state(self):
+        return (self.count, self._ema)
+
+    def _restore(self, state):
+        self.count, self._ema = state
+
+    def _push(self, price):
+        self._ema = price if self.count == 0 else self._ema + self.alpha * (price - self._ema)
+        self.count += 1
+
+    @property
+    def value(self):
+        if self.count < self.window:
+            return math.nan
+        return self._ema
+
+
+class StreamingRSI(_StreamingIndicator):
+    """RSI avec lissage de Wilder (alpha = 1 / window)"""
+
+    def __init__(self, window=14):
+        super().__init__(window)
+        self.alpha = 1.0 / window
+        self._previous = math.nan
+        self._avg_gain = 0.0
+        self._avg_loss = 0.0
+
+    def _state(self):
+        return (self.count, self._previous, self._avg_gain, self._avg_loss)
+
+    def _restore(self, state):
+        self.count, self._previous, self._avg_gain, self._avg_loss = state
+
+    def _push(self, price):
+        if self.count > 0:
+            # Comme ta, la première variation (indéfinie) compte pour une variation nulle
+            change = price - self._previous
+            self._avg_gain += self.alpha * (max(change, 0.0) - self._avg_gain)
+            self._avg_loss += self.alpha * (max(-change, 0.0) - self._avg_loss)
+        self._previous = price
+        self.count += 1
+
+    @property
+    def value(self):
+        if self.count < self.window:
+            return math.nan
+        if self._avg_loss == 0:
+            return 100.0
+        return 100.0 - 100.0 / (1.0 + self._avg_gain / self._avg_loss)
+
+
+class StreamingBollingerBands(_RollingWindow):
+    """Bandes de Bollinger par variance glissante de Welford (écart-type de population)"""
+
+    def __init__(self, window=20, window_dev=2):
+        super().__init__(window)
+        self.window_dev = window_dev
+        self._mean = 0.0
+        self._m2 = 0.0
+
+    def _state(self):
+        return (self.count, self._pos, self._mean, self._m2, self._buffer[self._pos])
+
+    def _restore(self, state):
+        self.count, self._pos, self._mean, self._m2, evicted = state
+        self._buffer[self._pos] = evicted
+
+    def _push(self, price):
+        pos = self._slot()
+        if self.count < self.window:
+            # Phase de remplissage : Welford classique
+            n = self.count + 1
+            delta = price - self._mean
+            self._mean += delta / n
+            self._m2 += delta * (price - self._mean)
+        else:
+            # Fenêtre pleine : remplacement de la plus ancienne observation
+            old = self._buffer[pos]
+            old_mean = self._mean
+            self._mean += (price - old) / self.window
+            self._m2 += (price - old) * (price - self._mean + old - old_mean)
+        self._buffer[pos] = price
+        self.count += 1
+        # Recalcul exact à chaque tour de tampon : coût amorti O(1), sans dérive numérique
+        if self._pos == 0:
+            values = self._buffer[:min(self.count, self.window)]
+            self._mean = float(values.mean())
+            self._m2 = float(((values - self._mean) ** 2).sum())
+
+    @property
+    def value(self):
+        if self.count < self.window:
+            return {'upper': math.nan, 'middle': math.nan, 'lower': math.nan}
+        std = math.sqrt(max(self._m2, 0.0) / self.window)
+        return {
+            'upper': self._mean + self.window_dev * std,
+            'middle': self._mean,
+            'lower': self._mean - self.window_dev * std
+        }
+
+
+class IndicatorStream:
+    """Ensemble d'indicateurs incrémentaux synchronisé avec une série de clôtures horodatées"""
+
+    def __init__(self, sma_window=20, ema_window=20, rsi_window=14, bb_window=20, bb_window_dev=2):
+        self.params = (sma_window, ema_window, rsi_window, bb_window, bb_window_dev)
+        self.reset()
+
+    def reset(self):
+        sma_window, ema_window, rsi_window, bb_window, bb_window_dev = self.params
+        self.sma = StreamingSMA(sma_window)
+        self.ema = StreamingEMA(ema_window)
+        self.rsi = StreamingRSI(rsi_window)
+        self.bollinger = StreamingBollingerBands(bb_window, bb_window_dev)
+        self.last_timestamp = None
+
+    def update(self, price, new_bar=True):
+        for indicator in (self.sma, self.ema, self.rsi, self.bollinger):
+            indicator.update(price, new_bar=new_bar)
+
+    def sync(self, close):
+        """Intègre les barres de `close` postérieures à la dernière barre vue
+
+        La dernière barre déjà intégrée est révisée si sa clôture a changé. Si l'historique
+        ne prolonge pas celui déjà intégré, les indicateurs sont reconstruits.
+        """
+        if self.last_timestamp is not None:
+            pos = close.index.searchsorted(self.last_timestamp)
+            if pos < len(close) and close.index[pos] == self.last_timestamp:
+                self.update(close.iloc[pos], new_bar=False)
+                start = pos + 1
+            else:
+                self.reset()
+                start = 0
+        else:
+            start = 0
+
+        for price in close.iloc[start:].to_numpy():
+            self.update(price)
+        if len(close):
+            self.last_timestamp = close.index[-1]
+        return self.values()
+
+    def values(self):
+        """Dernières valeurs des indicateurs"""
+        return {
+            'sma': self.sma.value,
+            'ema': self.ema.value,
+            'rsi': self.rsi.value,
+            'bollinger': self.bollinger.value,
+        }
@@ -0,0 +1,99 @@
+import json
+import logging
+import os
+import tempfile
+import threading
+import time
+from .lazy_import import LazyModule
+
+logger = logging.getLogger(__name__)
+
+# Importé à la première requête de métadonnées
+yf = LazyModule('yfinance')
+
+DEFAULT_METADATA_PATH = os.path.join(".cache", "metadata.json")
+DEFAULT_METADATA_TTL = 24 * 3600  # Les métadonnées changent rarement : une journée suffit
+
+
+def _extract_metadata(info):
+    """Ne conserve que les champs utiles de ticker.info"""
+    return {
+        'name': info.get('longName') or info.get('shortName'),
+        'currency': info.get('currency'),
+        'exchange': info.get('fullExchangeName') or info.get('exchange'),
+        'timezone': info.get('exchangeTimezoneName'),
+    }
+
+
+class TickerMetadataStore:
+    """Cache des métadonnées des tickers (nom, devise, place de cotation, fuseau horaire)"""
+
+    def __init__(self, path=DEFAULT_METADATA_PATH, ttl=DEFAULT_METADATA_TTL):
+        self.path = path
+        self.ttl = ttl
+        self._entries = None  # Lu depuis le disque à la première utilisation
+        self._pending = set()
+        self._lock = threading.Lock()
+
+    def _load_entries(self):
+        if self._entries is None:
+            try:
+                with open(self.path, encoding='utf-8') as f:
+                    self._entries = json.load(f)
+            except (OSError, ValueError):
+                self._entries = {}
+        return self._entries
+
+    def _save_entries(self):
+        directory = os.path.dirname(self.path) or "."
+        os.makedirs(directory, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=directory, suffix='.json.tmp')
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            json.dump(self._entries, f)
+        os.replace(tmp_path, self.path)
+
+    def _is_fresh(self, entry):
+        return entry is not None and time.time() - entry['fetched_at'] < self.ttl
+
+    def _fetch(self, symbol):
+        """Interroge Yahoo Finance et met à jour le cache"""
+        try:
+            metadata = _extract_metadata(yf.Ticker(symbol).info)
+        except Exception as e:
+            logger.warning("Métadonnées indisponibles pour %s: %s", symbol, e)
+            metadata = None
+
+        with self._lock:
+            entries = self._load_entries()
+            self._pending.discard(symbol)
+            if metadata is None:
+                # On conserve éventuellement une entrée expirée plutôt que rien
+                entry = entries.get(symbol)
+                return entry['data'] if entry else None
+            entries[symbol] = {'data': metadata, 'fetched_at': time.time()}
+            try:
+                self._save_entries()
+            except OSError as e:
+                logger.warning("Impossible d'enregistrer les métadonnées : %s", e)
+        return metadata
+
+    def get(self, symbol, wait=True):
+        """Retourne les métadonnées du symbole, ou None si elles ne sont pas encore connues
+
+        Avec wait=False, l'appel ne bloque jamais : une entrée absente ou expirée est
+        rafraîchie en arrière-plan et la valeur disponible (éventuellement expirée) est retournée.
+        """
+        with self._lock:
+            entry = self._load_entries().get(symbol)
+            if self._is_fresh(entry):
+                return entry['data']
+            if not wait:
+                if symbol not in self._pending:
+                    self._pending.add(symbol)
+                    threading.Thread(target=self._fetch, args=(symbol,), daemon=True).start()
+                return entry['data'] if entry else None
+        return self._fetch(symbol)
+
+
+# Cache partagé par défaut entre les instances de TradingService
+default_metadata_store = TickerMetadataStore()
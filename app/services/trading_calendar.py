@@ -0,0 +1,263 @@
+import bisect
+import datetime as dt
+import time
+import numpy as np
+import pandas as pd
+
+# Calendriers de cotation précalculés.
+#
+# Pour chaque place, les séances d'une plage d'années sont calculées une seule fois
+# (jours fériés et séances écourtées compris) et stockées sous forme de tableaux triés
+# d'ouvertures et de clôtures en nanosecondes UTC. Toutes les requêtes se font ensuite par
+# recherche dichotomique, sans conversion de fuseau horaire par requête ou par barre.
+
+DEFAULT_FIRST_YEAR = 2000
+DEFAULT_LAST_YEAR = 2040
+
+
+def easter_sunday(year):
+    """Date du dimanche de Pâques (calendrier grégorien)"""
+    a = year % 19
+    b, c = divmod(year, 100)
+    d, e = divmod(b, 4)
+    f = (b + 8) // 25
+    g = (b - f + 1) // 3
+    h = (19 * a + b - d - g + 15) % 30
+    i, k = divmod(c, 4)
+    l = (32 + 2 * e + 2 * i - h - k) % 7
+    m = (a + 11 * h + 22 * l) // 451
+    month, day = divmod(h + l - 7 * m + 114, 31)
+    return dt.date(year, month, day + 1)
+
+
+def _nth_weekday(year, month, weekday, n):
+    """n-ième jour de semaine `weekday` du mois (n = -1 pour le dernier)"""
+    if n > 0:
+        first = dt.date(year, month, 1)
+        return first + dt.timedelta(days=(weekday - first.weekday()) % 7 + 7 * (n - 1))
+    last = dt.date(year + month // 12, month % 12 + 1, 1) - dt.timedelta(days=1)
+    return last - dt.timedelta(days=(last.weekday() - weekday) % 7)
+
+
+def _observed(day):
+    """Report d'un jour férié du week-end : samedi -> vendredi, dimanche -> lundi"""
+    if day.weekday() == 5:
+        return day - dt.timedelta(days=1)
+    if day.weekday() == 6:
+        return day + dt.timedelta(days=1)
+    return day
+
+
+def nyse_holidays(year):
+    days = set()
+    new_year = dt.date(year, 1, 1)
+    # Le 1er janvier tombant un samedi n'est pas reporté au vendredi précédent
+    if new_year.weekday() != 5:
+        days.add(_observed(new_year))
+    if year >= 1998:
+        days.add(_nth_weekday(year, 1, 0, 3))       # Martin Luther King Jr. Day
+    days.add(_nth_weekday(year, 2, 0, 3))           # Presidents' Day
+    days.add(easter_sunday(year) - dt.timedelta(days=2))  # Vendredi saint
+    days.add(_nth_weekday(year, 5, 0, -1))          # Memorial Day
+    if year >= 2022:
+        days.add(_observed(dt.date(year, 6, 19)))   # Juneteenth
+    days.add(_observed(dt.date(year, 7, 4)))        # Independence Day
+    days.add(_nth_weekday(year, 9, 0, 1))           # Labor Day
+    days.add(_nth_weekday(year, 11, 3, 4))          # Thanksgiving
+    days.add(_observed(dt.date(year, 12, 25)))      # Noël
+    return days
+
+
+def nyse_early_closes(year):
+    days = set()
+    july_4 = dt.date(year, 7, 4)
+    if july_4.weekday() in (1, 2, 3, 4):
+        days.add(july_4 - dt.timedelta(days=1))
+    days.add(_nth_weekday(year, 11, 3, 4) + dt.timedelta(days=1))  # Lendemain de Thanksgiving
+    christmas_eve = dt.date(year, 12, 24)
+    if christmas_eve.weekday() < 5 and christmas_eve.weekday() != 4:
+        days.add(christmas_eve)
+    return days
+
+
+def euronext_holidays(year):
+    easter = easter_sunday(year)
+    return {
+        dt.date(year, 1, 1),
+        easter - dt.timedelta(days=2),   # Vendredi saint
+        easter + dt.timedelta(days=1),   # Lundi de Pâques
+        dt.date(year, 5, 1),
+        dt.date(year, 12, 25),
+        dt.date(year, 12, 26),
+    }
+
+
+def euronext_early_closes(year):
+    return {dt.date(year, 12, 24), dt.date(year, 12, 31)}
+
+
+def format_time_diff(t1, t2):
+    """Durée entre deux instants, au format « 1j 2h 3m »"""
+    diff = t2 - t1
+    hours, remainder = divmod(diff.seconds, 3600)
+    minutes, _ = divmod(remainder, 60)
+    if diff.days > 0:
+        return f"{diff.days}j {hours}h {minutes}m"
+    return f"{hours}h {minutes}m"
+
+
+class TradingCalendar:
+    """Séances d'une place de cotation, précalculées pour une plage d'années"""
+
+    def __init__(self, name, timezone, open_time, close_time, early_close_time, holidays, early_closes,
+                 first_year=DEFAULT_FIRST_YEAR, last_year=DEFAULT_LAST_YEAR):
+        self.name = name
+        self.timezone = timezone
+        self.first_year = first_year
+        self.last_year = last_year
+
+        days = pd.bdate_range(dt.date(first_year, 1, 1), dt.date(last_year, 12, 31))
+        closed = set()
+        early = set()
+        for year in range(first_year, last_year + 1):
+            closed |= holidays(year)
+            early |= early_closes(year)
+        dates = [day for day in days.date if day not in closed]
+
+        # Conversion UTC vectorisée, une seule fois pour toute la plage
+        local_dates = pd.DatetimeIndex(dates).as_unit('ns')
+        is_early = np.array([day in early for day in dates])
+        close_offsets = np.where(is_early, pd.Timedelta(early_close_time).value, pd.Timedelta(close_time).value)
+        opens = (local_dates + pd.Timedelta(open_time)).tz_localize(timezone).tz_convert('UTC')
+        closes = (local_dates + pd.to_timedelta(close_offsets)).tz_localize(timezone).tz_convert('UTC')
+
+        self.sessions = local_dates
+        self.early_closes = local_dates[is_early]
+        self.opens = opens.asi8.copy()
+        self.closes = closes.asi8.copy()
+        # Listes Python pour les recherches scalaires avec bisect, plus rapides que searchsorted
+        self._opens = self.opens.tolist()
+        self._closes = self.closes.tolist()
+        self._session_days = self.sessions.asi8.tolist()
+
+    def __repr__(self):
+        return f"TradingCalendar({self.name!r}, {len(self.sessions)} séances {self.first_year}-{self.last_year})"
+
+    @staticmethod
+    def _ns(timestamp):
+        if timestamp is None:
+            return time.time_ns()
+        timestamp = pd.Timestamp(timestamp)
+        if timestamp.tzinfo is None:
+            timestamp = timestamp.tz_localize('UTC')
+        return timestamp.value
+
+    def _timestamp(self, ns):
+        return pd.Timestamp(ns, tz='UTC').tz_convert(self.timezone)
+
+    def _check_range(self, position):
+        if position >= len(self._opens):
+            raise ValueError(f"Date hors du calendrier {self.name} ({self.first_year}-{self.last_year})")
+
+    def is_open(self, timestamp=None):
+        """Indique si la place est ouverte à l'instant donné (par défaut maintenant)"""
+        t = self._ns(timestamp)
+        i = bisect.bisect_right(self._opens, t) - 1
+        return i >= 0 and t < self._closes[i]
+
+    def next_open(self, timestamp=None):
+        """Prochaine ouverture strictement postérieure à l'instant donné"""
+        i = bisect.bisect_right(self._opens, self._ns(timestamp))
+        self._check_range(i)
+        return self._timestamp(self._opens[i])
+
+    def next_close(self, timestamp=None):
+        """Prochaine clôture postérieure à l'instant donné"""
+        i = bisect.bisect_right(self._closes, self._ns(timestamp))
+        self._check_range(i)
+        return self._timestamp(self._closes[i])
+
+    def status(self, timestamp=None):
+        """(ouvert, message) décrivant l'état de la place à l'instant donné"""
+        now = self._timestamp(self._ns(timestamp))
+        if self.is_open(now):
+            return True, f"Marché ouvert - Fermeture dans {format_time_diff(now, self.next_close(now))}"
+        return False, f"Le marché ouvre dans {format_time_diff(now, self.next_open(now))}"
+
+    def sessions_between(self, start, end):
+        """Séances dont la date locale est comprise entre start et end (inclus)"""
+        lo = bisect.bisect_left(self._session_days, pd.Timestamp(start).normalize().tz_localize(None).value)
+        hi = bisect.bisect_right(self._session_days, pd.Timestamp(end).normalize().tz_localize(None).value)
+        return pd.DataFrame({
+            'open': pd.DatetimeIndex(self.opens[lo:hi], tz='UTC').tz_convert(self.timezone),
+            'close': pd.DatetimeIndex(self.closes[lo:hi], tz='UTC').tz_convert(self.timezone),
+        }, index=self.sessions[lo:hi])
+
+    def session_positions(self, index):
+        """Numéro de séance de chaque horodatage (-1 en dehors des heures de cotation)
+
+        Calcul vectorisé par searchsorted sur les instants UTC : permet d'aligner des barres
+        intraday sur les séances sans conversion de fuseau horaire barre par barre.
+        """
+        index = pd.DatetimeIndex(index)
+        if index.tz is None:
+            index = index.tz_localize('UTC')
+        t = index.as_unit('ns').asi8
+        positions = np.searchsorted(self.opens, t, side='right') - 1
+        inside = (positions >= 0) & (t < self.closes[np.maximum(positions, 0)])
+        return np.where(inside, positions, -1)
+
+    def session_labels(self, index):
+        """Date de séance de chaque horodatage (NaT en dehors des heures de cotation)"""
+        positions = self.session_positions(index)
+        labels = self.sessions[np.maximum(positions, 0)]
+        return labels.where(positions >= 0)
+
+    def resample_to_sessions(self, data):
+        """Agrège des barres intraday OHLCV en une barre par séance, hors pré et post-marché"""
+        positions = self.session_positions(data.index)
+        inside = positions >= 0
+        data = data[inside]
+        positions = positions[inside]
+        if len(data) == 0:
+            return data.iloc[:0]
+        starts = np.flatnonzero(np.r_[True, positions[1:] != positions[:-1]])
+        ends = np.r_[starts[1:], len(data)] - 1
+        columns = {
+            'Open': data['Open'].to_numpy()[starts],
+            'High': np.maximum.reduceat(data['High'].to_numpy(), starts),
+            'Low': np.minimum.reduceat(data['Low'].to_numpy(), starts),
+            'Close': data['Close'].to_numpy()[ends],
+        }
+        if 'Volume' in data:
+            columns['Volume'] = np.add.reduceat(data['Volume'].to_numpy(), starts)
+        return pd.DataFrame(columns, index=self.sessions[positions[starts]])
+
+
+_CALENDAR_SPECS = {
+    'NYSE': ('America/New_York', '09:30:00', '16:00:00', '13:00:00', nyse_holidays, nyse_early_closes),
+    'XPAR': ('Europe/Paris', '09:00:00', '17:30:00', '14:05:00', euronext_holidays, euronext_early_closes),
+}
+
+# Suffixes Yahoo Finance des places couvertes par le calendrier Euronext
+_SUFFIXES = {'.PA': 'XPAR', '.AS': 'XPAR', '.BR': 'XPAR'}
+
+_calendars = {}
+
+
+def get_calendar(name):
+    """Calendrier d'une place ('NYSE', 'XPAR'), construit à la première demande"""
+    calendar = _calendars.get(name)
+    if calendar is None:
+        if name not in _CALENDAR_SPECS:
+            raise ValueError(f"Place de cotation inconnue : {name}")
+        calendar = _calendars[name] = TradingCalendar(name, *_CALENDAR_SPECS[name])
+    return calendar
+
+
+def calendar_for_symbol(symbol):
+    """Calendrier de la place de cotation d'un symbole Yahoo Finance (NYSE par défaut)"""
+    for suffix, name in _SUFFIXES.items():
+        if symbol.upper().endswith(suffix):
+            return get_calendar(name)
+    return get_calendar('NYSE')
@@ -1,135 +1,266 @@
+import itertools
+import logging
 import pandas as pd
 import numpy as np
-import yfinance as yf
-from ta.trend import SMAIndicator, EMAIndicator
-from ta.momentum import RSIIndicator
-from ta.volatility import BollingerBands
 from datetime import datetime, timedelta
+from .market_data_loader import MarketDataLoader, bars_changed, default_interval, default_loader, is_intraday
+from .ticker_metadata import default_metadata_store
+from .indicator_cache import IndicatorCache
+from .streaming_indicators import IndicatorStream
+from .downsampling import DEFAULT_MAX_BUCKETS, downsample_ohlcv
+from .trading_calendar import calendar_for_symbol
+from .parameter_sweep import sweep_sma_crossover, sweep_rsi
+from .walk_forward import walk_forward
+from .metrics import instrument
+from . import risk
 
+logger = logging.getLogger(__name__)
+
+# Indice de référence par défaut pour le bêta, selon la place de cotation
+DEFAULT_BENCHMARKS = {'NYSE': '^GSPC', 'XPAR': '^FCHI'}
+
+# Identifiants des séries de données, pour partager un cache d'indicateurs entre services
+_data_ids = itertools.count()
+
+@instrument('trading_service')
 class TradingService:
-    def __init__(self, symbol="MC.PA", period="1y"):  # MC.PA est le symbole de LVMH sur Yahoo Finance
+    def __init__(self, symbol="MC.PA", period="1y", interval=None, cache=None, metadata_store=None, loader=None, indicator_cache=None, hub=None, refresh_interval=None, provider=None, max_age=None):  # MC.PA est le symbole de LVMH sur Yahoo Finance
         self.symbol = symbol
         self.period = period
-        print(f"Initialisation du service avec le symbole {self.symbol} et la période {self.period}")
+        # Détermination de l'intervalle en fonction de la période
+        self.interval = interval or default_interval(period)
+        # Âge maximal (secondes) d'un historique en cache servi sans requête au chargement initial
+        self.max_age = max_age
+        if loader is None:
+            if cache is not None or provider is not None:
+                loader = MarketDataLoader(cache, provider=provider)
+            else:
+                loader = default_loader
+        self.loader = loader
+        self.cache = loader.cache
+        self.metadata_store = metadata_store if metadata_store is not None else default_metadata_store
+        self.indicator_cache = indicator_cache if indicator_cache is not None else IndicatorCache()
+        # Clé des entrées de ce service dans le cache d'indicateurs, éventuellement partagé
+        self._data_source = (symbol, self.interval, next(_data_ids))
+        # Indicateurs incrémentaux par jeu de paramètres, tenus à jour barre par barre
+        self._streams = {}
+        # Avec un QuoteHub, les données sont lues dans le flux partagé au lieu d'être téléchargées
+        self._hub = hub
+        self._refresh_interval = refresh_interval
+        self._subscription = hub.subscribe(symbol, period, self.interval, refresh_interval) if hub is not None else None
+        self._feed_version = None
+        self._feed_reloads = 0
+        logger.debug("Initialisation du service avec le symbole %s et la période %s", self.symbol, self.period)
+        # Incrémenté à chaque modification de self.data pour invalider les calculs dérivés
+        self.data_version = 0
         self.data = self._load_data()
+        if self.data is not None:
+            self.data_version += 1
         
     def _load_data(self):
         """Charge les données historiques"""
-        try:
-            print(f"Tentative de chargement des données pour {self.symbol}")
-            
-            # Création d'un objet Ticker
-            ticker = yf.Ticker(self.symbol)
-            
-            # Récupération des informations sur le ticker
-            info = ticker.info
-            print(f"Informations sur le ticker : {info.get('longName', 'Non disponible')}")
-            
-            # Détermination de l'intervalle en fonction de la période
-            interval = '1m' if self.period == '1d' else '1d'
-            
-            # Téléchargement des données avec plus d'options
-            data = ticker.history(
-                period=self.period,
-                interval=interval,
-                auto_adjust=True,
-                prepost=True
-            )
-            
-            print(f"Données téléchargées : {len(data)} lignes")
-            print(f"Colonnes disponibles : {data.columns.tolist()}")
-            
-            if data.empty:
-                print(f"Aucune donnée disponible pour {self.symbol}")
-                return None
-                
-            # Vérification que nous avons des données valides
-            if len(data) < 2:
-                print(f"Pas assez de données pour {self.symbol}")
-                return None
-                
-            print(f"Données chargées avec succès pour {self.symbol}")
-            print(f"Première date : {data.index[0]}")
-            print(f"Dernière date : {data.index[-1]}")
+        if self._subscription is not None:
+            data, self._feed_version, self._feed_reloads = self._subscription.snapshot()
             return data
+        logger.debug("Tentative de chargement des données pour %s", self.symbol)
+        return self.loader.load(self.symbol, self.period, self.interval, max_age=self.max_age)
+
+    def _refresh_from_feed(self):
+        if self._subscription.closed and self._hub is not None:
+            # Abonnement abandonné par le hub après inactivité : nouvel abonnement, dont le
+            # flux est rechargé entièrement (versions repartant de zéro)
+            self._subscription = self._hub.subscribe(self.symbol, self.period, self.interval, self._refresh_interval)
+            self._feed_version, self._feed_reloads = None, None
+        data, version, reloads = self._subscription.snapshot()
+        if data is None or version == self._feed_version:
+            return False
+        if reloads != self._feed_reloads:
+            self._streams.clear()
+        self._feed_version, self._feed_reloads = version, reloads
+        self.data = data
+        self.data_version += 1
+        return True
+
+    def close(self):
+        """Se désabonne du flux partagé et libère ses indicateurs en cache"""
+        self.indicator_cache.discard(self._data_source)
+        if self._subscription is not None:
+            self._subscription.close()
+            self._hub = None
+
+    def refresh(self):
+        """Fusionne les nouvelles barres dans les données existantes, retourne True si elles ont changé"""
+        if self._subscription is not None:
+            return self._refresh_from_feed()
+        if self.data is None:
+            self.data = self._load_data()
+            if self.data is None:
+                return False
+            self.data_version += 1
+            return True
+        
+        try:
+            data, full_reload = self.loader.update(self.symbol, self.period, self.interval, self.data)
         except Exception as e:
-            print(f"Erreur lors du chargement des données pour {self.symbol}: {str(e)}")
-            return None
+            logger.warning("Erreur lors du rafraîchissement des données pour %s: %s", self.symbol, e)
+            return False
+        
+        if data is None or len(data) < 2:
+            return False
+        
+        if not bars_changed(self.data, data, full_reload):
+            return False
+        
+        if full_reload:
+            # Les prix passés ont pu être ajustés : les indicateurs incrémentaux repartent de zéro
+            self._streams.clear()
+        self.data = data
+        self.data_version += 1
+        return True
+
+    def get_metadata(self, wait=True):
+        """Retourne les métadonnées du ticker (nom, devise, place, fuseau), chargées à la demande"""
+        return self.metadata_store.get(self.symbol, wait=wait) or {}
+
+    def _cached(self, name, params, compute):
+        """Mémoïse un calcul dérivé des données pour la version courante"""
+        return self.indicator_cache.get_or_compute(name, params, self.data_version, compute, self._data_source)
+
+    def cache_stats(self):
+        """Compteurs du cache d'indicateurs (succès, échecs, évictions, entrées, mémoire)"""
+        return self.indicator_cache.stats()
 
     def calculate_sma(self, window=20):
         """Calcule la moyenne mobile simple"""
         if self.data is not None and not self.data.empty:
-            sma = SMAIndicator(close=self.data['Close'], window=window)
-            return sma.sma_indicator()
+            def compute():
+                from ta.trend import SMAIndicator
+                sma = SMAIndicator(close=self.data['Close'], window=window)
+                return sma.sma_indicator()
+            return self._cached('sma', (window,), compute)
         return None
 
     def calculate_ema(self, window=20):
         """Calcule la moyenne mobile exponentielle"""
         if self.data is not None and not self.data.empty:
-            ema = EMAIndicator(close=self.data['Close'], window=window)
-            return ema.ema_indicator()
+            def compute():
+                from ta.trend import EMAIndicator
+                ema = EMAIndicator(close=self.data['Close'], window=window)
+                return ema.ema_indicator()
+            return self._cached('ema', (window,), compute)
         return None
 
     def calculate_rsi(self, window=14):
         """Calcule l'indicateur RSI"""
         if self.data is not None and not self.data.empty:
-            rsi = RSIIndicator(close=self.data['Close'], window=window)
-            return rsi.rsi()
+            def compute():
+                from ta.momentum import RSIIndicator
+                rsi = RSIIndicator(close=self.data['Close'], window=window)
+                return rsi.rsi()
+            return self._cached('rsi', (window,), compute)
         return None
 
     def calculate_bollinger_bands(self, window=20, window_dev=2):
         """Calcule les bandes de Bollinger"""
         if self.data is not None and not self.data.empty:
-            bb = BollingerBands(close=self.data['Close'], window=window, window_dev=window_dev)
-            return {
-                'upper': bb.bollinger_hband(),
-                'middle': bb.bollinger_mavg(),
-                'lower': bb.bollinger_lband()
-            }
+            def compute():
+                from ta.volatility import BollingerBands
+                bb = BollingerBands(close=self.data['Close'], window=window, window_dev=window_dev)
+                return {
+                    'upper': bb.bollinger_hband(),
+                    'middle': bb.bollinger_mavg(),
+                    'lower': bb.bollinger_lband()
+                }
+            return self._cached('bollinger', (window, window_dev), compute)
+        return None
+
+    def latest_indicators(self, sma_window=20, ema_window=20, rsi_window=14, bb_window=20, bb_window_dev=2):
+        """Dernières valeurs des indicateurs, mises à jour en temps constant par nouvelle barre"""
+        if self.data is not None and not self.data.empty:
+            params = (sma_window, ema_window, rsi_window, bb_window, bb_window_dev)
+            stream = self._streams.get(params)
+            if stream is None:
+                stream = self._streams[params] = IndicatorStream(*params)
+            return stream.sync(self.data['Close'])
+        return None
+
+    @property
+    def calendar(self):
+        """Calendrier de cotation de la place du symbole"""
+        return calendar_for_symbol(self.symbol)
+
+    def now(self):
+        """Instant courant, dans le fuseau des données"""
+        tz = self.data.index.tz if self.data is not None else None
+        return pd.Timestamp.now(tz=tz)
+
+    def market_status(self):
+        """(ouvert, message) selon le calendrier de la place et l'heure courante"""
+        return self.calendar.status()
+
+    def session_bars(self):
+        """Une barre par séance : les barres intraday sont agrégées hors pré et post-marché"""
+        if self.data is not None and not self.data.empty:
+            if not is_intraday(self.interval):
+                return self.data
+            return self._cached('session_bars', (), lambda: self.calendar.resample_to_sessions(self.data))
+        return None
+
+    def chart_data(self, max_buckets=DEFAULT_MAX_BUCKETS, window=None):
+        """Barres OHLCV agrégées pour le graphique, limitées aux `window` dernières (Timedelta)"""
+        if self.data is not None and not self.data.empty:
+            def compute():
+                start = self.data.index[-1] - window if window is not None else None
+                return downsample_ohlcv(self.data, max_buckets, start=start)
+            return self._cached('chart_data', (max_buckets, window), compute)
         return None
 
     def sma_crossover_strategy(self, short_window=20, long_window=50):
         """Implémente une stratégie de croisement des moyennes mobiles"""
         if self.data is not None and not self.data.empty:
-            # Calcul des moyennes mobiles
-            short_sma = self.calculate_sma(window=short_window)
-            long_sma = self.calculate_sma(window=long_window)
-            
-            if short_sma is None or long_sma is None:
-                return None
+            def compute():
+                # Calcul des moyennes mobiles
+                short_sma = self.calculate_sma(window=short_window)
+                long_sma = self.calculate_sma(window=long_window)
                 
-            # Création des signaux
-            signals = pd.DataFrame(index=self.data.index)
-            signals['signal'] = 0.0
-            
-            # Signal d'achat (1) quand la SMA courte croise la SMA longue par le haut
-            signals.loc[short_sma > long_sma, 'signal'] = 1.0
-            
-            # Génération des signaux de trading
-            signals['positions'] = signals['signal'].diff()
-            
-            return signals
+                if short_sma is None or long_sma is None:
+                    return None
+                    
+                # Création des signaux
+                signals = pd.DataFrame(index=self.data.index)
+                signals['signal'] = 0.0
+                
+                # Signal d'achat (1) quand la SMA courte croise la SMA longue par le haut
+                signals.loc[short_sma > long_sma, 'signal'] = 1.0
+                
+                # Génération des signaux de trading
+                signals['positions'] = signals['signal'].diff()
+                
+                return signals
+            return self._cached('sma_crossover', (short_window, long_window), compute)
         return None
 
     def rsi_strategy(self, window=14, overbought=70, oversold=30):
         """Implémente une stratégie basée sur le RSI"""
         if self.data is not None and not self.data.empty:
-            rsi = self.calculate_rsi(window=window)
-            
-            if rsi is None:
-                return None
+            def compute():
+                rsi = self.calculate_rsi(window=window)
                 
-            signals = pd.DataFrame(index=self.data.index)
-            signals['signal'] = 0.0
-            
-            # Signal d'achat quand RSI < oversold
-            signals.loc[rsi < oversold, 'signal'] = 1.0
-            # Signal de vente quand RSI > overbought
-            signals.loc[rsi > overbought, 'signal'] = -1.0
-            
-            signals['positions'] = signals['signal'].diff()
-            
-            return signals
+                if rsi is None:
+                    return None
+                    
+                signals = pd.DataFrame(index=self.data.index)
+                signals['signal'] = 0.0
+                
+                # Signal d'achat quand RSI < oversold
+                signals.loc[rsi < oversold, 'signal'] = 1.0
+                # Signal de vente quand RSI > overbought
+                signals.loc[rsi > overbought, 'signal'] = -1.0
+                
+                signals['positions'] = signals['signal'].diff()
+                
+                return signals
+            return self._cached('rsi_strategy', (window, overbought, oversold), compute)
         return None
 
     def backtest_strategy(self, strategy_func, initial_capital=10000.0):
@@ -156,25 +287,97 @@ class TradingService:
                     'portfolio': portfolio,
                     'signals': signals,
                     'initial_capital': initial_capital,
-                    'final_capital': portfolio['total'][-1],
-                    'total_return': (portfolio['total'][-1] - initial_capital) / initial_capital,
+                    'final_capital': portfolio['total'].iloc[-1],
+                    'total_return': (portfolio['total'].iloc[-1] - initial_capital) / initial_capital,
                     'sharpe_ratio': sharpe_ratio if sharpe_ratio is not None else 0.0,
                     'max_drawdown': max_drawdown if max_drawdown is not None else 0.0
                 }
         return None
 
+    def sweep_sma_crossover(self, short_windows, long_windows, initial_capital=10000.0):
+        """Backteste en une passe toutes les combinaisons de fenêtres de la stratégie de croisement"""
+        if self.data is not None and not self.data.empty:
+            return self._cached('sweep_sma_crossover', (tuple(short_windows), tuple(long_windows), initial_capital),
+                                lambda: sweep_sma_crossover(self.data['Close'].to_numpy(), short_windows, long_windows,
+                                                            initial_capital=initial_capital))
+        return None
+
+    def sweep_rsi(self, windows, overbought_levels, oversold_levels, initial_capital=10000.0):
+        """Backteste en une passe toutes les combinaisons de paramètres de la stratégie RSI"""
+        if self.data is not None and not self.data.empty:
+            return self._cached('sweep_rsi', (tuple(windows), tuple(overbought_levels), tuple(oversold_levels), initial_capital),
+                                lambda: sweep_rsi(self.data['Close'].to_numpy(), windows, overbought_levels, oversold_levels,
+                                                  initial_capital=initial_capital))
+        return None
+
+    def walk_forward(self, strategy, grid, train_size, test_size, step=None, anchored=False,
+                     objective='sharpe_ratio', initial_capital=10000.0):
+        """Optimisation walk-forward de 'sma_crossover' ou 'rsi' sur une grille de paramètres"""
+        if self.data is not None and not self.data.empty:
+            params = (strategy, tuple((name, tuple(values)) for name, values in sorted(grid.items())),
+                      train_size, test_size, step, anchored, objective, initial_capital)
+            return self._cached('walk_forward', params,
+                                lambda: walk_forward(self.data['Close'], strategy, grid, train_size, test_size,
+                                                     step=step, anchored=anchored, objective=objective,
+                                                     initial_capital=initial_capital))
+        return None
+
     def calculate_sharpe_ratio(self, returns, risk_free_rate=0.02):
         """Calcule le ratio de Sharpe"""
         if returns is not None and not returns.empty:
-            excess_returns = returns - risk_free_rate/252  # Taux journalier
-            if excess_returns.std() != 0:
-                return np.sqrt(252) * excess_returns.mean() / excess_returns.std()
+            sharpe = risk.sharpe_ratio(returns.to_numpy(dtype=float), risk_free_rate)
+            if not np.isnan(sharpe):
+                return sharpe
         return None
 
     def calculate_max_drawdown(self, cumulative_returns):
         """Calcule le drawdown maximum"""
         if cumulative_returns is not None and not cumulative_returns.empty:
-            rolling_max = cumulative_returns.expanding().max()
-            drawdown = (cumulative_returns - rolling_max) / rolling_max
-            return drawdown.min()
-        return None 
\ No newline at end of file
+            return risk.max_drawdown(cumulative_returns.to_numpy(dtype=float))
+        return None
+
+    def rolling_risk(self, windows=risk.DEFAULT_WINDOWS, risk_free_rate=0.02):
+        """Sharpe et Sortino glissants par fenêtre, drawdown courant et sa durée (en barres)"""
+        if self.data is not None and not self.data.empty:
+            def compute():
+                close = self.data['Close'].to_numpy(dtype=float)
+                returns = np.empty_like(close)
+                returns[0] = np.nan
+                returns[1:] = close[1:] / close[:-1] - 1
+                ratios = risk.rolling_ratios(returns, windows, risk_free_rate)
+                drawdowns, durations = risk.drawdown(close)
+                columns = {}
+                for window in windows:
+                    columns[f'sharpe_{window}'] = ratios['sharpe'][window]
+                    columns[f'sortino_{window}'] = ratios['sortino'][window]
+                columns['drawdown'] = drawdowns
+                columns['drawdown_duration'] = durations
+                return pd.DataFrame(columns, index=self.data.index)
+            return self._cached('rolling_risk', (tuple(windows), risk_free_rate), compute)
+        return None
+
+    def value_at_risk(self, level=0.95):
+        """VaR et CVaR historiques des rendements par barre, en pertes positives"""
+        if self.data is not None and len(self.data) > 1:
+            return self._cached('value_at_risk', (level,),
+                                lambda: risk.value_at_risk(self.data['Close'].pct_change().to_numpy(), level))
+        return None
+
+    def rolling_beta(self, benchmark_symbol=None, window=60):
+        """Bêta glissant par rapport à un indice (celui de la place de cotation par défaut)
+
+        Les deux historiques sont alignés sur leurs dates communes.
+        """
+        if self.data is None or self.data.empty:
+            return None
+        benchmark_symbol = benchmark_symbol or DEFAULT_BENCHMARKS.get(self.calendar.name, '^GSPC')
+
+        def compute():
+            benchmark = self.loader.load(benchmark_symbol, self.period, self.interval)
+            if benchmark is None:
+                return None
+            panel = MarketDataLoader.to_panel({self.symbol: self.data, benchmark_symbol: benchmark},
+                                              self.interval).dropna()
+            returns = panel.pct_change()
+            return risk.rolling_beta(returns[self.symbol], returns[benchmark_symbol].to_numpy(), window)
+        return self._cached('rolling_beta', (benchmark_symbol, window), compute)
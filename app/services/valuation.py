@@ -0,0 +1,108 @@
+import threading
+import time
+import numpy as np
+import pandas as pd
+from .market_data_loader import default_loader
+
+DEFAULT_QUOTE_TTL = 30  # Durée de validité d'une cotation, en secondes
+
+
+def mark_to_market(quantities, avg_prices, prices, cash=0.0):
+    """Valorisation vectorisée d'un ensemble de positions
+
+    Les prix manquants (NaN) sont remplacés par le prix moyen d'achat. Retourne un
+    dictionnaire de vecteurs (valeur de marché, coût, plus-value latente en valeur et en
+    pourcentage, poids dans le portefeuille) et la valeur totale, liquidités comprises.
+    """
+    quantities = np.asarray(quantities, dtype=float)
+    avg_prices = np.asarray(avg_prices, dtype=float)
+    prices = np.asarray(prices, dtype=float)
+    prices = np.where(np.isnan(prices), avg_prices, prices)
+
+    market_value = quantities * prices
+    cost_basis = quantities * avg_prices
+    unrealized_pnl = market_value - cost_basis
+    total_value = cash + market_value.sum()
+    with np.errstate(divide='ignore', invalid='ignore'):
+        unrealized_pnl_pct = np.where(cost_basis != 0, unrealized_pnl / cost_basis * 100, 0.0)
+        weights = market_value / total_value if total_value else np.zeros_like(market_value)
+    return {
+        'price': prices,
+        'market_value': market_value,
+        'cost_basis': cost_basis,
+        'unrealized_pnl': unrealized_pnl,
+        'unrealized_pnl_pct': unrealized_pnl_pct,
+        'weight': weights,
+        'total_value': total_value,
+    }
+
+
+class ValuationEngine:
+    """Valorise les positions d'un portefeuille au dernier cours connu
+
+    Les cotations de tous les symboles détenus sont demandées en un seul lot au
+    MarketDataLoader (chargement parallèle, cache disque) et conservées en mémoire
+    pendant `ttl` secondes : une valorisation à chaque rafraîchissement ne déclenche
+    une requête que pour les cotations périmées.
+    """
+
+    def __init__(self, loader=None, ttl=DEFAULT_QUOTE_TTL):
+        self.loader = loader or default_loader
+        self.ttl = ttl
+        self._quotes = {}  # symbole -> (instant de récupération, prix)
+        self._lock = threading.Lock()
+
+    def latest_prices(self, symbols, overrides=None, fetch=True):
+        """Derniers cours des symboles (NaN si indisponible), dans l'ordre de `symbols`
+
+        Retourne (prix, erreurs), erreurs étant les échecs de chargement de cet appel
+        {symbole: message}. Avec fetch=False, seules les cotations déjà en mémoire sont
+        utilisées, même périmées : aucune requête n'est émise.
+        """
+        errors = {}
+        overrides = overrides or {}
+        now = time.monotonic()
+        with self._lock:
+            stale = [symbol for symbol in dict.fromkeys(symbols)
+                     if fetch and symbol not in overrides
+                     and (symbol not in self._quotes or now - self._quotes[symbol][0] > self.ttl)]
+        if stale:
+            frames, errors = self.loader.load_many(stale, period="5d", interval="1d", max_age=self.ttl)
+            fetched = time.monotonic()
+            with self._lock:
+                for symbol in stale:
+                    data = frames.get(symbol)
+                    if data is not None and len(data):
+                        self._quotes[symbol] = (fetched, float(data['Close'].iloc[-1]))
+        with self._lock:
+            for symbol, price in overrides.items():
+                self._quotes[symbol] = (now, float(price))
+            return np.array([self._quotes[symbol][1] if symbol in self._quotes else np.nan
+                             for symbol in symbols]), errors
+
+    def value(self, portfolio, overrides=None, fetch=True):
+        """Valorisation du portefeuille : (DataFrame par position, valeur totale)
+
+        overrides : {symbole: prix} déjà connus, par exemple le cours affiché
+        fetch : False pour ne pas interroger la source (cotations en mémoire uniquement)
+
+        La colonne quote_error porte l'échec de chargement de la cotation d'une position
+        (valeur manquante sinon) : elle est alors valorisée à sa dernière cotation ou à son prix moyen.
+        """
+        # Instantané cohérent des positions d'un portefeuille partagé entre sessions
+        with portfolio.lock:
+            symbols = list(portfolio.holdings)
+            quantities = np.fromiter((p.quantity for p in portfolio.holdings.values()), dtype=float, count=len(symbols))
+            avg_prices = np.fromiter((p.avg_price for p in portfolio.holdings.values()), dtype=float, count=len(symbols))
+            cash = portfolio.cash
+        prices, errors = self.latest_prices(symbols, overrides, fetch) if symbols else (np.empty(0), {})
+
+        result = mark_to_market(quantities, avg_prices, prices, cash)
+        total_value = result.pop('total_value')
+        positions = pd.DataFrame({'quantity': quantities, 'avg_price': avg_prices, **result,
+                                  'quote_error': [errors.get(symbol) for symbol in symbols]},
+                                 index=pd.Index(symbols, name='symbol'))
+        return positions, total_value
+
+
+default_valuation_engine = ValuationEngine()
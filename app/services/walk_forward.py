@@ -0,0 +1,163 @@
+import numpy as np
+import pandas as pd
+from . import risk
+from .parameter_sweep import CHUNK_CELLS, TRADING_DAYS, rsi_grid, sma_crossover_grid
+
+# Optimisation walk-forward : fenêtres d'apprentissage et de test glissantes.
+#
+# Les fenêtres successives se recouvrent presque entièrement : rien n'est recalculé par
+# fenêtre. Les indicateurs (moyennes mobiles, RSI) sont calculés une seule fois sur tout
+# l'historique, si bien qu'une fenêtre hérite de leur état au lieu de repartir d'une période
+# de chauffe, puis les rendements de chaque combinaison sont cumulés une fois : le score
+# d'une combinaison sur n'importe quelle fenêtre est une différence de sommes cumulées.
+# Le coût est en O(barres × combinaisons + fenêtres × combinaisons), linéaire en la
+# longueur de l'historique quel que soit le nombre de fenêtres.
+#
+# Les rendements sont ceux d'une position entièrement investie dans le sens du signal :
+# r[t] = signal[t-1] × (close[t] / close[t-1] - 1), indépendants du capital de départ de
+# chaque fenêtre.
+
+# Stratégies optimisables : grille de paramètres -> (table des combinaisons, signaux)
+GRIDS = {
+    'sma_crossover': (sma_crossover_grid, ('short_window', 'long_window')),
+    'rsi': (rsi_grid, ('window', 'overbought', 'oversold')),
+}
+
+OBJECTIVES = ('sharpe_ratio', 'total_return')
+
+
+def walk_forward_windows(n_bars, train_size, test_size, step=None, anchored=False):
+    """Bornes [début, fin[ des fenêtres (train_start, train_end, test_start, test_end)
+
+    Chaque fenêtre avance de `step` barres (test_size par défaut) ; avec anchored, la
+    fenêtre d'apprentissage part toujours de la première barre. La dernière fenêtre de test
+    est tronquée à la fin de l'historique.
+    """
+    step = step or test_size
+    if train_size < 2 or test_size < 1 or step < 1:
+        raise ValueError("Fenêtres d'apprentissage (≥ 2 barres), de test et pas (≥ 1 barre) invalides")
+    test_start = np.arange(train_size, n_bars, step)
+    train_start = np.zeros_like(test_start) if anchored else test_start - train_size
+    test_end = np.minimum(test_start + test_size, n_bars)
+    return np.column_stack((train_start, test_start, test_start, test_end))
+
+
+def _bar_returns(close, signals):
+    """Rendements (temps × combinaisons) de positions suivant les signaux de la barre précédente"""
+    returns = np.zeros(signals.shape)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        change = close[1:] / close[:-1] - 1
+    np.multiply(signals[:-1], change[:, np.newaxis], out=returns[1:])
+    returns[np.isnan(returns)] = 0.0
+    return returns
+
+
+def _range_scores(returns, lo, hi, risk_free_rate, columns=None):
+    """Sharpe annualisé et rendement composé des rendements [lo, hi[ de chaque fenêtre
+
+    Sans `columns` : matrice (fenêtres × combinaisons) ; sinon une combinaison par fenêtre.
+    """
+    excess = returns - risk_free_rate / TRADING_DAYS
+    sums = risk.prefix_sums(excess)
+    squares = risk.prefix_sums(excess * excess)
+    # Une barre à -100 % ou pire ruine la position : elle est comptée à part au lieu de
+    # porter un logarithme infini dans toutes les fenêtres suivantes
+    ruined = returns <= -1
+    ruins = risk.prefix_sums(ruined.astype(float))
+    logs = risk.prefix_sums(np.log1p(np.where(ruined, 0.0, returns)))
+    if columns is None:
+        pick = lambda prefix: prefix[hi] - prefix[lo]
+        n = (hi - lo)[:, np.newaxis].astype(float)
+    else:
+        pick = lambda prefix: prefix[hi, columns] - prefix[lo, columns]
+        n = (hi - lo).astype(float)
+
+    total, square_sums = pick(sums), pick(squares)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        mean = total / n
+        # Même tolérance que risk.rolling_ratios sur le résidu d'arrondi de la variance
+        deviation = square_sums - total * mean
+        std = np.sqrt(np.where(deviation > 1e-10 * square_sums, deviation, 0.0) / (n - 1))
+        sharpe = np.where((n > 1) & (std > 0), np.sqrt(TRADING_DAYS) * mean / std, np.nan)
+    total_return = np.where(pick(ruins) > 0, -1.0, np.expm1(pick(logs)))
+    return {'sharpe_ratio': sharpe, 'total_return': total_return}
+
+
+def walk_forward(close, strategy, grid, train_size, test_size, step=None, anchored=False,
+                 objective='sharpe_ratio', initial_capital=10000.0, risk_free_rate=0.02):
+    """Optimise la stratégie sur chaque fenêtre d'apprentissage et l'évalue hors échantillon
+
+    close : clôtures (Series pour des bornes datées, ou tableau)
+    strategy : 'sma_crossover' ou 'rsi'
+    grid : valeurs de chaque paramètre, ex. {'short_window': [10, 20], 'long_window': [50, 100]}
+    objective : 'sharpe_ratio' ou 'total_return', maximisé sur la fenêtre d'apprentissage
+
+    Les paramètres retenus à la fin d'une fenêtre d'apprentissage s'appliquent dès la
+    première barre de test : le rendement de cette barre dépend du signal de la dernière
+    barre d'apprentissage, calculé sans donnée postérieure. Retourne la table des fenêtres
+    (bornes, paramètres retenus, scores) et la courbe de capital hors échantillon.
+    """
+    if strategy not in GRIDS:
+        raise ValueError(f"Stratégie inconnue : {strategy} (disponibles : {', '.join(GRIDS)})")
+    if objective not in OBJECTIVES:
+        raise ValueError(f"Objectif inconnu : {objective} (disponibles : {', '.join(OBJECTIVES)})")
+    make_grid, names = GRIDS[strategy]
+    index = close.index if isinstance(close, pd.Series) else None
+    close = np.asarray(close, dtype=float)
+    n_bars = len(close)
+    bounds = walk_forward_windows(n_bars, train_size, test_size, step, anchored)
+    if len(bounds) == 0:
+        raise ValueError("Historique trop court pour une fenêtre d'apprentissage et de test")
+    train_start, train_end, test_start, test_end = bounds.T
+
+    table, make_signals = make_grid(close, *(grid[name] for name in names))
+    n_combos = len(table)
+
+    # Scores d'apprentissage de toutes les combinaisons, par blocs de colonnes. Le premier
+    # rendement d'une fenêtre est celui de sa deuxième barre, comme dans backtest_strategy.
+    scores = np.empty((len(bounds), n_combos))
+    chunk = max(1, CHUNK_CELLS // max(n_bars, 1))
+    for start in range(0, n_combos, chunk):
+        stop = min(start + chunk, n_combos)
+        returns = _bar_returns(close, make_signals(slice(start, stop)).astype(float))
+        scores[:, start:stop] = _range_scores(returns, train_start + 1, train_end, risk_free_rate)[objective]
+    best = np.argmax(np.where(np.isnan(scores), -np.inf, scores), axis=1)
+
+    # Hors échantillon : uniquement les combinaisons retenues
+    selected, column_of_window = np.unique(best, return_inverse=True)
+    returns = _bar_returns(close, make_signals(selected).astype(float))
+    test_scores = _range_scores(returns, test_start, test_end, risk_free_rate, columns=column_of_window)
+
+    # Courbe hors échantillon : chaque barre suit la dernière fenêtre de test qui la couvre
+    bars = np.arange(test_start[0], test_end.max())
+    window_of_bar = np.searchsorted(test_start, bars, side='right') - 1
+    covered = bars < test_end[window_of_bar]
+    bars, window_of_bar = bars[covered], window_of_bar[covered]
+    labels = index[bars] if index is not None else bars
+    oos_returns = pd.Series(returns[bars, column_of_window[window_of_bar]], index=labels, name='returns')
+    # Capital nul (et non négatif) après une barre ruineuse, comme total_return = -1
+    equity = (initial_capital * (1 + oos_returns).clip(lower=0.0).cumprod()).rename('equity')
+
+    label = (lambda positions: index[positions]) if index is not None else (lambda positions: positions)
+    windows = pd.DataFrame({
+        'train_start': label(train_start),
+        'train_end': label(train_end - 1),
+        'test_start': label(test_start),
+        'test_end': label(test_end - 1),
+    })
+    for name in names:
+        windows[name] = table[name].to_numpy()[best]
+    windows['train_score'] = scores[np.arange(len(bounds)), best]
+    windows['test_return'] = test_scores['total_return']
+    windows['test_sharpe'] = test_scores['sharpe_ratio']
+
+    final_capital = float(equity.iloc[-1])
+    return {
+        'windows': windows,
+        'returns': oos_returns,
+        'equity': equity,
+        'final_capital': final_capital,
+        'total_return': (final_capital - initial_capital) / initial_capital,
+        'sharpe_ratio': risk.sharpe_ratio(oos_returns, risk_free_rate, TRADING_DAYS),
+        'max_drawdown': risk.max_drawdown(equity),
+    }
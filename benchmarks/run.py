@@ -0,0 +1,302 @@
+"""Benchmarks des chemins critiques de TradeSim
+
+Usage :
+    python -m benchmarks.run [--sizes 1000 100000] [--only calculate_sma ...]
+                             [--output benchmarks/results.json] [--update-thresholds]
+
+Chaque benchmark est mesuré pour des historiques de 1 000 à 10 millions de barres, servis
+par une source factice (aucun accès réseau) à travers le vrai chemin de chargement et de
+cache. Les résultats sont écrits en JSON et comparés aux seuils de benchmarks/thresholds.json :
+une mesure qui dépasse sa référence de plus de `tolerance` est une régression, et la
+commande se termine avec le code 1.
+
+Les références sont des durées absolues, propres à une machine : elles sont générées sur
+place avec --update-thresholds (le fichier n'est pas versionné) et portent l'empreinte de
+la machine qui les a mesurées. Des références d'une autre machine ne sont pas comparées.
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+import numpy as np
+import pandas as pd
+from app.services.charts import price_figure
+from app.services.data_providers import DataProvider
+from app.services.market_cache import OHLCVCache, trim_to_period
+from app.services.market_data_loader import MarketDataLoader
+from app.services.parameter_sweep import sweep_sma_crossover
+from app.services.portfolio import TRANSACTION_DTYPE, Portfolio
+from app.services.trading_service import TradingService
+
+SIZES = (1_000, 10_000, 100_000, 1_000_000, 10_000_000)
+THRESHOLDS_PATH = os.path.join(os.path.dirname(__file__), "thresholds.json")
+DEFAULT_OUTPUT = os.path.join(os.path.dirname(__file__), "results.json")
+DEFAULT_TOLERANCE = 1.5
+# Ordres passés par le benchmark du portefeuille, sur un journal d'une transaction par barre
+ORDER_BATCH = 1_000
+# Balayage de paramètres : grille 100×100 sur au plus 10 ans de barres journalières
+SWEEP_BARS = 2_520
+SWEEP_SHORT_WINDOWS = range(2, 102)
+SWEEP_LONG_WINDOWS = range(20, 220, 2)
+SYMBOL = "BENCH"
+
+
+def make_bars(n_bars, seed=0):
+    """Barres minute factices (marche aléatoire), générées sans boucle Python"""
+    rng = np.random.default_rng(seed)
+    index = pd.date_range("2000-01-03 09:30", periods=n_bars, freq="min", tz="America/New_York", name="Datetime")
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.001, n_bars)))
+    spread = close * rng.uniform(0.0001, 0.002, n_bars)
+    return pd.DataFrame({
+        'Open': close + rng.uniform(-1, 1, n_bars) * spread,
+        'High': close + spread,
+        'Low': close - spread,
+        'Close': close,
+        'Volume': rng.integers(100, 10_000, n_bars),
+    }, index=index)
+
+
+class StubProvider(DataProvider):
+    """Source factice qui sert des barres prégénérées"""
+
+    name = 'stub'
+
+    def __init__(self, bars):
+        self.bars = bars
+
+    def history(self, symbol, period=None, interval='1d', start=None):
+        if start is not None:
+            return self.bars[self.bars.index >= start]
+        return trim_to_period(self.bars, period or 'max')
+
+
+def measure(func, setup=None, min_time=0.2, max_repeat=20):
+    """Exécute func jusqu'à min_time secondes cumulées, retourne les durées de chaque passage"""
+    timings = []
+    while not timings or (sum(timings) < min_time and len(timings) < max_repeat):
+        if setup is not None:
+            setup()
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    return timings
+
+
+def machine_fingerprint():
+    """Empreinte de la machine et des bibliothèques, à laquelle les références sont liées"""
+    return {
+        'machine': platform.machine(),
+        'processor': platform.processor(),
+        'cpus': os.cpu_count(),
+        'python': platform.python_version(),
+        'numpy': np.__version__,
+        'pandas': pd.__version__,
+    }
+
+
+def _journal_portfolio(close):
+    """Portefeuille dont le journal contient déjà une transaction par barre
+
+    Le journal est rempli d'un bloc : seuls les ordres du lot sont passés un par un.
+    """
+    portfolio = Portfolio(1e12)
+    n_rows = len(close)
+    rows = np.empty(n_rows, dtype=TRANSACTION_DTYPE)
+    rows['timestamp'] = close.index.tz_convert('UTC').tz_localize(None).values
+    rows['symbol'] = portfolio.ledger.symbol_code(SYMBOL)
+    rows['type'] = np.arange(n_rows) % 2
+    rows['quantity'] = 1
+    rows['price'] = close.to_numpy()
+    rows['total'] = rows['price']
+    portfolio.ledger.extend_transactions(rows)
+    return portfolio
+
+
+def _fill_orders(portfolio, prices, timestamps):
+    """Alterne achats et ventes, comme une succession d'appels à update_portfolio"""
+    for i in range(len(prices)):
+        if i % 2 == 0:
+            portfolio.buy(SYMBOL, prices[i], 1, timestamp=timestamps[i])
+        else:
+            portfolio.sell(SYMBOL, prices[i], 1, timestamp=timestamps[i])
+
+
+def build_benchmarks(service):
+    """Benchmarks {nom: (fonction, préparation)} sur un service déjà chargé
+
+    La préparation invalide les calculs mémoïsés : chaque passage mesure un calcul complet.
+    """
+    def invalidate():
+        service.data_version += 1
+
+    close = service.data['Close']
+    returns = close.pct_change()
+    cumulative_returns = (1 + returns.fillna(0)).cumprod()
+
+    # Ordres du lot : les dernières barres, passées sur un journal couvrant tout l'historique
+    order_prices = close.to_numpy()[-ORDER_BATCH:].tolist()
+    order_times = close.index[-ORDER_BATCH:]
+    journal = _journal_portfolio(close)
+
+    # Chargement réel : lecture du fichier .npz par un cache sans copie mémoire, le cache
+    # étant assez récent pour qu'aucune barre ne soit demandée à la source ni réécrite
+    loader = service.loader
+
+    def cold_cache():
+        service.loader = MarketDataLoader(OHLCVCache(loader.cache.cache_dir), provider=loader.provider)
+
+    def load_data():
+        service.max_age = float('inf')
+        return service._load_data()
+
+    # Portefeuille dont les transactions couvrent tout l'historique, pour les marqueurs du graphique
+    chart_portfolio = Portfolio(1e12)
+    positions = np.linspace(0, len(close) - 1, min(len(close), 1_000)).astype(np.int64)
+    _fill_orders(chart_portfolio, close.to_numpy()[positions].tolist(), close.index[positions])
+
+    sweep_close = close.to_numpy()[-SWEEP_BARS:]
+
+    def chart_figure():
+        chart_data = service.chart_data()
+        transactions = chart_portfolio.ledger.symbol_transactions(SYMBOL, start=chart_data.index[0])
+        price_figure(chart_data, transactions, SYMBOL)
+
+    return {
+        '_load_data': (load_data, cold_cache),
+        'calculate_sma': (service.calculate_sma, invalidate),
+        'calculate_ema': (service.calculate_ema, invalidate),
+        'calculate_rsi': (service.calculate_rsi, invalidate),
+        'calculate_bollinger_bands': (service.calculate_bollinger_bands, invalidate),
+        'sma_crossover_strategy': (service.sma_crossover_strategy, invalidate),
+        'rsi_strategy': (service.rsi_strategy, invalidate),
+        'backtest_strategy': (lambda: service.backtest_strategy(service.sma_crossover_strategy), invalidate),
+        'calculate_sharpe_ratio': (lambda: service.calculate_sharpe_ratio(returns), None),
+        'calculate_max_drawdown': (lambda: service.calculate_max_drawdown(cumulative_returns), None),
+        'update_portfolio': (lambda: _fill_orders(journal, order_prices, order_times), None),
+        'chart_figure': (chart_figure, invalidate),
+        'sweep_sma_crossover': (lambda: sweep_sma_crossover(sweep_close, SWEEP_SHORT_WINDOWS, SWEEP_LONG_WINDOWS), None),
+    }
+
+
+def run(sizes=SIZES, only=None, min_time=0.2, cache_dir=None, log=print):
+    """Exécute les benchmarks pour chaque taille, retourne la liste des mesures"""
+    results = []
+    with tempfile.TemporaryDirectory() as tmp:
+        # Passage à vide : imports paresseux et modèles Plotly ne sont pas comptés dans la première mesure
+        warmup = TradingService(SYMBOL, period="max", interval="1m", cache=OHLCVCache(os.path.join(tmp, "warmup")),
+                                provider=StubProvider(make_bars(1_000)))
+        for func, setup in build_benchmarks(warmup).values():
+            func()
+
+        for n_bars in sizes:
+            provider = StubProvider(make_bars(n_bars))
+            cache = OHLCVCache(os.path.join(cache_dir or tmp, str(n_bars)))
+            service = TradingService(SYMBOL, period="max", interval="1m", cache=cache, provider=provider)
+            for name, (func, setup) in build_benchmarks(service).items():
+                if only and name not in only:
+                    continue
+                timings = measure(func, setup, min_time=min_time)
+                result = {
+                    'name': name,
+                    'bars': n_bars,
+                    'seconds': min(timings),
+                    'median': statistics.median(timings),
+                    'repeat': len(timings),
+                }
+                results.append(result)
+                log(f"{name:<28} {n_bars:>12,} barres  {result['seconds'] * 1e3:>12.3f} ms  (x{result['repeat']})")
+            del service, provider
+    return results
+
+
+def load_thresholds(path=THRESHOLDS_PATH):
+    if not os.path.exists(path):
+        return {'tolerance': DEFAULT_TOLERANCE, 'baseline': {}}
+    with open(path) as f:
+        return json.load(f)
+
+
+def check_regressions(results, thresholds):
+    """Annote chaque mesure avec sa référence et retourne celles qui la dépassent de plus de la tolérance"""
+    tolerance = thresholds.get('tolerance', DEFAULT_TOLERANCE)
+    regressions = []
+    for result in results:
+        baseline = thresholds.get('baseline', {}).get(result['name'], {}).get(str(result['bars']))
+        result['baseline'] = baseline
+        result['ratio'] = result['seconds'] / baseline if baseline else None
+        result['regression'] = bool(baseline) and result['seconds'] > baseline * tolerance
+        if result['regression']:
+            regressions.append(result)
+    return regressions
+
+
+def comparable_thresholds(thresholds, fingerprint):
+    """Références utilisables sur cette machine : aucune si elles ont été mesurées ailleurs"""
+    if thresholds.get('machine') not in (None, fingerprint):
+        return {'tolerance': thresholds.get('tolerance', DEFAULT_TOLERANCE), 'baseline': {}}
+    return thresholds
+
+
+def update_thresholds(results, thresholds):
+    """Remplace les références par les mesures de ce passage, sur cette machine"""
+    if thresholds.get('machine') != machine_fingerprint():
+        thresholds['baseline'] = {}
+    thresholds['machine'] = machine_fingerprint()
+    baseline = thresholds.setdefault('baseline', {})
+    thresholds.setdefault('tolerance', DEFAULT_TOLERANCE)
+    for result in results:
+        baseline.setdefault(result['name'], {})[str(result['bars'])] = round(result['seconds'], 6)
+    return thresholds
+
+
+def write_report(path, results, regressions, thresholds):
+    report = {
+        'created': pd.Timestamp.now(tz='UTC').isoformat(),
+        **machine_fingerprint(),
+        'tolerance': thresholds.get('tolerance', DEFAULT_TOLERANCE),
+        'results': results,
+        'regressions': [(r['name'], r['bars']) for r in regressions],
+    }
+    with open(path, 'w') as f:
+        json.dump(report, f, indent=2)
+    return report
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmarks des chemins critiques de TradeSim")
+    parser.add_argument('--sizes', type=int, nargs='+', default=list(SIZES), help="Nombres de barres")
+    parser.add_argument('--only', nargs='+', help="Benchmarks à exécuter (tous par défaut)")
+    parser.add_argument('--min-time', type=float, default=0.2, help="Durée cumulée minimale par mesure, en secondes")
+    parser.add_argument('--output', default=DEFAULT_OUTPUT, help="Fichier JSON des résultats")
+    parser.add_argument('--thresholds', default=THRESHOLDS_PATH, help="Fichier JSON des seuils de régression")
+    parser.add_argument('--update-thresholds', action='store_true', help="Enregistre ces mesures comme références")
+    args = parser.parse_args(argv)
+
+    thresholds = load_thresholds(args.thresholds)
+    comparable = comparable_thresholds(thresholds, machine_fingerprint())
+    if not comparable.get('baseline'):
+        print(f"Aucune référence pour cette machine dans {args.thresholds} : "
+              "lancez une première fois avec --update-thresholds")
+    results = run(args.sizes, args.only, args.min_time)
+    regressions = check_regressions(results, comparable)
+    write_report(args.output, results, regressions, thresholds)
+    print(f"Résultats écrits dans {args.output}")
+
+    if args.update_thresholds:
+        with open(args.thresholds, 'w') as f:
+            json.dump(update_thresholds(results, thresholds), f, indent=2, sort_keys=True)
+        print(f"Références mises à jour dans {args.thresholds}")
+        return 0
+
+    for r in regressions:
+        print(f"Régression : {r['name']} sur {r['bars']:,} barres, {r['seconds']:.4f}s "
+              f"contre {r['baseline']:.4f}s (x{r['ratio']:.2f})")
+    return 1 if regressions else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
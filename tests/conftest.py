@@ -0,0 +1,24 @@
+import pytest
+from helpers import StubProvider, random_walk_bars
+from app.services.market_cache import OHLCVCache
+from app.services.trading_service import TradingService
+
+
+@pytest.fixture
+def stub_provider():
+    """Source de données factice, sans accès réseau, à passer au chargeur ou au service"""
+    return StubProvider()
+
+
+@pytest.fixture
+def offline_service(tmp_path, stub_provider):
+    """Fabrique de TradingService alimentés par des barres factices, sans accès réseau"""
+    cache = OHLCVCache(str(tmp_path / "ohlcv"))
+
+    def factory(symbol="AAPL", periods=300, seed=0, **kwargs):
+        stub_provider.bars[symbol] = random_walk_bars(periods, seed)
+        return TradingService(symbol, period=kwargs.pop('period', 'max'), cache=cache, provider=stub_provider, **kwargs)
+
+    # Permet aux tests de faire évoluer les barres servies entre deux rafraîchissements
+    factory.bars = stub_provider.bars
+    return factory
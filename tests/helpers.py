@@ -0,0 +1,62 @@
+import threading
+import numpy as np
+import pandas as pd
+from app.services.data_providers import DataProvider
+
+
+def random_walk_bars(periods=300, seed=0, start="2023-01-02"):
+    """Barres journalières factices suivant une marche aléatoire"""
+    rng = np.random.default_rng(seed)
+    index = pd.date_range(start, periods=periods, freq="B", tz="America/New_York", name="Date").as_unit("ns")
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.02, periods)))
+    spread = close * rng.uniform(0.001, 0.02, periods)
+    return pd.DataFrame({
+        'Open': close + rng.uniform(-1, 1, periods) * spread,
+        'High': close + spread,
+        'Low': close - spread,
+        'Close': close,
+        'Volume': rng.integers(1_000, 100_000, periods),
+    }, index=index)
+
+
+def linear_bars(periods, start="2023-01-02", tz="America/New_York", base=100.0):
+    """Barres journalières factices dont la clôture augmente d'une unité par séance"""
+    index = pd.date_range(start, periods=periods, freq="B", tz=tz, name="Date").as_unit("ns")
+    close = base + np.arange(periods, dtype=float)
+    return pd.DataFrame({
+        'Open': close - 0.5,
+        'High': close + 1.0,
+        'Low': close - 1.0,
+        'Close': close,
+        'Volume': np.arange(periods, dtype=np.int64) * 1000,
+    }, index=index)
+
+
+class StubProvider(DataProvider):
+    """Source de données factice : sert les barres de `bars` et consigne chaque appel
+
+    bars : {symbole: DataFrame, ou exception levée à la demande}. Un symbole absent
+    donne un historique vide.
+    """
+
+    name = 'stub'
+
+    def __init__(self, bars=None):
+        self.bars = dict(bars or {})
+        self.calls = []
+        self._lock = threading.Lock()
+
+    @property
+    def downloads(self):
+        """Symboles demandés, dans l'ordre des appels"""
+        return [call['symbol'] for call in self.calls]
+
+    def history(self, symbol, period=None, interval='1d', start=None):
+        with self._lock:
+            self.calls.append({'symbol': symbol, 'period': period, 'interval': interval, 'start': start})
+        data = self.bars.get(symbol)
+        if isinstance(data, Exception):
+            raise data
+        if data is None:
+            return pd.DataFrame()
+        return data if start is None else data[data.index >= start]
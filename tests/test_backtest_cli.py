@@ -0,0 +1,70 @@
+import csv
+import os
+import subprocess
+import sys
+import pytest
+from app import backtest
+from app.services.lazy_import import LazyModule
+
+
+@pytest.fixture
+def symbols_file(tmp_path):
+    path = tmp_path / "symbols.txt"
+    path.write_text("AAPL\n# commentaire\nMC.PA\n\nAAPL\n")
+    return path
+
+
+def test_parse_strategy():
+    assert backtest.parse_strategy("sma_crossover:short_window=10,long_window=30") == \
+        ('sma_crossover', {'short_window': 10, 'long_window': 30})
+    assert backtest.parse_strategy("rsi") == ('rsi', {})
+    with pytest.raises(ValueError):
+        backtest.parse_strategy("macd:fast=12")
+
+
+def test_cli_streams_csv_rows_and_runs_offline_from_cache(tmp_path, symbols_file):
+    output = tmp_path / "results.csv"
+    common = [str(symbols_file), "-s", "sma_crossover:short_window=10,long_window=30", "-s", "rsi:window=14",
+              "--provider", "synthetic", "--seed", "3", "--cache-dir", str(tmp_path / "cache"), "--period", "1y"]
+
+    assert backtest.main(common + ["-o", str(output)]) == 0
+    rows = list(csv.DictReader(output.open()))
+    assert sorted((r['symbol'], r['strategy']) for r in rows) == [
+        ('AAPL', 'rsi'), ('AAPL', 'sma_crossover'), ('MC.PA', 'rsi'), ('MC.PA', 'sma_crossover')]
+    assert all(r['error'] == '' and int(r['bars']) > 200 for r in rows)
+
+    # Hors ligne : les mêmes résultats sont servis par le cache, un symbole absent est signalé
+    symbols_file.write_text("AAPL\nMC.PA\nMSFT\n")
+    offline = tmp_path / "offline.csv"
+    assert backtest.main(common + ["-o", str(offline), "--offline"]) == 0
+    offline_rows = {(r['symbol'], r['strategy']): r for r in csv.DictReader(offline.open())}
+    assert offline_rows[('MSFT', 'rsi')]['error']
+    for row in rows:
+        assert offline_rows[(row['symbol'], row['strategy'])]['final_capital'] == row['final_capital']
+
+
+def test_cli_writes_parquet(tmp_path, symbols_file):
+    pq = pytest.importorskip("pyarrow.parquet")
+    output = tmp_path / "results.parquet"
+
+    assert backtest.main([str(symbols_file), "-s", "rsi", "--provider", "synthetic",
+                          "--cache-dir", str(tmp_path / "cache"), "-o", str(output)]) == 0
+    table = pq.read_table(output)
+    assert table.num_rows == 2
+    assert table.column_names == [name for name, _ in backtest.COLUMNS]
+
+
+def test_cli_import_does_not_load_heavy_modules():
+    code = ("import sys, app.backtest; "
+            "print(','.join(m for m in ('yfinance', 'ta', 'plotly', 'pyarrow', 'streamlit') if m in sys.modules))")
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    result = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True, cwd=root)
+    assert result.stdout.strip() == ""
+
+
+def test_lazy_module_imports_on_first_use():
+    module = LazyModule("json")
+    assert "non chargé" in repr(module)
+    assert module.dumps([1]) == "[1]"
+    module.dumps = lambda value: "patché"
+    assert module.dumps([1]) == "patché"
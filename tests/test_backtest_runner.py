@@ -0,0 +1,50 @@
+import pytest
+from helpers import random_walk_bars
+import numpy as np
+from app.services.backtest_runner import BacktestRunner, rsi_signals, sma_crossover_signals
+from app.services.parameter_sweep import rsi_grid, sma_crossover_grid, sweep_rsi, sweep_sma_crossover
+
+
+def test_batch_signals_are_the_sweep_columns():
+    """Test que les lots du pool et les grilles vectorisées partagent la même génération de signaux"""
+    close = random_walk_bars(300)['Close'].to_numpy()
+    table, make_signals = sma_crossover_grid(close, [5, 10], [20, 50])
+    batch = [{'short_window': 10, 'long_window': 20}, {'short_window': 5, 'long_window': 50}]
+    np.testing.assert_array_equal(sma_crossover_signals(close, batch), make_signals(np.array([2, 1])))
+
+    table, make_signals = rsi_grid(close, [7, 14], [70], [30])
+    batch = [{'window': 14}, {'window': 7, 'overbought': 70, 'oversold': 30}]
+    np.testing.assert_array_equal(rsi_signals(close, batch), make_signals(np.array([1, 0])))
+
+
+def test_runner_matches_sweeps():
+    """Test que le pool de processus reproduit les résultats des balayages vectorisés"""
+    prices = {symbol: random_walk_bars(300, seed=seed) for seed, symbol in enumerate(["AAPL", "MSFT", "MC.PA"])}
+    jobs = []
+    for symbol in prices:
+        for short, long_ in [(5, 20), (10, 50), (20, 100)]:
+            jobs.append((symbol, 'sma_crossover', {'short_window': short, 'long_window': long_}))
+        jobs.append((symbol, 'rsi', {'window': 14, 'overbought': 70, 'oversold': 30}))
+
+    runner = BacktestRunner(max_workers=2, batch_size=2)
+    results = list(runner.run(prices, jobs))
+    assert len(results) == len(jobs)
+    assert runner.stats['jobs'] == len(jobs)
+    assert runner.stats['jobs_per_second'] > 0
+
+    for result in results:
+        close = prices[result['symbol']]['Close'].to_numpy()
+        params = result['params']
+        if result['strategy'] == 'sma_crossover':
+            expected = sweep_sma_crossover(close, [params['short_window']], [params['long_window']]).iloc[0]
+        else:
+            expected = sweep_rsi(close, [params['window']], [params['overbought']], [params['oversold']]).iloc[0]
+        assert result['final_capital'] == pytest.approx(expected['final_capital'])
+        assert result['sharpe_ratio'] == pytest.approx(expected['sharpe_ratio'])
+
+
+def test_runner_rejects_unknown_strategy():
+    """Test le rejet d'une stratégie inconnue"""
+    runner = BacktestRunner(max_workers=1)
+    with pytest.raises(ValueError):
+        list(runner.run({'AAPL': random_walk_bars(50)}, [('AAPL', 'macd', {})]))
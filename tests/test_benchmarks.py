@@ -0,0 +1,46 @@
+import json
+import pytest
+from benchmarks import run as bench
+
+
+def test_benchmark_suite_runs_on_stubbed_source(tmp_path):
+    output = tmp_path / "results.json"
+    thresholds = tmp_path / "thresholds.json"
+
+    assert bench.main(["--sizes", "1000", "--min-time", "0", "--output", str(output),
+                       "--thresholds", str(thresholds), "--update-thresholds"]) == 0
+
+    report = json.loads(output.read_text())
+    names = {r['name'] for r in report['results']}
+    assert {'_load_data', 'calculate_rsi', 'backtest_strategy', 'update_portfolio', 'chart_figure'} <= names
+    assert all(r['bars'] == 1000 and r['seconds'] > 0 for r in report['results'])
+    assert set(json.loads(thresholds.read_text())['baseline']) == names
+
+
+def test_check_regressions_flags_slowdowns_beyond_tolerance():
+    thresholds = {'tolerance': 1.5, 'baseline': {'calculate_sma': {'1000': 0.010}}}
+    results = [
+        {'name': 'calculate_sma', 'bars': 1000, 'seconds': 0.014},
+        {'name': 'calculate_sma', 'bars': 10000, 'seconds': 1.0},
+    ]
+
+    assert bench.check_regressions(results, thresholds) == []
+
+    results[0]['seconds'] = 0.016
+    regressions = bench.check_regressions(results, thresholds)
+    assert [(r['name'], r['bars']) for r in regressions] == [('calculate_sma', 1000)]
+    assert regressions[0]['ratio'] == pytest.approx(1.6)
+    # Sans référence, une mesure n'est jamais une régression
+    assert results[1]['regression'] is False
+
+
+def test_thresholds_from_another_machine_are_not_compared():
+    fingerprint = bench.machine_fingerprint()
+    thresholds = bench.update_thresholds([{'name': 'calculate_sma', 'bars': 1000, 'seconds': 0.010}],
+                                         {'machine': dict(fingerprint, processor='autre'), 'baseline': {'x': {}}})
+    assert thresholds['machine'] == fingerprint and set(thresholds['baseline']) == {'calculate_sma'}
+    assert bench.comparable_thresholds(thresholds, fingerprint) is thresholds
+
+    other = bench.comparable_thresholds(thresholds, dict(fingerprint, cpus=-1))
+    results = [{'name': 'calculate_sma', 'bars': 1000, 'seconds': 1.0}]
+    assert bench.check_regressions(results, other) == []
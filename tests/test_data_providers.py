@@ -0,0 +1,56 @@
+import numpy as np
+import pandas as pd
+from app.services.data_providers import SyntheticProvider
+from app.services.market_cache import OHLCVCache
+from app.services.market_data_loader import MarketDataLoader
+
+
+def test_synthetic_history_is_reproducible_and_consistent():
+    provider = SyntheticProvider(seed=7, end="2024-06-28 16:00")
+    data = provider.history("AAPL", period="1y")
+
+    assert len(data) > 240
+    assert data.index.tz is not None
+    assert (data[['Open', 'High', 'Low', 'Close']] > 0).all().all()
+    assert (data['High'] >= data[['Open', 'Close']].max(axis=1)).all()
+    assert (data['Low'] <= data[['Open', 'Close']].min(axis=1)).all()
+    pd.testing.assert_frame_equal(data, SyntheticProvider(seed=7, end="2024-06-28 16:00").history("AAPL", period="1y"))
+
+    # Les barres d'une requête incrémentale sont celles de l'historique complet
+    later = SyntheticProvider(seed=7, end="2024-07-31 16:00").history("AAPL", interval='1d', start=data.index[-2])
+    pd.testing.assert_frame_equal(later.loc[:data.index[-1]], data.iloc[-2:])
+    assert later.index[-1] > data.index[-1]
+
+    other = SyntheticProvider(seed=8, end="2024-06-28 16:00").history("AAPL", period="1y")
+    assert not np.allclose(other['Close'], data['Close'])
+
+
+def test_synthetic_intraday_bars_follow_trading_hours():
+    data = SyntheticProvider(seed=1, end="2024-06-28 18:00").history("MC.PA", period="5d", interval="5m")
+
+    local = data.index.tz_convert("Europe/Paris")
+    assert local.min().time() >= pd.Timestamp("09:00").time()
+    assert local.max().time() < pd.Timestamp("17:30").time()
+    assert len(set(local.date)) == 5
+
+
+def test_synthetic_panel_scales_to_thousands_of_symbols():
+    provider = SyntheticProvider(seed=3)
+    symbols = [f"SYM{i}" for i in range(2000)]
+
+    close = provider.panel(symbols, 252)
+
+    assert close.shape == (252, 2000)
+    assert np.isfinite(close).all() and (close > 0).all()
+    # Chaque symbole garde sa trajectoire quelle que soit la composition du panier
+    np.testing.assert_allclose(provider.panel(symbols[5:6], 252)[:, 0], close[:, 5])
+
+
+def test_loader_uses_a_namespaced_cache_for_other_providers(tmp_path):
+    provider = SyntheticProvider(seed=0, end="2024-06-28 16:00")
+    loader = MarketDataLoader(OHLCVCache(str(tmp_path)), provider=provider)
+
+    data = loader.load("AAPL", period="6mo")
+
+    assert data is not None and len(data) > 100
+    assert MarketDataLoader(provider=provider).cache.cache_dir.endswith("synthetic")
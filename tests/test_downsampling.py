@@ -0,0 +1,46 @@
+import numpy as np
+import pandas as pd
+from helpers import random_walk_bars
+from app.services.downsampling import downsample_ohlcv, visible_range
+
+
+def test_buckets_aggregate_ohlcv():
+    """Test de l'agrégation des barres en chandeliers"""
+    data = random_walk_bars(1000)
+    sampled = downsample_ohlcv(data, max_buckets=100)
+    assert len(sampled) == 100
+    first = data.iloc[:10]
+    assert sampled.index[0] == data.index[0]
+    assert sampled['Open'].iloc[0] == first['Open'].iloc[0]
+    assert sampled['High'].iloc[0] == first['High'].max()
+    assert sampled['Low'].iloc[0] == first['Low'].min()
+    assert sampled['Close'].iloc[0] == first['Close'].iloc[-1]
+    assert sampled['Volume'].sum() == data['Volume'].sum()
+    assert sampled['Close'].iloc[-1] == data['Close'].iloc[-1]
+
+
+def test_small_ranges_are_returned_unchanged():
+    """Test du zoom : une plage courte garde toutes ses barres"""
+    data = random_walk_bars(1000)
+    start = data.index[-50]
+    zoomed = downsample_ohlcv(data, max_buckets=100, start=start)
+    pd.testing.assert_frame_equal(zoomed, data.iloc[-50:])
+    assert len(visible_range(data, data.index[10], data.index[19])) == 10
+
+
+def test_payload_is_bounded():
+    """Test du nombre de chandeliers pour un historique non multiple du nombre de groupes"""
+    data = random_walk_bars(12345)
+    sampled = downsample_ohlcv(data, max_buckets=600)
+    assert len(sampled) <= 600
+    assert sampled.index.is_monotonic_increasing
+    assert np.isclose(sampled['High'].max(), data['High'].max())
+
+
+def test_service_chart_data_is_cached(offline_service):
+    """Test de la mémorisation des barres du graphique par version de données"""
+    service = offline_service(periods=2000)
+    sampled = service.chart_data(max_buckets=200)
+    assert len(sampled) == 200
+    assert service.chart_data(max_buckets=200) is sampled
+    assert len(service.chart_data(max_buckets=200, window=pd.Timedelta(days=30))) <= 31
@@ -0,0 +1,78 @@
+import pandas as pd
+from app.services.indicator_cache import IndicatorCache
+
+
+def test_repeated_calls_hit_the_cache(offline_service):
+    """Test qu'un même indicateur n'est calculé qu'une fois par version des données"""
+    service = offline_service()
+    first = service.calculate_sma(window=20)
+    assert service.calculate_sma(window=20) is first
+    service.calculate_sma(window=50)
+
+    stats = service.cache_stats()
+    assert stats['hits'] == 1
+    assert stats['misses'] == 2
+    assert stats['entries'] == 2
+
+
+def test_backtest_reuses_indicators(offline_service):
+    """Test que la stratégie réutilise les moyennes mobiles déjà calculées"""
+    service = offline_service()
+    service.calculate_sma(window=20)
+    service.calculate_sma(window=50)
+    signals = service.sma_crossover_strategy(20, 50)
+    assert service.sma_crossover_strategy(20, 50) is signals
+    assert service.cache_stats()['hits'] == 3
+
+
+def test_new_data_version_invalidates_entries():
+    """Test l'invalidation des entrées lorsque la version des données change"""
+    cache = IndicatorCache()
+    calls = []
+
+    def compute():
+        calls.append(1)
+        return pd.Series([1.0, 2.0])
+
+    cache.get_or_compute('sma', (20,), 1, compute)
+    cache.get_or_compute('sma', (20,), 1, compute)
+    cache.get_or_compute('sma', (20,), 2, compute)
+    assert len(calls) == 2
+    assert cache.stats()['entries'] == 1
+
+
+def test_lru_eviction_respects_memory_cap():
+    """Test l'éviction des entrées les moins récemment utilisées"""
+    series = pd.Series(range(100), dtype=float)  # 800 octets
+    cache = IndicatorCache(max_bytes=2000)
+    cache.get_or_compute('a', (), 1, lambda: series)
+    cache.get_or_compute('b', (), 1, lambda: series.copy())
+    cache.get_or_compute('a', (), 1, lambda: series)
+    cache.get_or_compute('c', (), 1, lambda: series.copy())
+
+    stats = cache.stats()
+    assert stats['evictions'] == 1
+    assert stats['nbytes'] <= 2000
+    # 'b' était la moins récemment utilisée
+    cache.get_or_compute('b', (), 1, lambda: series.copy())
+    assert cache.stats()['misses'] == 4
+
+
+def test_shared_cache_keeps_services_apart(offline_service):
+    """Test qu'un cache partagé ne sert pas l'indicateur d'un service à un autre"""
+    cache = IndicatorCache()
+    first = offline_service(symbol="AAPL", indicator_cache=cache)
+    second = offline_service(symbol="MSFT", seed=1, indicator_cache=cache)
+    assert first.data_version == second.data_version
+
+    sma = first.calculate_sma(window=20)
+    other = second.calculate_sma(window=20)
+    assert other is not sma
+    pd.testing.assert_series_equal(other, second.data['Close'].rolling(20).mean(), check_names=False)
+
+    # Une nouvelle version des données d'un service n'invalide pas les entrées de l'autre
+    second.data_version += 1
+    second.calculate_sma(window=20)
+    assert first.calculate_sma(window=20) is sma
+    second.close()
+    assert cache.stats()['entries'] == 1
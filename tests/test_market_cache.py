@@ -0,0 +1,96 @@
+import pandas as pd
+import pytest
+from helpers import linear_bars
+from app.services.market_cache import OHLCVCache, period_covers, trim_to_period
+from app.services.trading_service import TradingService
+
+
+@pytest.fixture
+def provider(stub_provider):
+    stub_provider.bars["AAPL"] = linear_bars(300)
+    return stub_provider
+
+
+def test_cache_roundtrip(tmp_path):
+    """Test la relecture d'un historique écrit dans le cache"""
+    cache = OHLCVCache(str(tmp_path))
+    bars = linear_bars(50)
+    cache.save("AAPL", "1d", bars, "1y")
+
+    # Nouvelle instance : lecture depuis le disque et non depuis la mémoire
+    data, period = OHLCVCache(str(tmp_path)).load("AAPL", "1d")
+    assert period == "1y"
+    pd.testing.assert_frame_equal(data, bars, check_freq=False)
+
+
+def test_warm_cache_downloads_only_new_bars(tmp_path, provider):
+    """Test que seules les barres postérieures au cache sont téléchargées"""
+    cache = OHLCVCache(str(tmp_path))
+    all_bars = provider.bars["AAPL"]
+    provider.bars["AAPL"] = all_bars.iloc[:250]
+    TradingService("AAPL", cache=cache, provider=provider)
+    assert provider.calls[-1]['period'] == "1y"
+
+    provider.bars["AAPL"] = all_bars
+    service = TradingService("AAPL", cache=cache, provider=provider, max_age=0)
+    assert provider.calls[-1]['period'] is None
+    assert provider.calls[-1]['start'] == all_bars.index[248]
+    assert service.data.index[-1] == all_bars.index[-1]
+    assert not service.data.index.duplicated().any()
+
+
+def test_price_adjustment_triggers_full_reload(tmp_path, provider):
+    """Test qu'un ajustement des prix passés invalide le cache"""
+    cache = OHLCVCache(str(tmp_path))
+    TradingService("AAPL", cache=cache, provider=provider)
+
+    provider.bars["AAPL"] = provider.bars["AAPL"].assign(Close=provider.bars["AAPL"]['Close'] * 0.5)
+    service = TradingService("AAPL", cache=cache, provider=provider, max_age=0)
+    assert provider.calls[-1]['period'] == "1y"
+    assert service.data['Close'].iloc[0] == provider.bars["AAPL"].loc[service.data.index[0], 'Close']
+
+
+def test_fresh_cache_is_read_locally_and_unchanged_tail_is_not_rewritten(tmp_path, provider):
+    """Test qu'un cache récent est servi sans requête et qu'une mise à jour sans nouvelle barre ne réécrit pas le fichier"""
+    cache = OHLCVCache(str(tmp_path))
+    TradingService("AAPL", cache=cache, provider=provider)
+    calls = len(provider.calls)
+    service = TradingService("AAPL", cache=cache, provider=provider)
+    assert len(provider.calls) == calls
+    assert len(service.data) > 0
+
+    saves = []
+    cache.save = lambda *args: saves.append(args)
+    data, full_reload = service.loader.update("AAPL", "1y", "1d", service.data)
+    assert provider.calls[-1]['start'] is not None and not full_reload
+    assert saves == []
+    assert cache.age("AAPL", "1d") < 1
+    pd.testing.assert_frame_equal(data, service.data)
+
+
+def test_period_helpers():
+    """Test la couverture et le découpage des périodes"""
+    assert period_covers("1y", "6mo")
+    assert not period_covers("5d", "1y")
+    assert period_covers("2y", "ytd")
+
+    bars = linear_bars(300)
+    assert len(trim_to_period(bars, "5d")) == 5
+    assert trim_to_period(bars, "1mo").index[0] > bars.index[-1] - pd.DateOffset(months=1)
+
+
+def test_refresh_merges_new_bars(tmp_path, provider):
+    """Test que refresh() n'incrémente la version que si de nouvelles barres arrivent"""
+    all_bars = provider.bars["AAPL"]
+    provider.bars["AAPL"] = all_bars.iloc[:280]
+    service = TradingService("AAPL", cache=OHLCVCache(str(tmp_path)), provider=provider)
+    assert service.data_version == 1
+
+    assert service.refresh() is False
+    assert service.data_version == 1
+
+    provider.bars["AAPL"] = all_bars
+    assert service.refresh() is True
+    assert service.data_version == 2
+    assert service.data.index[-1] == all_bars.index[-1]
+    assert provider.calls[-1]['start'] == all_bars.index[278]
@@ -0,0 +1,49 @@
+import pandas as pd
+import pytest
+from helpers import linear_bars
+from app.services.market_cache import OHLCVCache
+from app.services.market_data_loader import MarketDataLoader
+
+
+@pytest.fixture
+def provider(stub_provider):
+    """Barres différentes par symbole, un symbole en erreur et un symbole sans données"""
+    for symbol in ("AAPL", "MSFT", "NVDA", "MC.PA"):
+        tz = "Europe/Paris" if symbol.endswith(".PA") else "America/New_York"
+        stub_provider.bars[symbol] = linear_bars(260, tz=tz, base=len(symbol) * 10)
+    stub_provider.bars["BROKEN"] = RuntimeError("symbole inconnu")
+    stub_provider.bars["EMPTY"] = pd.DataFrame()
+    return stub_provider
+
+
+def test_load_many_reports_failures_without_aborting(tmp_path, provider):
+    """Test qu'un symbole en échec n'interrompt pas le lot"""
+    loader = MarketDataLoader(OHLCVCache(str(tmp_path)), max_workers=4, provider=provider)
+    frames, errors = loader.load_many(["AAPL", "MSFT", "BROKEN", "EMPTY", "AAPL"])
+    assert list(frames) == ["AAPL", "MSFT"]
+    assert set(errors) == {"BROKEN", "EMPTY"}
+    # Les erreurs appartiennent à l'appel : un autre lot sur le même chargeur ne les voit pas
+    other, other_errors = loader.load_many(["AAPL"])
+    assert list(other) == ["AAPL"] and other_errors == {}
+    # Le doublon n'est téléchargé qu'une fois
+    assert provider.downloads.count("AAPL") == 1
+
+
+def test_load_many_skips_fresh_cache(tmp_path, provider):
+    """Test que les symboles déjà en cache ne sont pas retéléchargés"""
+    loader = MarketDataLoader(OHLCVCache(str(tmp_path)), provider=provider)
+    loader.load_many(["AAPL", "MSFT"])
+    provider.calls.clear()
+    frames, _ = loader.load_many(["AAPL", "MSFT", "NVDA"], max_age=3600)
+    assert provider.downloads == ["NVDA"]
+    assert len(frames) == 3
+
+
+def test_load_many_panel_alignment(tmp_path, provider):
+    """Test l'alignement de symboles cotés dans des fuseaux différents"""
+    loader = MarketDataLoader(OHLCVCache(str(tmp_path)), provider=provider)
+    panel, _ = loader.load_many(["AAPL", "MC.PA"], panel=True)
+    assert list(panel.columns) == ["AAPL", "MC.PA"]
+    assert panel.index.tz is None
+    # Mêmes dates de séance : aucune valeur manquante après alignement
+    assert not panel.isna().any().any()
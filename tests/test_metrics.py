@@ -0,0 +1,94 @@
+import numpy as np
+import pytest
+from app.services import metrics
+from app.services.metrics import Histogram, MetricsRegistry, instrument
+from app.services.render_scheduler import RenderScheduler
+
+
+def test_histogram_quantiles_stay_within_one_bucket():
+    durations = np.random.default_rng(0).lognormal(np.log(0.01), 1.0, 10_000)
+    histogram = Histogram()
+    for d in durations:
+        histogram.observe(d)
+
+    assert histogram.count == len(durations)
+    assert histogram.max == durations.max()
+    for q in (0.5, 0.95, 0.99):
+        assert histogram.quantile(q) == pytest.approx(np.quantile(durations, q), rel=0.12)
+    assert Histogram().quantile(0.5) is None
+
+
+def test_spans_and_prometheus_export(tmp_path):
+    registry = MetricsRegistry()
+    with registry.span("refresh.fetch"):
+        pass
+    registry.observe("refresh.fetch", 0.5)
+    registry.observe('render."graphique"', 0.002)
+
+    summary = registry.summary()
+    assert summary["refresh.fetch"]["count"] == 2
+    assert summary["refresh.fetch"]["max"] == 0.5
+
+    path = tmp_path / "metrics.prom"
+    registry.write_prometheus(str(path))
+    text = path.read_text()
+    assert "# TYPE tradesim_span_seconds summary" in text
+    assert 'tradesim_span_seconds{span="refresh.fetch",quantile="0.99"} 0.5' in text
+    assert 'tradesim_span_seconds_count{span="refresh.fetch"} 2' in text
+    assert 'span="render.\\"graphique\\""' in text
+
+
+def test_disabled_registry_records_nothing():
+    registry = MetricsRegistry(enabled=False)
+    with registry.span("fetch"):
+        pass
+
+    @registry.timed("compute")
+    def compute():
+        return 42
+
+    assert compute() == 42
+    assert registry.summary() == {}
+
+
+def test_instrument_times_public_methods():
+    registry = MetricsRegistry()
+
+    @instrument('service', registry)
+    class Service:
+        def public(self):
+            return self._private()
+
+        def _private(self):
+            return 1
+
+        @property
+        def value(self):
+            return 2
+
+    service = Service()
+    assert service.public() == 1 and service.value == 2
+    assert list(registry.summary()) == ['service.public']
+
+
+def test_trading_service_methods_feed_the_default_registry(offline_service, monkeypatch):
+    registry = MetricsRegistry()
+    monkeypatch.setattr(metrics, "default_registry", registry)
+    service = offline_service()
+
+    service.calculate_sma(20)
+    service.backtest_strategy(service.sma_crossover_strategy)
+
+    summary = registry.summary()
+    assert summary['trading_service.calculate_sma']['count'] >= 2
+    assert 'trading_service.backtest_strategy' in summary
+
+
+def test_scheduler_times_each_render():
+    registry = MetricsRegistry()
+    scheduler = RenderScheduler(clock=lambda: 0.0, metrics=registry)
+    scheduler.add("graphique", lambda: None)
+
+    scheduler.run_due()
+
+    assert registry.summary()["render.graphique"]["count"] == 1
@@ -0,0 +1,156 @@
+import time
+import pandas as pd
+import pytest
+from app.services.order_book import OrderBook
+
+T0 = pd.Timestamp("2024-01-02 10:00")
+
+
+def test_limit_orders_fill_when_crossed():
+    """Test l'exécution des ordres limites franchis par la barre"""
+    book = OrderBook()
+    buy = book.submit("AAPL", "BUY", 10, "limit", limit_price=95, timestamp=T0)
+    book.submit("AAPL", "BUY", 5, "limit", limit_price=90, timestamp=T0)
+    sell = book.submit("AAPL", "SELL", 3, "limit", limit_price=104, timestamp=T0)
+
+    fills = book.process_bar("AAPL", T0, 100, 105, 94, 101)
+    assert {f['order_id'] for f in fills} == {buy.order_id, sell.order_id}
+    assert [f['price'] for f in fills if f['type'] == 'BUY'] == [95]
+    assert [f['price'] for f in fills if f['type'] == 'SELL'] == [104]
+    assert book.active_count == 1
+
+
+def test_gap_fills_at_open():
+    """Test qu'une ouverture en gap exécute au prix d'ouverture"""
+    book = OrderBook()
+    book.submit("AAPL", "BUY", 1, "limit", limit_price=95, timestamp=T0)
+    book.submit("AAPL", "SELL", 1, "stop", stop_price=92, timestamp=T0)
+    fills = book.process_bar("AAPL", T0, 90, 91, 88, 89)
+    prices = {f['type']: f['price'] for f in fills}
+    assert prices == {'BUY': 90, 'SELL': 90}
+
+
+def test_stop_limit_becomes_resting_limit():
+    """Test qu'un stop-limite déclenché sans atteindre sa limite reste en attente"""
+    book = OrderBook()
+    order = book.submit("AAPL", "BUY", 1, "stop_limit", stop_price=105, limit_price=104, timestamp=T0)
+    assert book.process_bar("AAPL", T0, 103, 106, 104.5, 106) == []
+    assert order.triggered and order.status == 'open'
+
+    fills = book.process_bar("AAPL", T0 + pd.Timedelta(minutes=1), 105, 105, 103, 103.5)
+    assert fills[0]['price'] == 104
+
+
+def test_cancel_and_expiry():
+    """Test l'annulation et l'expiration des ordres"""
+    book = OrderBook()
+    cancelled = book.submit("AAPL", "BUY", 1, "limit", limit_price=99, timestamp=T0)
+    day = book.submit("AAPL", "BUY", 1, "limit", limit_price=98, time_in_force="DAY", timestamp=T0)
+    assert book.cancel(cancelled.order_id)
+    assert not book.cancel(cancelled.order_id)
+
+    assert book.process_bar("AAPL", T0 + pd.Timedelta(days=1), 100, 100, 90, 95) == []
+    assert day.status == 'expired'
+    assert book.active_count == 0
+
+
+def test_invalid_orders_are_rejected():
+    """Test la validation des ordres"""
+    book = OrderBook()
+    with pytest.raises(ValueError):
+        book.submit("AAPL", "BUY", 1, "limit")
+    with pytest.raises(ValueError):
+        book.submit("AAPL", "HOLD", 1)
+
+
+def test_many_resting_orders_only_crossed_ones_are_visited():
+    """Test qu'une barre ne parcourt que les ordres franchis parmi des dizaines de milliers"""
+    book = OrderBook()
+    for i in range(50_000):
+        book.submit(f"S{i % 50}", "BUY", 1, "limit", limit_price=50 + (i % 400) * 0.1, timestamp=T0)
+
+    start = time.perf_counter()
+    for _ in range(1000):
+        book.process_bar("S1", T0, 100, 101, 99, 100)
+    assert time.perf_counter() - start < 1
+    assert book.active_count == 50_000
+
+
+def test_timestamp_is_required_and_expiries_follow_its_timezone():
+    """Test qu'un ordre est horodaté sur l'horloge des barres, fuseau compris"""
+    book = OrderBook()
+    with pytest.raises(ValueError):
+        book.submit("AAPL", "BUY", 1, "limit", limit_price=99)
+
+    t0 = T0.tz_localize("America/New_York")
+    day = book.submit("AAPL", "BUY", 1, "limit", limit_price=98, time_in_force="DAY", timestamp=t0)
+    gtd = book.submit("AAPL", "BUY", 1, "limit", limit_price=97, time_in_force="GTD", timestamp=t0,
+                      expires_at="2024-01-05")
+    assert gtd.expires_at.tz is not None
+    assert book.process_bar("AAPL", t0 + pd.Timedelta(days=1), 100, 100, 99, 100) == []
+    assert day.status == 'expired' and gtd.status == 'open'
+
+
+def test_rejected_execution_is_not_booked_and_terminal_orders_are_dropped():
+    """Test qu'une exécution refusée par le portefeuille rejette l'ordre au lieu de le perdre"""
+    book = OrderBook()
+    refused = book.submit("AAPL", "BUY", 10, "limit", limit_price=95, timestamp=T0)
+    accepted = book.submit("AAPL", "SELL", 3, "limit", limit_price=104, timestamp=T0)
+    book.submit("AAPL", "BUY", 1, "limit", limit_price=80, timestamp=T0)
+
+    fills = book.process_bar("AAPL", T0, 100, 105, 94, 101, execute=lambda fill: fill['type'] == 'SELL')
+    assert [f['order_id'] for f in fills] == [accepted.order_id]
+    assert refused.status == 'rejected' and accepted.status == 'filled'
+    # Seuls les ordres actifs restent dans le carnet
+    assert [order.limit_price for order in book.open_orders()] == [80]
+    assert not book.cancel(refused.order_id)
+
+
+def test_completed_bars_catch_intrabar_crosses_after_submission():
+    """Test l'exécution sur les plus haut et plus bas des barres terminées, pas avant l'ordre"""
+    index = pd.date_range(T0, periods=4, freq="5min")
+    bars = pd.DataFrame({'Open': [100, 100, 100, 100], 'High': [101, 101, 101, 101],
+                         'Low': [90, 99, 94, 99], 'Close': [100, 100, 100, 100]}, index=index)
+    book = OrderBook()
+    order = book.submit("AAPL", "BUY", 1, "limit", limit_price=95, timestamp=index[0] + pd.Timedelta(minutes=2))
+
+    # La clôture de chaque barre reste au-dessus de la limite : seul le plus bas la franchit
+    assert book.process_price("AAPL", index[-1], 100) == []
+    fills = book.process_bars("AAPL", bars)
+    assert [(f['timestamp'], f['price']) for f in fills] == [(index[2], 95)]
+    assert order.status == 'filled'
+    # Les barres déjà traitées ne sont pas rejouées
+    assert book.process_bars("AAPL", bars) == []
+
+
+def test_cancelled_orders_far_from_market_are_compacted():
+    """Test que les annulations loin du marché ne s'accumulent pas dans les tas"""
+    book = OrderBook()
+    orders = [book.submit("AAPL", "BUY", 1, "limit", limit_price=10 + i * 0.01, timestamp=T0) for i in range(10_000)]
+    for order in orders[:9_000]:
+        book.cancel(order.order_id)
+    assert len(book._heaps[("AAPL", "BUY", "limit")]) < 2 * 1_000 + OrderBook.COMPACT_MIN_SIZE
+    assert book.active_count == 1_000 and len(book.open_orders("AAPL")) == 1_000
+
+    # Les ordres restants sont toujours exécutés dans l'ordre de priorité
+    fills = book.process_bar("AAPL", T0, 200, 200, 0, 50)
+    assert len(fills) == 1_000 and fills[0]['price'] == orders[-1].limit_price
+
+
+def test_completed_bars_do_not_scan_other_symbols():
+    """Test que le traitement des barres d'un symbole ne parcourt pas les ordres des autres symboles"""
+    class Unscannable(dict):
+        def values(self):
+            raise AssertionError("parcours de tous les ordres actifs")
+
+    book = OrderBook()
+    for i in range(1_000):
+        book.submit(f"S{i % 50}", "BUY", 1, "limit", limit_price=50, timestamp=T0)
+    order = book.submit("AAPL", "BUY", 1, "limit", limit_price=50, timestamp=T0 + pd.Timedelta(minutes=1))
+    book._orders = Unscannable(book._orders)
+
+    index = pd.date_range(T0, periods=4, freq="min")
+    bars = pd.DataFrame({'Open': 100.0, 'High': 101.0, 'Low': [99.0, 99.0, 49.0, 99.0], 'Close': 100.0}, index=index)
+    fills = book.process_bars("AAPL", bars)
+    assert [f['timestamp'] for f in fills] == [index[2]] and order.status == 'filled'
+    assert book.open_orders("AAPL") == [] and len(book.open_orders("S1")) == 20
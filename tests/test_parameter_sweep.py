@@ -0,0 +1,68 @@
+import numpy as np
+import pytest
+from helpers import random_walk_bars
+from app.services import parameter_sweep
+from app.services.parameter_sweep import rolling_means, sweep_sma_crossover
+
+
+def test_rolling_means_match_pandas():
+    """Test les moyennes mobiles issues de la somme cumulée"""
+    close = random_walk_bars(200)['Close']
+    means = rolling_means(close.to_numpy(), [5, 20, 300])
+    np.testing.assert_allclose(means[:, 1], close.rolling(20).mean().to_numpy(), rtol=1e-10)
+    assert np.isnan(means[:, 2]).all()
+
+
+def test_sma_sweep_matches_backtest_strategy(offline_service):
+    """Test que chaque ligne du balayage reproduit backtest_strategy"""
+    service = offline_service(periods=400)
+    table = service.sweep_sma_crossover([5, 10, 20], [30, 50])
+    assert len(table) == 6
+
+    for row in table.itertuples():
+        result = service.backtest_strategy(
+            lambda: service.sma_crossover_strategy(row.short_window, row.long_window))
+        assert row.final_capital == pytest.approx(result['final_capital'], rel=1e-9)
+        assert row.total_return == pytest.approx(result['total_return'], rel=1e-9, abs=1e-12)
+        assert row.sharpe_ratio == pytest.approx(result['sharpe_ratio'], rel=1e-6, abs=1e-9)
+        assert row.max_drawdown == pytest.approx(result['max_drawdown'], rel=1e-9, abs=1e-12)
+
+
+def test_rsi_sweep_matches_backtest_strategy(offline_service):
+    """Test que le balayage RSI reproduit backtest_strategy"""
+    service = offline_service(periods=400)
+    table = service.sweep_rsi([7, 14], [65, 70], [30, 35])
+    assert len(table) == 8
+
+    for row in table.itertuples():
+        result = service.backtest_strategy(
+            lambda: service.rsi_strategy(row.window, row.overbought, row.oversold))
+        assert row.final_capital == pytest.approx(result['final_capital'], rel=1e-9)
+        assert row.sharpe_ratio == pytest.approx(result['sharpe_ratio'], rel=1e-6, abs=1e-9)
+        assert row.max_drawdown == pytest.approx(result['max_drawdown'], rel=1e-9, abs=1e-12)
+
+
+def test_large_grid_runs_in_one_pass(monkeypatch):
+    """Test qu'une grille 100×100 sur 10 ans de barres journalières est évaluée en un passage vectorisé"""
+    calls = {'means': 0, 'blocks': []}
+    rolling_means, evaluate_signals = parameter_sweep.rolling_means, parameter_sweep.evaluate_signals
+
+    def counting_means(*args):
+        calls['means'] += 1
+        return rolling_means(*args)
+
+    def counting_evaluate(close, signals, *args):
+        calls['blocks'].append(signals.shape)
+        return evaluate_signals(close, signals, *args)
+
+    monkeypatch.setattr(parameter_sweep, 'rolling_means', counting_means)
+    monkeypatch.setattr(parameter_sweep, 'evaluate_signals', counting_evaluate)
+    close = random_walk_bars(2520)['Close'].to_numpy()
+    table = sweep_sma_crossover(close, range(2, 102), range(20, 220, 2))
+    assert len(table) == 10_000
+    # Moyennes calculées une fois, puis des blocs de combinaisons (et non une boucle par combinaison)
+    chunk = parameter_sweep.CHUNK_CELLS // len(close)
+    assert calls['means'] == 1
+    assert len(calls['blocks']) == -(-10_000 // chunk)
+    assert all(shape[0] == len(close) for shape in calls['blocks'])
+    assert sum(shape[1] for shape in calls['blocks']) == 10_000
@@ -0,0 +1,89 @@
+import numpy as np
+import pandas as pd
+import pytest
+from app.services.portfolio import Portfolio, TRANSACTION_DTYPE
+
+T0 = pd.Timestamp("2024-01-02 10:00")
+
+
+def test_buy_and_sell_update_cash_and_positions():
+    """Test de la mise à jour des liquidités et des positions"""
+    portfolio = Portfolio(10000.0)
+    portfolio.buy("AAPL", 100.0, 10, timestamp=T0)
+    portfolio.buy("AAPL", 120.0, 10, timestamp=T0)
+    assert portfolio.cash == pytest.approx(7800.0)
+    assert portfolio.holdings["AAPL"].quantity == 20
+    assert portfolio.holdings["AAPL"].avg_price == pytest.approx(110.0)
+
+    portfolio.sell("AAPL", 130.0, 20, timestamp=T0)
+    assert "AAPL" not in portfolio.holdings
+    assert portfolio.cash == pytest.approx(10400.0)
+    assert portfolio.version == 3
+
+    with pytest.raises(ValueError):
+        portfolio.sell("AAPL", 130.0, 1)
+    with pytest.raises(ValueError):
+        portfolio.buy("AAPL", 100.0, 1000)
+    assert portfolio.version == 3
+
+
+def test_ledger_grows_and_exposes_views():
+    """Test de la croissance du journal et des vues sans copie"""
+    portfolio = Portfolio(1e9)
+    portfolio.ledger = type(portfolio.ledger)(capacity=4)
+    for i in range(100):
+        portfolio.buy("AAPL" if i % 2 else "MSFT", 10.0 + i, 1, timestamp=T0 + pd.Timedelta(minutes=i))
+
+    frame = portfolio.ledger.transactions_frame()
+    assert len(frame) == 100
+    assert list(frame['symbol'][:2]) == ["MSFT", "AAPL"]
+    assert (frame['type'] == "BUY").all()
+    assert frame['price'].iloc[-1] == pytest.approx(109.0)
+    assert np.shares_memory(frame['price'].to_numpy(), portfolio.ledger.transactions.view())
+
+    last = portfolio.ledger.transactions_frame(last=10)
+    assert len(last) == 10 and last['timestamp'].iloc[-1] == T0 + pd.Timedelta(minutes=99)
+    assert len(portfolio.ledger.history_frame()) == 100
+
+
+def test_transaction_row_size():
+    """Test de l'empreinte mémoire d'une transaction"""
+    assert TRANSACTION_DTYPE.itemsize <= 48
+
+
+def test_symbol_index():
+    """Test de l'index des transactions par symbole"""
+    portfolio = Portfolio(1e9)
+    for i in range(3000):
+        portfolio.buy("AAPL" if i % 3 else "MSFT", 10.0 + i, 1, timestamp=T0 + pd.Timedelta(minutes=i))
+
+    msft = portfolio.ledger.symbol_transactions("MSFT")
+    assert len(msft) == 1000
+    assert msft['price'][1] == pytest.approx(13.0)
+    recent = portfolio.ledger.symbol_transactions("AAPL", start=T0 + pd.Timedelta(minutes=2990))
+    assert len(recent) == 7
+    assert len(portfolio.ledger.symbol_transactions("TSLA")) == 0
+
+    ledger = type(portfolio.ledger)()
+    ledger.symbol_code("MSFT")
+    ledger.symbol_code("AAPL")
+    ledger.extend_transactions(portfolio.ledger.transactions.view())
+    assert len(ledger.symbol_transactions("MSFT")) == 1000
+
+
+def test_timestamps_from_different_exchanges_share_one_clock():
+    """Test que les opérations de New York et de Paris sont ordonnées en UTC"""
+    portfolio = Portfolio(1e6)
+    paris = pd.Timestamp("2024-03-04 16:00", tz="Europe/Paris")           # 15:00 UTC
+    new_york = pd.Timestamp("2024-03-04 10:30", tz="America/New_York")    # 15:30 UTC
+    portfolio.buy("AAPL", 100.0, 1, timestamp=new_york)
+    portfolio.buy("MC.PA", 800.0, 1, timestamp=paris)
+
+    frame = portfolio.ledger.transactions_frame()
+    assert list(frame['timestamp']) == [pd.Timestamp("2024-03-04 15:30"), pd.Timestamp("2024-03-04 15:00")]
+    assert list(frame.sort_values('timestamp')['symbol']) == ["MC.PA", "AAPL"]
+
+    # Filtre exprimé dans un autre fuseau : 15:15 UTC
+    start = pd.Timestamp("2024-03-04 10:15", tz="America/New_York")
+    assert len(portfolio.ledger.symbol_transactions("AAPL", start=start)) == 1
+    assert len(portfolio.ledger.symbol_transactions("MC.PA", start=start)) == 0
@@ -0,0 +1,105 @@
+import time
+import numpy as np
+import pandas as pd
+import pytest
+from app.services.data_providers import SyntheticProvider
+from app.services.portfolio_backtest import backtest_portfolio, periodic_schedule, signals_to_weights
+
+
+def _prices(n_bars=300, n_assets=4, seed=3):
+    close = SyntheticProvider(seed=seed).panel([f"S{i}" for i in range(n_assets)], n_bars)
+    return pd.DataFrame(close, index=pd.bdate_range("2020-01-01", periods=n_bars),
+                        columns=[f"S{i}" for i in range(n_assets)])
+
+
+def _reference(close, targets, flags, fee_rate, capital):
+    """Simulation barre par barre (nombre de titres et liquidités) servant de référence"""
+    shares = np.zeros(close.shape[1])
+    cash = capital
+    equity = []
+    for t in range(len(close)):
+        value = cash + shares @ close[t]
+        if flags[t]:
+            weights = shares * close[t] / value
+            value -= fee_rate * np.abs(targets[t] - weights).sum() * value
+            shares = targets[t] * value / close[t]
+            cash = value - shares @ close[t]
+        equity.append(cash + shares @ close[t])
+    return np.array(equity)
+
+
+def test_periodic_rebalancing_matches_bar_by_bar_simulation():
+    """Test le rééquilibrage mensuel avec frais contre une simulation barre par barre"""
+    prices = _prices()
+    rng = np.random.default_rng(0)
+    targets = rng.dirichlet(np.ones(5), size=len(prices))[:, :4]     # Une part en liquidités
+    result = backtest_portfolio(prices, weights=targets, rebalance='M', fee_rate=0.002)
+
+    flags = periodic_schedule(prices.index, 'M')
+    assert list(result['rebalances']) == list(prices.index[flags])
+    assert result['rebalances'][1] == pd.Timestamp("2020-02-03")
+    expected = _reference(prices.to_numpy(), targets, flags, 0.002, 10000.0)
+    np.testing.assert_allclose(result['equity'].to_numpy(), expected, rtol=1e-10)
+    assert result['fees'].sum() > 0
+    assert result['final_capital'] == pytest.approx(expected[-1])
+    # Poids dérivés : somme inférieure à 1 (liquidités), égaux à la cible aux rééquilibrages
+    np.testing.assert_allclose(result['weights'].to_numpy()[flags], targets[flags], rtol=1e-10)
+
+
+def test_threshold_rebalancing_triggers_on_drift():
+    """Test que le seuil déclenche un rééquilibrage dès que la dérive le franchit"""
+    prices = _prices(n_bars=500)
+    targets = np.full(prices.shape, 0.25)
+    result = backtest_portfolio(prices, weights=targets, rebalance=None, threshold=0.02, fee_rate=0.001)
+
+    flags = prices.index.isin(result['rebalances'])
+    assert 1 < flags.sum() < len(prices)
+    expected = _reference(prices.to_numpy(), targets, flags, 0.001, 10000.0)
+    np.testing.assert_allclose(result['equity'].to_numpy(), expected, rtol=1e-10)
+
+    # La veille de chaque rééquilibrage, aucun poids ne s'écartait de plus du seuil
+    deviation = np.abs(result['weights'].to_numpy() - 0.25).max(axis=1)
+    assert (deviation[np.flatnonzero(flags)[1:] - 1] <= 0.02).all()
+    assert (deviation <= 0.02 + 1e-12).all()
+
+
+def test_signals_are_equal_weighted_and_missing_prices_excluded():
+    """Test la conversion des signaux en poids et les actifs pas encore cotés"""
+    weights = signals_to_weights(np.array([[1, 1, 0, -1], [0, 0, 0, 0], [1, -1, -1, 1]]), long_only=False)
+    np.testing.assert_allclose(weights, [[1 / 3, 1 / 3, 0, -1 / 3], [0, 0, 0, 0], [0.25, -0.25, -0.25, 0.25]])
+
+    prices = _prices(n_bars=60)
+    prices.iloc[:30, 0] = np.nan
+    result = backtest_portfolio(prices, signals=np.ones(prices.shape), rebalance=None, fee_rate=0.0)
+    held = result['weights']
+    np.testing.assert_allclose(held.iloc[0].to_numpy(), [0, 1 / 3, 1 / 3, 1 / 3])
+    np.testing.assert_allclose(held.iloc[30].to_numpy(), [0.25] * 4)
+    assert list(result['rebalances']) == [prices.index[0], prices.index[30]]
+    assert not result['equity'].isna().any()
+
+
+def test_buy_and_hold_without_fees():
+    """Test qu'un seul rééquilibrage donne la valeur d'un portefeuille conservé"""
+    prices = _prices(n_bars=100)
+    result = backtest_portfolio(prices.to_numpy(), weights=np.full(prices.shape, 0.25),
+                                rebalance=10 ** 6, fee_rate=0.0, initial_capital=1000.0)
+    shares = 250.0 / prices.iloc[0].to_numpy()
+    np.testing.assert_allclose(result['equity'].to_numpy(), prices.to_numpy() @ shares)
+    assert result['turnover'].iloc[0] == pytest.approx(1.0)
+    assert result['turnover'].iloc[1:].eq(0).all()
+
+
+def test_portfolio_backtest_scales_to_500_assets_over_20_years():
+    """Test 500 actifs × 20 ans de barres journalières en quelques secondes"""
+    n_bars, n_assets = 20 * 252, 500
+    close = SyntheticProvider(seed=1).panel([f"S{i}" for i in range(n_assets)], n_bars)
+    prices = pd.DataFrame(close, index=pd.bdate_range("2004-01-01", periods=n_bars))
+    targets = np.full(close.shape, 1 / n_assets)
+
+    start = time.perf_counter()
+    monthly = backtest_portfolio(prices, weights=targets, rebalance='M')
+    banded = backtest_portfolio(prices, weights=targets, rebalance='Q', threshold=0.003)
+    assert time.perf_counter() - start < 5
+    assert len(monthly['rebalances']) == prices.index.to_period('M').nunique()
+    assert len(banded['rebalances']) > prices.index.to_period('Q').nunique()
+    assert np.isfinite(monthly['equity']).all() and np.isfinite(banded['equity']).all()
@@ -0,0 +1,105 @@
+import sqlite3
+import threading
+import pandas as pd
+import pytest
+from app.services.portfolio_store import PortfolioStore, sqlite_path
+
+T0 = pd.Timestamp("2024-01-02 10:00")
+
+
+@pytest.fixture
+def database_url(tmp_path):
+    return f"sqlite:///{tmp_path / 'trading.db'}"
+
+
+def test_sqlite_path():
+    """Test de l'analyse de l'URL de la base"""
+    assert sqlite_path("sqlite:///./trading.db") == "./trading.db"
+    with pytest.raises(ValueError):
+        sqlite_path("postgresql://localhost/trading")
+
+
+def test_portfolio_is_restored_from_database(database_url):
+    """Test du rechargement du portefeuille après redémarrage"""
+    store = PortfolioStore(database_url)
+    portfolio = store.load_portfolio(10000.0)
+    portfolio.buy("AAPL", 100.0, 10, timestamp=T0)
+    portfolio.buy("MSFT", 50.0, 4, timestamp=T0 + pd.Timedelta(days=1))
+    portfolio.sell("AAPL", 110.0, 10, timestamp=T0 + pd.Timedelta(days=2))
+    store.close()
+
+    store = PortfolioStore(database_url)
+    restored = store.load_portfolio(10000.0)
+    assert restored.cash == pytest.approx(portfolio.cash)
+    assert set(restored.holdings) == {"MSFT"}
+    assert restored.holdings["MSFT"].quantity == 4
+    frame = restored.ledger.transactions_frame()
+    assert list(frame['symbol']) == ["AAPL", "MSFT", "AAPL"]
+    assert list(frame['type']) == ["BUY", "BUY", "SELL"]
+    assert frame['timestamp'].iloc[0] == T0
+    assert len(restored.ledger.history_frame()) == 3
+
+    # Les nouvelles opérations sont ajoutées au journal rechargé
+    restored.buy("MSFT", 60.0, 1, timestamp=T0 + pd.Timedelta(days=3))
+    store.flush()
+    assert len(store.transactions(symbol="MSFT")) == 2
+    store.close()
+
+
+def test_range_queries_use_index(database_url):
+    """Test des requêtes par plage de dates"""
+    store = PortfolioStore(database_url, batch_size=16)
+    portfolio = store.load_portfolio(1e9)
+    for i in range(100):
+        portfolio.buy("AAPL" if i % 2 else "MSFT", 10.0, 1, timestamp=T0 + pd.Timedelta(days=i))
+    store.flush()
+
+    frame = store.transactions(symbol="AAPL", start=T0 + pd.Timedelta(days=10), end=T0 + pd.Timedelta(days=19))
+    assert len(frame) == 5
+    assert (frame['symbol'] == "AAPL").all()
+    assert len(store.history(start=T0 + pd.Timedelta(days=90))) == 10
+
+    restored = store.load_portfolio(start=T0 + pd.Timedelta(days=50))
+    assert len(restored.ledger.transactions) == 50
+    assert restored.holdings["AAPL"].quantity == 50
+    store.close()
+
+    conn = sqlite3.connect(sqlite_path(database_url))
+    assert conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+    plan = conn.execute(
+        "EXPLAIN QUERY PLAN SELECT * FROM transactions WHERE symbol = ? AND timestamp >= ?", ("AAPL", 0)
+    ).fetchall()
+    assert "idx_transactions_symbol_timestamp" in " ".join(str(row) for row in plan)
+    conn.close()
+
+
+def test_shared_portfolio_keeps_concurrent_sessions_consistent(database_url):
+    """Test d'un portefeuille partagé par plusieurs sessions qui opèrent en parallèle"""
+    store = PortfolioStore(database_url)
+    portfolio = store.load_portfolio(10000.0)
+
+    def session(symbol):
+        for i in range(100):
+            try:
+                portfolio.buy(symbol, 10.0, 2, timestamp=T0 + pd.Timedelta(seconds=i))
+                portfolio.sell(symbol, 11.0, 1, timestamp=T0 + pd.Timedelta(seconds=i))
+            except ValueError:
+                pass
+
+    threads = [threading.Thread(target=session, args=(symbol,)) for symbol in ("AAPL", "MSFT", "AAPL", "TSLA")]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    store.close()
+
+    # Liquidités et positions enregistrées égales à celles déduites du journal complet
+    store = PortfolioStore(database_url)
+    restored = store.load_portfolio(10000.0)
+    store.close()
+    transactions = restored.ledger.transactions_frame()
+    signed = transactions['total'].where(transactions['type'] == "SELL", -transactions['total'])
+    assert restored.cash == pytest.approx(10000.0 + signed.sum())
+    assert restored.cash == pytest.approx(portfolio.cash)
+    for symbol, position in portfolio.holdings.items():
+        assert restored.holdings[symbol].quantity == position.quantity
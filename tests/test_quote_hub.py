@@ -0,0 +1,111 @@
+import threading
+import time
+import pandas as pd
+from helpers import random_walk_bars
+from app.services.indicator_cache import IndicatorCache
+from app.services.quote_hub import QuoteHub
+from app.services.trading_service import TradingService
+
+
+class CountingLoader:
+    """Source de données factice : chaque appel à update ajoute une barre"""
+
+    def __init__(self, bars):
+        self.bars = bars
+        self.loads = 0
+        self.updates = 0
+        self.lock = threading.Lock()
+
+    def load(self, symbol, period, interval):
+        with self.lock:
+            self.loads += 1
+        time.sleep(0.05)
+        return self.bars.iloc[:-50]
+
+    def update(self, symbol, period, interval, current):
+        with self.lock:
+            self.updates += 1
+        return self.bars.iloc[:len(current) + 1], False
+
+
+def wait_for(condition, timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if condition():
+            return True
+        time.sleep(0.01)
+    return False
+
+
+def test_sessions_share_one_feed():
+    """Test du partage d'un flux entre sessions"""
+    loader = CountingLoader(random_walk_bars(300))
+    hub = QuoteHub(loader=loader, refresh_interval=0.05)
+    subscriptions = []
+    threads = [threading.Thread(target=lambda: subscriptions.append(hub.subscribe("AAPL", "1y")))
+               for _ in range(20)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert loader.loads == 1
+    assert hub.feeds() == {("AAPL", "1y", "1d"): (1, 20)}
+    assert wait_for(lambda: subscriptions[0].snapshot()[1] >= 3)
+    # Une requête par intervalle pour le symbole, quel que soit le nombre de sessions
+    assert loader.updates < 2 / 0.05
+
+    for subscription in subscriptions:
+        subscription.close()
+    assert hub.feeds() == {}
+    updates = loader.updates
+    time.sleep(0.15)
+    assert loader.updates <= updates + 1
+
+
+def test_idle_subscriptions_are_dropped():
+    """Test de l'arrêt d'un flux dont les abonnés ne lisent plus"""
+    loader = CountingLoader(random_walk_bars(300))
+    hub = QuoteHub(loader=loader, refresh_interval=0.02, idle_timeout=0.1)
+    hub.subscribe("AAPL", "1y")
+    assert wait_for(lambda: hub.feeds() == {})
+
+
+def test_trading_service_reads_from_hub():
+    """Test du service de trading abonné au cache partagé"""
+    bars = random_walk_bars(300)
+    loader = CountingLoader(bars)
+    hub = QuoteHub(loader=loader, refresh_interval=0.02)
+    service = TradingService("AAPL", "1y", hub=hub, indicator_cache=IndicatorCache())
+    other = TradingService("AAPL", "1y", hub=hub, indicator_cache=IndicatorCache())
+    assert len(service.data) == 250 and service.data_version == 1
+    assert loader.loads == 1
+
+    assert wait_for(lambda: service.refresh())
+    assert len(service.data) > 250 and service.data_version == 2
+    assert other.refresh()
+    pd.testing.assert_frame_equal(service.data.iloc[:250], bars.iloc[:250])
+
+    service.close()
+    other.close()
+    assert hub.feeds() == {}
+
+
+def test_trading_service_resubscribes_after_idle_timeout():
+    """Test qu'une session restée inactive retrouve un flux vivant au rafraîchissement suivant"""
+    bars = random_walk_bars(300)
+    loader = CountingLoader(bars)
+    hub = QuoteHub(loader=loader, refresh_interval=0.02, idle_timeout=0.1)
+    service = TradingService("AAPL", "1y", hub=hub, indicator_cache=IndicatorCache())
+    assert wait_for(lambda: hub.feeds() == {})
+    assert service._subscription.closed
+
+    length = len(service.data)
+    assert service.refresh()
+    assert not service._subscription.closed
+    assert hub.feeds() != {}
+    assert wait_for(lambda: service.refresh() and len(service.data) > length)
+
+    service.close()
+    service.refresh()
+    assert service._subscription.closed
@@ -0,0 +1,62 @@
+from app.services.render_scheduler import RenderScheduler
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.now += seconds
+
+
+def test_panels_render_only_when_inputs_change():
+    """Test du rendu conditionné par la version des données"""
+    clock = FakeClock()
+    scheduler = RenderScheduler(clock=clock, sleep=clock.sleep)
+    state = {'data': 0, 'trades': 0}
+    rendered = []
+    scheduler.add("refresh", lambda: rendered.append("refresh"), cadence=10)
+    scheduler.add("chart", lambda: rendered.append("chart"), lambda: state['data'], cadence=10)
+    scheduler.add("transactions", lambda: rendered.append("transactions"), lambda: state['trades'], cadence=1)
+
+    assert scheduler.run_due() == ["refresh", "chart", "transactions"]
+    clock.now = 1
+    assert scheduler.run_due() == []
+    state['trades'] += 1
+    clock.now = 2
+    assert scheduler.run_due() == ["transactions"]
+    state['data'] += 1
+    clock.now = 5
+    assert scheduler.run_due() == []
+    clock.now = 10
+    assert scheduler.run_due() == ["refresh", "chart"]
+    assert scheduler.stats() == {"refresh": 2, "chart": 2, "transactions": 2}
+
+
+def test_loop_sleeps_until_next_due_panel():
+    """Test de l'attente jusqu'à la prochaine échéance"""
+    clock = FakeClock()
+    sleeps = []
+
+    def sleep(seconds):
+        sleeps.append(seconds)
+        clock.sleep(seconds)
+        if len(sleeps) == 3:
+            raise KeyboardInterrupt
+
+    scheduler = RenderScheduler(clock=clock, sleep=sleep)
+    scheduler.add("fast", lambda: None, cadence=2)
+    scheduler.add("slow", lambda: None, cadence=5)
+    try:
+        scheduler.run()
+    except KeyboardInterrupt:
+        pass
+    assert sleeps == [2, 2, 1]
+
+    scheduler = RenderScheduler(clock=clock, sleep=sleep)
+    scheduler.add("once", lambda: None, cadence=2)
+    scheduler.run(forever=False)
+    assert scheduler.stats() == {"once": 1}
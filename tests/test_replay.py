@@ -0,0 +1,55 @@
+import pandas as pd
+import pytest
+from helpers import random_walk_bars
+from app.services.indicator_cache import IndicatorCache
+from app.services.replay import ReplayTradingService, VirtualClock
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_virtual_clock_speed():
+    """Test de l'horloge virtuelle accélérée"""
+    clock = FakeClock()
+    virtual = VirtualClock("2024-01-02 09:30", speed=60, clock=clock)
+    clock.now = 10
+    assert virtual.now() == pd.Timestamp("2024-01-02 09:40")
+    virtual.set_speed(1000)
+    clock.now = 11
+    assert virtual.now() == pd.Timestamp("2024-01-02 09:56:40")
+    with pytest.raises(ValueError):
+        virtual.set_speed(0)
+
+
+def test_replay_publishes_bars_on_virtual_clock():
+    """Test du rejeu des barres au rythme de l'horloge virtuelle"""
+    history = random_walk_bars(300)
+    clock = FakeClock()
+    service = ReplayTradingService("AAPL", "1y", "1d", speed=86400, warmup=50, history=history,
+                                   clock=clock, indicator_cache=IndicatorCache())
+    assert len(service.data) == 50
+    assert service.now() == history.index[49]
+    # Barres journalières horodatées à minuit : la place est fermée à l'heure virtuelle
+    assert not service.market_status()[0]
+    assert not service.refresh()
+
+    # Une seconde réelle = un jour virtuel (barres de jours ouvrés)
+    clock.now = 7
+    assert service.refresh()
+    assert len(service.data) == 55 and service.data_version == 2
+    pd.testing.assert_frame_equal(service.data, history.iloc[:55])
+    assert service.calculate_sma(window=20).iloc[-1] == pytest.approx(history['Close'].iloc[35:55].mean())
+
+    # 15h00 à New York le même jour virtuel (passage à l'heure d'été entre-temps) : séance ouverte
+    clock.now = 7 + 14 / 24
+    assert service.market_status()[0]
+
+    clock.now = 10_000
+    assert service.refresh()
+    assert service.finished
+    assert service.market_status() == (False, "Rejeu terminé")
@@ -0,0 +1,98 @@
+import numpy as np
+import pandas as pd
+import pytest
+from app.services import risk
+from helpers import random_walk_bars
+
+
+@pytest.fixture
+def returns():
+    values = pd.Series(np.random.default_rng(0).normal(0.0005, 0.01, 600))
+    values.iloc[0] = np.nan
+    return values
+
+
+def test_rolling_ratios_match_pandas(returns):
+    ratios = risk.rolling_ratios(returns, windows=(20, 60))
+    excess = returns - 0.02 / 252
+
+    for window in (20, 60):
+        expected = np.sqrt(252) * excess.rolling(window).mean() / excess.rolling(window).std()
+        pd.testing.assert_series_equal(ratios['sharpe'][window].iloc[window:], expected.iloc[window:], check_names=False)
+        downside = np.sqrt((excess.clip(upper=0) ** 2).rolling(window).mean())
+        expected_sortino = np.sqrt(252) * excess.rolling(window).mean() / downside
+        np.testing.assert_allclose(ratios['sortino'][window].iloc[window:], expected_sortino.iloc[window:])
+        assert ratios['sharpe'][window].iloc[:window - 1].isna().all()
+
+
+def test_matrix_input_evaluates_each_column_independently(returns):
+    matrix = np.column_stack([returns.to_numpy(), returns.to_numpy() * 2, np.zeros(len(returns))])
+    sharpe = risk.rolling_sharpe(matrix, windows=(60,))[60]
+
+    assert sharpe.shape == matrix.shape
+    np.testing.assert_allclose(sharpe[:, 0], risk.rolling_sharpe(returns.to_numpy(), windows=(60,))[60])
+    # Sans volatilité, le ratio n'est pas défini
+    assert np.isnan(sharpe[:, 2]).all()
+
+
+def test_drawdown_series_durations_and_periods():
+    equity = pd.Series([100, 110, 99, 105, 110, 120, 108, 114], index=pd.date_range("2024-01-01", periods=8))
+    drawdowns, durations = risk.drawdown(equity)
+
+    expected = (equity - equity.cummax()) / equity.cummax()
+    pd.testing.assert_series_equal(drawdowns, expected)
+    assert durations.tolist() == [0, 0, 1, 2, 0, 0, 1, 2]
+    assert risk.max_drawdown(equity) == pytest.approx(-0.1)
+
+    periods = risk.drawdown_periods(equity)
+    assert periods['start'].tolist() == [equity.index[1], equity.index[5]]
+    assert periods['trough'].tolist() == [equity.index[2], equity.index[6]]
+    assert periods['end'].iloc[0] == equity.index[4] and pd.isna(periods['end'].iloc[1])
+    assert periods['duration'].tolist() == [3, 2]
+    assert periods['depth'].tolist() == pytest.approx([-0.1, -0.1])
+
+
+def test_value_at_risk_and_cvar():
+    values = np.arange(-50, 50) / 1000.0
+    var, cvar = risk.value_at_risk(values, level=0.95)
+
+    assert var == pytest.approx(0.046)
+    assert cvar == pytest.approx(0.048)
+    var_matrix, _ = risk.value_at_risk(np.column_stack([values, np.r_[values[:-10], [np.nan] * 10]]))
+    assert var_matrix[1] == pytest.approx(0.046)
+
+
+def test_rolling_beta_matches_pandas():
+    rng = np.random.default_rng(1)
+    benchmark = pd.Series(rng.normal(0, 0.01, 300))
+    returns = 1.5 * benchmark + rng.normal(0, 0.002, 300)
+
+    beta = risk.rolling_beta(returns, benchmark.to_numpy(), window=50)
+    expected = returns.rolling(50).cov(benchmark) / benchmark.rolling(50).var()
+
+    pd.testing.assert_series_equal(beta.iloc[49:], expected.iloc[49:])
+    assert beta.iloc[-1] == pytest.approx(1.5, abs=0.1)
+
+
+def test_risk_summary_for_many_backtests():
+    matrix = np.random.default_rng(2).normal(0.0003, 0.01, (504, 1000))
+    summary = risk.risk_summary(matrix, benchmark_returns=matrix[:, 0])
+
+    assert summary.shape == (1000, 7)
+    assert summary['beta'].iloc[0] == pytest.approx(1.0)
+    assert (summary['max_drawdown'] <= 0).all() and (summary['cvar'] >= summary['var']).all()
+
+
+def test_trading_service_risk_methods(offline_service):
+    service = offline_service()
+    offline_service.bars['^GSPC'] = random_walk_bars(300, seed=5)
+
+    rolling = service.rolling_risk(windows=(20, 60))
+    assert list(rolling.columns) == ['sharpe_20', 'sortino_20', 'sharpe_60', 'sortino_60', 'drawdown', 'drawdown_duration']
+    assert rolling['drawdown'].min() == pytest.approx(service.calculate_max_drawdown(service.data['Close']))
+
+    var, cvar = service.value_at_risk()
+    assert 0 < var <= cvar
+
+    beta = service.rolling_beta(window=60)
+    assert len(beta) == len(service.data) and beta.dropna().size > 200
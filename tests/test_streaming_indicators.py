@@ -0,0 +1,53 @@
+import numpy as np
+import pytest
+from helpers import random_walk_bars
+from app.services.streaming_indicators import (
+    StreamingBollingerBands, StreamingEMA, StreamingRSI, StreamingSMA
+)
+
+
+def stream(indicator, prices):
+    return np.array([indicator.update(p) for p in prices])
+
+
+def test_streaming_matches_batch_indicators(offline_service):
+    """Test que les indicateurs incrémentaux reproduisent les calculs de ta"""
+    service = offline_service(periods=500)
+    close = service.data['Close'].to_numpy()
+
+    np.testing.assert_allclose(stream(StreamingSMA(20), close), service.calculate_sma(20).to_numpy(), rtol=1e-9)
+    np.testing.assert_allclose(stream(StreamingEMA(20), close), service.calculate_ema(20).to_numpy(), rtol=1e-9)
+    np.testing.assert_allclose(stream(StreamingRSI(14), close), service.calculate_rsi(14).to_numpy(), rtol=1e-9)
+
+    bb = StreamingBollingerBands(20, 2)
+    values = [bb.update(p) for p in close]
+    batch = service.calculate_bollinger_bands(20, 2)
+    for band in ('upper', 'middle', 'lower'):
+        np.testing.assert_allclose([v[band] for v in values], batch[band].to_numpy(), rtol=1e-9)
+
+
+@pytest.mark.parametrize("indicator_class", [StreamingSMA, StreamingEMA, StreamingRSI])
+def test_revising_the_last_bar(indicator_class):
+    """Test le remplacement de la dernière barre, encore en cours de formation"""
+    prices = np.linspace(100, 130, 40) + np.sin(np.arange(40))
+    revised = indicator_class(10)
+    for p in prices[:-1]:
+        revised.update(p)
+    revised.update(prices[-1] + 5)
+    revised.update(prices[-1], new_bar=False)
+
+    reference = indicator_class(10)
+    assert revised.value == pytest.approx(stream(reference, prices)[-1], rel=1e-12)
+
+
+def test_latest_indicators_follow_refresh(offline_service):
+    """Test que latest_indicators suit les barres ajoutées par refresh()"""
+    service = offline_service(periods=300)
+    first = service.latest_indicators()
+    assert first['sma'] == pytest.approx(service.calculate_sma(20).iloc[-1])
+
+    offline_service.bars['AAPL'] = random_walk_bars(310)
+    assert service.refresh()
+    latest = service.latest_indicators()
+    assert latest['sma'] == pytest.approx(service.calculate_sma(20).iloc[-1])
+    assert latest['rsi'] == pytest.approx(service.calculate_rsi(14).iloc[-1])
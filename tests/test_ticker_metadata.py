@@ -0,0 +1,55 @@
+import pytest
+from app.services import ticker_metadata
+from app.services.ticker_metadata import TickerMetadataStore
+
+
+class FakeTicker:
+    calls = 0
+
+    def __init__(self, symbol):
+        self.symbol = symbol
+
+    @property
+    def info(self):
+        FakeTicker.calls += 1
+        return {'longName': f"{self.symbol} Corp.", 'currency': 'USD', 'exchange': 'NMS',
+                'exchangeTimezoneName': 'America/New_York'}
+
+
+@pytest.fixture(autouse=True)
+def fake_ticker(monkeypatch):
+    FakeTicker.calls = 0
+    monkeypatch.setattr(ticker_metadata.yf, "Ticker", FakeTicker)
+
+
+def test_metadata_is_cached_and_persisted(tmp_path):
+    """Test que les métadonnées sont mises en cache puis relues depuis le disque"""
+    path = str(tmp_path / "metadata.json")
+    store = TickerMetadataStore(path)
+    metadata = store.get("AAPL")
+    assert metadata == {'name': 'AAPL Corp.', 'currency': 'USD', 'exchange': 'NMS', 'timezone': 'America/New_York'}
+    assert store.get("AAPL") == metadata
+    assert FakeTicker.calls == 1
+
+    # Une nouvelle instance relit le fichier sans interroger Yahoo
+    assert TickerMetadataStore(path).get("AAPL") == metadata
+    assert FakeTicker.calls == 1
+
+
+def test_expired_metadata_is_refetched(tmp_path):
+    """Test l'expiration des métadonnées selon le TTL"""
+    store = TickerMetadataStore(str(tmp_path / "metadata.json"), ttl=0)
+    store.get("AAPL")
+    store.get("AAPL")
+    assert FakeTicker.calls == 2
+
+
+def test_non_blocking_get(tmp_path):
+    """Test que get(wait=False) ne bloque pas et remplit le cache en arrière-plan"""
+    store = TickerMetadataStore(str(tmp_path / "metadata.json"))
+    first = store.get("MSFT", wait=False)
+    assert first is None or first['name'] == 'MSFT Corp.'
+    for thread in list(ticker_metadata.threading.enumerate()):
+        if thread is not ticker_metadata.threading.current_thread() and thread.daemon:
+            thread.join(timeout=5)
+    assert store.get("MSFT", wait=False)['name'] == 'MSFT Corp.'
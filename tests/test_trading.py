@@ -1,31 +1,36 @@
 import pytest
+from app.services.data_providers import SyntheticProvider
+from app.services.market_cache import OHLCVCache
 from app.services.trading_service import TradingService
 
-def test_trading_service_initialization():
+
+@pytest.fixture
+def service(tmp_path):
+    """Service alimenté par des barres synthétiques reproductibles, sans accès réseau"""
+    return TradingService("AAPL", provider=SyntheticProvider(seed=42, end="2024-06-28 16:00"),
+                          cache=OHLCVCache(str(tmp_path)))
+
+def test_trading_service_initialization(service):
     """Test l'initialisation du service de trading"""
-    service = TradingService("AAPL")
     assert service.symbol == "AAPL"
     assert service.period == "1y"
     assert service.data is not None
 
-def test_calculate_sma():
+def test_calculate_sma(service):
     """Test le calcul de la moyenne mobile simple"""
-    service = TradingService("AAPL")
     sma = service.calculate_sma(window=20)
     assert sma is not None
     assert len(sma) > 0
 
-def test_calculate_rsi():
+def test_calculate_rsi(service):
     """Test le calcul du RSI"""
-    service = TradingService("AAPL")
     rsi = service.calculate_rsi(window=14)
     assert rsi is not None
     assert len(rsi) > 0
     assert all(0 <= x <= 100 for x in rsi.dropna())
 
-def test_calculate_bollinger_bands():
+def test_calculate_bollinger_bands(service):
     """Test le calcul des bandes de Bollinger"""
-    service = TradingService("AAPL")
     bb = service.calculate_bollinger_bands()
     assert bb is not None
     assert 'upper' in bb
@@ -33,18 +38,16 @@ def test_calculate_bollinger_bands():
     assert 'lower' in bb
     assert len(bb['upper']) > 0
 
-def test_sharpe_ratio():
+def test_sharpe_ratio(service):
     """Test le calcul du ratio de Sharpe"""
-    service = TradingService("AAPL")
     # Créer des rendements factices pour le test
     returns = service.data['Close'].pct_change()
     sharpe = service.calculate_sharpe_ratio(returns)
     assert sharpe is not None
     assert isinstance(sharpe, float)
 
-def test_max_drawdown():
+def test_max_drawdown(service):
     """Test le calcul du drawdown maximum"""
-    service = TradingService("AAPL")
     # Créer des rendements cumulatifs factices pour le test
     returns = service.data['Close'].pct_change()
     cumulative_returns = (1 + returns).cumprod()
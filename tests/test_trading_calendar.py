@@ -0,0 +1,58 @@
+import numpy as np
+import pandas as pd
+import pytest
+from app.services.trading_calendar import calendar_for_symbol, easter_sunday, get_calendar
+
+
+def test_holidays_and_early_closes():
+    """Test des jours fériés et séances écourtées"""
+    nyse = get_calendar('NYSE')
+    assert easter_sunday(2024) == pd.Timestamp("2024-03-31").date()
+    assert not nyse.is_open(pd.Timestamp("2024-07-04 12:00", tz="America/New_York"))
+    assert not nyse.is_open(pd.Timestamp("2024-03-29 12:00", tz="America/New_York"))  # Vendredi saint
+    assert nyse.is_open(pd.Timestamp("2024-11-29 12:30", tz="America/New_York"))
+    assert not nyse.is_open(pd.Timestamp("2024-11-29 13:30", tz="America/New_York"))  # Séance écourtée
+    assert not nyse.is_open(pd.Timestamp("2024-12-20 09:29", tz="America/New_York"))
+
+    paris = calendar_for_symbol("MC.PA")
+    assert paris.name == 'XPAR'
+    assert paris.is_open(pd.Timestamp("2024-07-04 17:00", tz="Europe/Paris"))
+    assert not paris.is_open(pd.Timestamp("2024-04-01 10:00", tz="Europe/Paris"))  # Lundi de Pâques
+    assert not paris.is_open(pd.Timestamp("2024-12-24 15:00", tz="Europe/Paris"))
+
+
+def test_next_open_and_sessions_between():
+    """Test des prochaines ouvertures et des séances d'une période"""
+    nyse = calendar_for_symbol("AAPL")
+    # Vendredi soir -> lundi matin, en passant l'heure d'été
+    assert nyse.next_open(pd.Timestamp("2024-03-08 17:00", tz="America/New_York")) == \
+        pd.Timestamp("2024-03-11 09:30", tz="America/New_York")
+    assert nyse.next_close(pd.Timestamp("2024-12-24 10:00", tz="America/New_York")) == \
+        pd.Timestamp("2024-12-24 13:00", tz="America/New_York")
+
+    sessions = nyse.sessions_between("2024-12-20", "2025-01-03")
+    assert len(sessions) == 9
+    assert pd.Timestamp("2024-12-25") not in sessions.index
+    assert pd.Timestamp("2025-01-01") not in sessions.index
+    with pytest.raises(ValueError):
+        nyse.next_open("2041-01-01")
+
+
+def test_resample_to_sessions():
+    """Test de l'alignement de barres intraday sur les séances"""
+    nyse = get_calendar('NYSE')
+    index = pd.date_range("2024-07-03 08:00", "2024-07-05 18:00", freq="30min", tz="America/New_York")
+    rng = np.random.default_rng(0)
+    close = 100 + rng.normal(size=len(index)).cumsum()
+    data = pd.DataFrame({'Open': close, 'High': close + 1, 'Low': close - 1, 'Close': close,
+                         'Volume': np.ones(len(index))}, index=index)
+
+    labels = nyse.session_labels(data.index)
+    assert labels[index.get_loc(pd.Timestamp("2024-07-03 08:00", tz="America/New_York"))] is pd.NaT
+    daily = nyse.resample_to_sessions(data)
+    assert list(daily.index) == [pd.Timestamp("2024-07-03"), pd.Timestamp("2024-07-05")]
+    # Séance écourtée du 3 juillet : de 9h30 à 13h00 exclus, soit 7 barres
+    assert daily['Volume'].tolist() == [7, 13]
+    session = data.loc["2024-07-05 09:30":"2024-07-05 15:30"]
+    assert daily['High'].iloc[1] == session['High'].max()
+    assert daily['Close'].iloc[1] == session['Close'].iloc[-1]
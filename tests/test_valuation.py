@@ -0,0 +1,104 @@
+import time
+import numpy as np
+import pandas as pd
+import pytest
+from app.services.portfolio import Portfolio
+from app.services.valuation import ValuationEngine, mark_to_market
+
+
+class FakeLoader:
+    def __init__(self, prices):
+        self.prices = prices
+        self.calls = []
+
+    def load_many(self, symbols, period="1y", interval=None, max_age=None):
+        self.calls.append(list(symbols))
+        frames = {s: pd.DataFrame({'Close': [self.prices[s] - 1, self.prices[s]]}) for s in symbols if s in self.prices}
+        return frames, {s: "Aucune donnée disponible" for s in symbols if s not in self.prices}
+
+
+def test_mark_to_market():
+    """Test des valeurs de marché, plus-values et poids"""
+    result = mark_to_market([10, 5], [100.0, 20.0], [110.0, np.nan], cash=1000.0)
+    np.testing.assert_allclose(result['market_value'], [1100.0, 100.0])
+    np.testing.assert_allclose(result['unrealized_pnl'], [100.0, 0.0])
+    np.testing.assert_allclose(result['unrealized_pnl_pct'], [10.0, 0.0])
+    assert result['total_value'] == pytest.approx(2200.0)
+    np.testing.assert_allclose(result['weight'], [0.5, 100.0 / 2200.0])
+
+
+def test_engine_batches_and_caches_quotes():
+    """Test du chargement groupé et du cache des cotations"""
+    loader = FakeLoader({"AAPL": 120.0, "MSFT": 60.0})
+    engine = ValuationEngine(loader=loader, ttl=60)
+    portfolio = Portfolio(10000.0)
+    portfolio.buy("AAPL", 100.0, 10)
+    portfolio.buy("MSFT", 50.0, 10)
+    portfolio.buy("XXXX", 10.0, 10)
+
+    positions, total = engine.value(portfolio)
+    assert loader.calls == [["AAPL", "MSFT", "XXXX"]]
+    assert positions.loc["AAPL", 'market_value'] == pytest.approx(1200.0)
+    assert positions.loc["XXXX", 'price'] == pytest.approx(10.0)
+    # L'échec de chargement est rapporté avec la valorisation
+    assert positions['quote_error'].dropna().to_dict() == {"XXXX": "Aucune donnée disponible"}
+    assert total == pytest.approx(portfolio.cash + 1200.0 + 600.0 + 100.0)
+
+    # Cotations encore valides : seul le symbole sans cours est redemandé
+    engine.value(portfolio, overrides={"MSFT": 65.0})
+    assert loader.calls[1] == ["XXXX"]
+
+
+def test_valuation_of_many_positions_is_fast():
+    """Test de la valorisation de centaines de positions"""
+    symbols = [f"S{i}" for i in range(500)]
+    loader = FakeLoader({s: 10.0 + i for i, s in enumerate(symbols)})
+    engine = ValuationEngine(loader=loader)
+    portfolio = Portfolio(1e9)
+    for s in symbols:
+        portfolio.buy(s, 10.0, 3)
+    engine.value(portfolio)
+
+    start = time.perf_counter()
+    positions, _ = engine.value(portfolio)
+    assert time.perf_counter() - start < 0.1
+    assert len(positions) == 500 and len(loader.calls) == 1
+
+
+def test_history_is_valued_at_market_prices():
+    """Test que l'historique et la base enregistrent la valeur de marché, pas le prix de revient"""
+    loader = FakeLoader({"AAPL": 120.0, "MSFT": 60.0})
+    portfolio = Portfolio(10000.0)
+    engine = portfolio.valuation = ValuationEngine(loader=loader, ttl=0)
+    portfolio.buy("AAPL", 100.0, 10)
+    # Une valorisation (rafraîchissement de la page) met les cotations à jour
+    engine.value(portfolio)
+    portfolio.buy("MSFT", 55.0, 10)
+
+    # AAPL au dernier cours connu (120), MSFT au cours d'exécution
+    history = portfolio.ledger.history_frame()['total_value'].to_numpy()
+    assert history[-1] == pytest.approx(portfolio.cash + 1200.0 + 550.0)
+
+    engine.value(portfolio)
+    portfolio.sell("AAPL", 130.0, 5)
+    assert portfolio.ledger.history_frame()['total_value'].iloc[-1] == pytest.approx(portfolio.cash + 5 * 130.0 + 600.0)
+
+
+def test_trades_never_fetch_quotes_under_the_portfolio_lock():
+    """Test qu'une opération n'attend pas la source de données, même sans cotation en cache"""
+    class SlowLoader(FakeLoader):
+        def load_many(self, symbols, **kwargs):
+            time.sleep(1)
+            return super().load_many(symbols, **kwargs)
+
+    loader = SlowLoader({"AAPL": 120.0, "MSFT": 60.0})
+    portfolio = Portfolio(10000.0)
+    portfolio.valuation = ValuationEngine(loader=loader, ttl=0)
+    portfolio.buy("MSFT", 50.0, 10)
+
+    start = time.perf_counter()
+    portfolio.buy("AAPL", 100.0, 10)
+    assert time.perf_counter() - start < 0.5
+    assert loader.calls == []
+    # MSFT sans cotation connue : valorisé à son prix moyen d'achat
+    assert portfolio.ledger.history_frame()['total_value'].iloc[-1] == pytest.approx(portfolio.cash + 1000.0 + 500.0)
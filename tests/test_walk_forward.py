@@ -0,0 +1,101 @@
+import numpy as np
+import pandas as pd
+import pytest
+from helpers import random_walk_bars
+from app.services import parameter_sweep
+from app.services import risk
+from app.services.walk_forward import walk_forward, walk_forward_windows
+
+
+def test_windows_roll_and_anchor():
+    """Test les bornes des fenêtres glissantes et ancrées"""
+    np.testing.assert_array_equal(walk_forward_windows(10, 4, 3),
+                                  [[0, 4, 4, 7], [3, 7, 7, 10]])
+    np.testing.assert_array_equal(walk_forward_windows(10, 4, 3, step=2, anchored=True)[:, 0], [0, 0, 0])
+    assert walk_forward_windows(10, 4, 3, step=2)[-1].tolist() == [4, 8, 8, 10]
+
+
+def test_walk_forward_matches_per_window_brute_force():
+    """Test la sélection et les scores contre un recalcul fenêtre par fenêtre"""
+    close = random_walk_bars(600)['Close']
+    grid = {'short_window': [5, 10, 20], 'long_window': [30, 60]}
+    result = walk_forward(close, 'sma_crossover', grid, train_size=200, test_size=50)
+
+    returns = close.pct_change().fillna(0.0)
+    candidates = {
+        (s, l): (close.rolling(s).mean() > close.rolling(l).mean()).astype(float).shift(1).fillna(0.0) * returns
+        for s in grid['short_window'] for l in grid['long_window']
+    }
+    windows = result['windows']
+    assert len(windows) == 8
+    for row in windows.itertuples():
+        train_start, test_start = close.index.get_loc(row.train_start), close.index.get_loc(row.test_start)
+        test_end = close.index.get_loc(row.test_end) + 1
+        train_sharpe = {params: risk.sharpe_ratio(r.iloc[train_start + 1:test_start]) for params, r in candidates.items()}
+        best = max(train_sharpe, key=lambda params: np.nan_to_num(train_sharpe[params], nan=-np.inf))
+        assert (row.short_window, row.long_window) == best
+        assert row.train_score == pytest.approx(train_sharpe[best], rel=1e-9)
+        chosen = candidates[best].iloc[test_start:test_end]
+        assert row.test_return == pytest.approx((1 + chosen).prod() - 1, rel=1e-9, abs=1e-12)
+
+    # Courbe hors échantillon continue, de la première à la dernière barre de test
+    assert result['returns'].index[0] == windows['test_start'].iloc[0]
+    assert result['returns'].index[-1] == close.index[-1]
+    assert len(result['returns']) == 600 - 200
+    assert result['final_capital'] == pytest.approx(10000.0 * (1 + windows['test_return']).prod())
+
+
+def test_indicators_are_computed_once_for_all_windows(monkeypatch):
+    """Test que les indicateurs ne sont pas recalculés pour chaque fenêtre"""
+    calls = {'means': 0, 'rsi': 0}
+    rolling_means, wilder_rsi = parameter_sweep.rolling_means, parameter_sweep.wilder_rsi
+
+    def counting_means(*args):
+        calls['means'] += 1
+        return rolling_means(*args)
+
+    def counting_rsi(*args):
+        calls['rsi'] += 1
+        return wilder_rsi(*args)
+
+    monkeypatch.setattr(parameter_sweep, 'rolling_means', counting_means)
+    monkeypatch.setattr(parameter_sweep, 'wilder_rsi', counting_rsi)
+    close = random_walk_bars(2000)['Close'].to_numpy()
+
+    result = walk_forward(close, 'sma_crossover', {'short_window': [5, 10], 'long_window': [50, 100]},
+                          train_size=250, test_size=20)
+    assert len(result['windows']) == 88 and calls['means'] == 1
+
+    result = walk_forward(close, 'rsi', {'window': [7, 14], 'overbought': [65, 70], 'oversold': [30, 35]},
+                          train_size=250, test_size=20, anchored=True, objective='total_return')
+    assert len(result['windows']) == 88 and calls['rsi'] == 2
+    assert set(result['windows']['window']) <= {7, 14}
+
+
+def test_service_walk_forward_is_memoized(offline_service):
+    """Test l'optimisation walk-forward depuis TradingService"""
+    service = offline_service(periods=400)
+    grid = {'window': [7, 14], 'overbought': [70], 'oversold': [30]}
+    result = service.walk_forward('rsi', grid, train_size=150, test_size=50)
+    assert isinstance(result['windows']['test_start'].iloc[0], pd.Timestamp)
+    assert service.walk_forward('rsi', grid, train_size=150, test_size=50) is result
+
+    with pytest.raises(ValueError):
+        service.walk_forward('macd', grid, train_size=150, test_size=50)
+
+
+def test_ruinous_bar_only_affects_windows_that_contain_it():
+    """Test qu'une barre à -100 % ne corrompt pas les rendements des fenêtres suivantes"""
+    # Hausse régulière (RSI en surachat : position vendeuse), puis un cours qui double
+    close = 100 * 1.001 ** np.arange(400)
+    close[250:] *= 2
+    result = walk_forward(close, 'rsi', {'window': [14], 'overbought': [70], 'oversold': [30]},
+                          train_size=100, test_size=50, objective='total_return')
+
+    windows = result['windows']
+    ruined = (windows['test_start'] <= 250) & (windows['test_end'] >= 250)
+    assert ruined.sum() == 1
+    assert (windows.loc[ruined, 'test_return'] == -1.0).all()
+    assert np.isfinite(windows['test_return']).all() and np.isfinite(windows['train_score']).all()
+    assert (windows.loc[~ruined & (windows['test_start'] > 250), 'test_return'] > -1).all()
+    assert result['final_capital'] == 0.0